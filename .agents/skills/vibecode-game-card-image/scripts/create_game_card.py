@@ -3,11 +3,15 @@ from __future__ import annotations
 
 import argparse
 import base64
+import importlib.util
 import os
 from pathlib import Path
+from types import ModuleType
 
 from openai import OpenAI
 
+REPO_ROOT = Path(__file__).resolve().parents[4]
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate a game card image with OpenAI Images API")
@@ -17,19 +21,34 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--size", default="1536x1024", help="Image size (e.g. 1536x1024)")
     parser.add_argument("--quality", default="medium", choices=["low", "medium", "high", "auto"], help="Image quality")
     parser.add_argument("--background", default="auto", choices=["auto", "opaque", "transparent"], help="Background mode")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API, e.g. to iterate on a weak result")
     return parser.parse_args()
 
 
+def load_generation_cache() -> ModuleType | None:
+    """Load the backend's generation cache module if this checkout has one.
+
+    The file is loaded on its own so the backend's dependencies are not needed.
+    """
+    path = REPO_ROOT / "backend" / "app" / "gen_cache.py"
+    if not path.is_file():
+        return None
+    spec = importlib.util.spec_from_file_location("vibecode_gen_cache", path)
+    if spec is None or spec.loader is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
 def require_api_key() -> None:
     if os.getenv("OPENAI_API_KEY"):
         return
     raise SystemExit("OPENAI_API_KEY is not set")
 
 
-def main() -> int:
-    args = parse_args()
+def generate(args: argparse.Namespace) -> bytes:
     require_api_key()
-
     client = OpenAI()
     result = client.images.generate(
         model=args.model,
@@ -42,7 +61,35 @@ def main() -> int:
     if not result.data or not result.data[0].b64_json:
         raise SystemExit("No image was returned by the API")
 
-    image_bytes = base64.b64decode(result.data[0].b64_json)
+    return base64.b64decode(result.data[0].b64_json)
+
+
+def main() -> int:
+    args = parse_args()
+
+    # Shares the backend's disk cache, so re-running a prompt is instant.
+    gen_cache = load_generation_cache()
+    cache = key = None
+    if gen_cache is not None:
+        cache = gen_cache.GenerationCache(
+            gen_cache.default_cache_dir(REPO_ROOT),
+            ttl_seconds=float(os.getenv("GENERATION_CACHE_TTL_SECONDS") or gen_cache.DEFAULT_TTL_SECONDS),
+            max_bytes=int(os.getenv("GENERATION_CACHE_MAX_BYTES") or gen_cache.DEFAULT_MAX_BYTES),
+        )
+        key = gen_cache.image_cache_key(
+            model=args.model,
+            prompt=args.prompt,
+            size=args.size,
+            quality=args.quality,
+            background=args.background,
+        )
+
+    image_bytes = cache.get(key) if cache is not None and not args.no_cache else None
+    if image_bytes is None:
+        image_bytes = generate(args)
+        if cache is not None:
+            cache.put(key, image_bytes)
+
     output_path = Path(args.out)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_bytes(image_bytes)
@@ -0,0 +1,424 @@
+"""Catalog backfill: generate missing titles and card images for existing games.
+
+Run from ``backend/``::
+
+    python -m app.backfill [--concurrency 4] [--rate 20] [--dry-run] [--fresh]
+
+only while the server is stopped: the CLI cannot see the server's runs, so it
+would not skip games a run is writing to.  With the server up, use
+``POST /api/admin/backfill`` instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import html
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from .models import ChatMessage
+from .prompting import generate_card_image, generate_title
+from .run_index import RunIndex
+from .storage import UNTITLED_TITLE, GameNotFoundError, GameStorage
+
+logger = logging.getLogger(__name__)
+
+# A (slug, task) that failed this many times across resumes of one backfill is given up.
+MAX_ATTEMPTS = 3
+DESCRIPTION_CHARS = 600
+
+
+@dataclass(frozen=True)
+class BackfillItem:
+    slug: str
+    task: str  # "title" or "image"
+    legacy: bool = False  # flat games/<slug>.html with no folder
+
+    @property
+    def key(self) -> str:
+        return f"{self.slug}:{self.task}"
+
+
+def find_targets(storage: GameStorage) -> list[BackfillItem]:
+    """Games titled ``Untitled Game`` or without a final card image, oldest first."""
+    items = []
+    for game in sorted(storage.list_games(), key=lambda game: game.createdAt):
+        legacy = not (storage.games_dir / game.slug).is_dir()
+        if game.title == UNTITLED_TITLE and not legacy:
+            items.append(BackfillItem(game.slug, "title"))
+        if not game.imageUrl or game.cardStage in ("placeholder", "draft"):
+            items.append(BackfillItem(game.slug, "image", legacy=legacy))
+    return items
+
+
+def _describe_from_html(path: Path) -> list[str]:
+    """Title, meta description and first heading of a game page."""
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")[:200_000]
+    except OSError:
+        return []
+    parts = []
+    for pattern in (
+        r"<title[^>]*>(.*?)</title>",
+        r'<meta\s+name=["\']description["\']\s+content=["\'](.*?)["\']',
+        r"<h1[^>]*>(.*?)</h1>",
+    ):
+        match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+        if match:
+            parts.append(" ".join(html.unescape(re.sub(r"<[^>]+>", " ", match.group(1))).split()))
+    return parts
+
+
+def describe_game(
+    storage: GameStorage,
+    run_index: RunIndex | None,
+    item: BackfillItem,
+) -> tuple[str, list[ChatMessage]]:
+    """Prompt and chat context for a game: its first run's prompt plus later ones.
+
+    Games with no recorded runs fall back to the title and headings in their
+    HTML; the prompt is empty when there is nothing to go on (an untouched
+    placeholder game).
+    """
+    prompts: list[str] = []
+    if run_index is not None and not item.legacy:
+        runs, _ = run_index.list_runs(item.slug, limit=50)
+        prompts = [run["prompt"] for run in reversed(runs) if run["prompt"]]
+    if prompts:
+        context = [ChatMessage(role="user", content=prompt) for prompt in prompts[1:]]
+        return prompts[0], context[-8:]
+
+    html_path = storage.games_dir / (f"{item.slug}.html" if item.legacy else f"{item.slug}/index.html")
+    parts: list[str] = []
+    for part in (storage.read_game(item.slug).title, *_describe_from_html(html_path)):
+        if part and part != UNTITLED_TITLE and part.lower() not in (seen.lower() for seen in parts):
+            parts.append(part)
+    return " - ".join(parts)[:DESCRIPTION_CHARS], []
+
+
+class RateLimiter:
+    """Start at most *per_minute* jobs per minute, spaced evenly (0 = unlimited)."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class BackfillJournal:
+    """Append-only JSONL checkpoint of a backfill.
+
+    The first line names the backfill; each later line records one finished
+    item.  Resuming replays it to skip items already done (or failed
+    :data:`MAX_ATTEMPTS` times); ``fresh`` starts a new backfill instead.
+    """
+
+    def __init__(self, path: Path, *, fresh: bool = False) -> None:
+        self.path = path
+        self.backfill_id = ""
+        self.done: set[str] = set()
+        self.attempts: dict[str, int] = {}
+        # Workers record from several threads at once.
+        self._lock = threading.Lock()
+        if not fresh:
+            self._load()
+        # A new backfill replaces the old journal on its first record, so a
+        # dry run leaves it untouched.
+        self._new = not self.backfill_id
+        if self._new:
+            self.backfill_id = uuid.uuid4().hex
+
+    def _load(self) -> None:
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn final line after a crash
+            if "backfillId" in entry:
+                self.backfill_id = entry["backfillId"]
+            elif entry.get("status") == "ok":
+                self.done.add(entry["key"])
+            elif entry.get("status") == "error":
+                self.attempts[entry["key"]] = self.attempts.get(entry["key"], 0) + 1
+
+    def should_run(self, item: BackfillItem) -> bool:
+        return item.key not in self.done and self.attempts.get(item.key, 0) < MAX_ATTEMPTS
+
+    def record(self, item: BackfillItem, status: str, seconds: float, error: str | None = None) -> None:
+        entry: dict[str, Any] = {
+            "key": item.key,
+            "status": status,
+            "seconds": round(seconds, 3),
+            "at": _now(),
+        }
+        if error:
+            entry["error"] = error[:500]
+        with self._lock:
+            if self._new:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.path.write_text(
+                    json.dumps({"backfillId": self.backfill_id, "startedAt": _now()}) + "\n",
+                    encoding="utf-8",
+                )
+                self._new = False
+            with self.path.open("a", encoding="utf-8") as file:
+                file.write(json.dumps(entry) + "\n")
+            if status == "ok":
+                self.done.add(item.key)
+            else:
+                self.attempts[item.key] = self.attempts.get(item.key, 0) + 1
+
+
+@dataclass
+class BackfillProgress:
+    backfill_id: str
+    total: int = 0
+    resumed: int = 0  # skipped because the journal has them
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0  # game busy with a run, gone, or nothing to describe
+    state: str = "running"
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+    errors: list[dict[str, str]] = field(default_factory=list)
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.completed - self.failed - self.skipped
+
+    def to_dict(self) -> dict[str, Any]:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        processed = self.completed + self.failed
+        per_minute = processed / elapsed * 60 if elapsed > 0 else 0.0
+        eta = self.remaining / per_minute * 60 if per_minute and self.state == "running" else None
+        return {
+            "backfillId": self.backfill_id,
+            "state": self.state,
+            "total": self.total,
+            "resumed": self.resumed,
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "remaining": self.remaining,
+            "elapsedSeconds": round(elapsed, 1),
+            "itemsPerMinute": round(per_minute, 2),
+            "etaSeconds": round(eta, 1) if eta is not None else None,
+            "errors": self.errors[-20:],
+        }
+
+
+@dataclass
+class BackfillPlan:
+    journal: BackfillJournal
+    items: list[BackfillItem]
+    progress: BackfillProgress
+
+
+def plan_backfill(storage: GameStorage, *, journal_path: Path, fresh: bool = False) -> BackfillPlan:
+    """Scan the catalog and drop the items the journal already has (blocking)."""
+    journal = BackfillJournal(journal_path, fresh=fresh)
+    items = find_targets(storage)
+    pending = [item for item in items if journal.should_run(item)]
+    progress = BackfillProgress(journal.backfill_id, total=len(pending), resumed=len(items) - len(pending))
+    logger.info(
+        "Backfill %s: %d items to process, %d already done or given up",
+        journal.backfill_id, progress.total, progress.resumed,
+    )
+    return BackfillPlan(journal, pending, progress)
+
+
+async def run_backfill(
+    storage: GameStorage,
+    plan: BackfillPlan,
+    *,
+    run_index: RunIndex | None = None,
+    title_model: str = "gpt-4o-mini",
+    image_model: str = "gpt-image-1",
+    concurrency: int = 4,
+    per_minute: float = 0.0,
+    is_busy: Callable[[str], bool] | None = None,
+    report_every: float = 30.0,
+) -> BackfillProgress:
+    """Generate the plan's titles and card images with *concurrency* workers.
+
+    Starts are rate limited to *per_minute*; each finished item is appended to
+    the journal so an interrupted backfill resumes where it stopped.  Games
+    for which *is_busy* returns true (a run is queued or in progress, and will
+    fill in its own metadata) are skipped.  ``plan.progress`` is updated live.
+    """
+    journal, progress = plan.journal, plan.progress
+    queue: asyncio.Queue[BackfillItem] = asyncio.Queue()
+    for item in plan.items:
+        queue.put_nowait(item)
+    limiter = RateLimiter(per_minute)
+
+    async def process(item: BackfillItem) -> bool:
+        """Generate one item; returns False when the game gives nothing to go on."""
+        prompt, context = await asyncio.to_thread(describe_game, storage, run_index, item)
+        if not prompt:
+            return False
+        if item.task == "title":
+            title = await generate_title(prompt=prompt, chat_context=context, model=title_model)
+            # Leaves the game alone if it was named while we waited.
+            await asyncio.to_thread(
+                storage.update_title, item.slug, title, source="generated", expected=UNTITLED_TITLE
+            )
+        else:
+            output = (
+                storage.games_dir / f"{item.slug}.png"
+                if item.legacy
+                else storage.games_dir / item.slug / "card.png"
+            )
+            await generate_card_image(prompt=prompt, chat_context=context, output_path=output, model=image_model)
+            if not item.legacy:
+                await asyncio.to_thread(storage.set_card_stage, item.slug, "final")
+        return True
+
+    async def worker() -> None:
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if is_busy is not None and is_busy(item.slug):
+                progress.skipped += 1
+                continue
+            await limiter.wait()
+            started = time.perf_counter()
+            try:
+                done = await process(item)
+            except GameNotFoundError:
+                progress.skipped += 1
+            except Exception as error:
+                progress.failed += 1
+                progress.errors.append({"item": item.key, "error": str(error)[:200]})
+                logger.warning("Backfill of %s failed: %s", item.key, error)
+                await asyncio.to_thread(journal.record, item, "error", time.perf_counter() - started, str(error))
+            else:
+                if not done:
+                    progress.skipped += 1
+                    continue
+                progress.completed += 1
+                await asyncio.to_thread(journal.record, item, "ok", time.perf_counter() - started)
+
+    async def reporter() -> None:
+        while True:
+            await asyncio.sleep(report_every)
+            report = progress.to_dict()
+            logger.info(
+                "Backfill %s: %d/%d done, %d failed, %.2f items/min, ETA %ss",
+                progress.backfill_id, report["completed"], report["total"], report["failed"],
+                report["itemsPerMinute"], report["etaSeconds"],
+            )
+
+    report_task = asyncio.create_task(reporter())
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        progress.state = "completed"
+    except asyncio.CancelledError:
+        progress.state = "cancelled"
+        raise
+    finally:
+        report_task.cancel()
+        progress.finished = time.monotonic()
+        logger.info("Backfill %s %s: %s", progress.backfill_id, progress.state, progress.to_dict())
+    return progress
+
+
+def default_journal_path(project_root: Path) -> Path:
+    return project_root / ".cache" / "backfill" / "journal.jsonl"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def main() -> int:
+    from .gen_cache import configure_generation_cache
+    from .openai_clients import RetryPolicy, configure_openai_clients
+    from .run_logs import RunLogStore
+    from .settings import load_settings
+
+    parser = argparse.ArgumentParser(
+        description="Generate missing game titles and card images.",
+        epilog="Run only while the server is stopped; otherwise use POST /api/admin/backfill.",
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="items processed at once")
+    parser.add_argument("--rate", type=float, default=0.0, help="max items started per minute (0 = no limit)")
+    parser.add_argument("--journal", type=Path, help="checkpoint file (default .cache/backfill/journal.jsonl)")
+    parser.add_argument("--fresh", action="store_true", help="ignore the journal and start a new backfill")
+    parser.add_argument("--dry-run", action="store_true", help="list what would be generated and exit")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between progress lines")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    settings = load_settings()
+    configure_openai_clients(
+        base_url=settings.openai_base_url,
+        timeout=settings.openai_timeout_seconds,
+        endpoint_limits={"chat": settings.openai_chat_concurrency, "images": settings.openai_image_concurrency},
+        retry=RetryPolicy(max_attempts=settings.openai_max_attempts),
+    )
+    configure_generation_cache(
+        settings.generation_cache_dir,
+        ttl_seconds=settings.generation_cache_ttl_seconds,
+        max_bytes=settings.generation_cache_max_bytes,
+    )
+    storage = GameStorage(settings.games_dir)
+    plan = plan_backfill(
+        storage,
+        journal_path=args.journal or default_journal_path(settings.project_root),
+        fresh=args.fresh,
+    )
+    if args.dry_run:
+        for item in plan.items:
+            print(item.key)
+        return 0
+
+    async def run() -> BackfillProgress:
+        from .openai_clients import clients
+
+        try:
+            return await run_backfill(
+                storage,
+                plan,
+                run_index=RunIndex(RunLogStore(storage)),
+                title_model=settings.title_model,
+                image_model=settings.image_model,
+                concurrency=args.concurrency,
+                per_minute=args.rate,
+                report_every=args.report_every,
+            )
+        finally:
+            await clients.aclose()
+
+    progress = asyncio.run(run())
+    print(json.dumps(progress.to_dict(), indent=2))
+    return 1 if progress.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
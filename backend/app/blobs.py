@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from .codex_stream import LargeString
+from .seekable_gzip import SeekableGzipReader, SeekableGzipWriter, index_path
+
+BLOB_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobNotFoundError(Exception):
+    pass
+
+
+class RangeNotSatisfiableError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    blob_id: str
+    size: int
+
+
+class BlobStore:
+    """Content-addressed, compressed store for full tool outputs.
+
+    Each blob is the UTF-8 text of one output, kept as a seekable gzip named
+    after its SHA-256 so identical outputs are stored once and byte ranges can
+    be served without decompressing the whole blob.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def path_for(self, blob_id: str) -> Path:
+        if not BLOB_ID_PATTERN.match(blob_id):
+            raise BlobNotFoundError(blob_id)
+        return self.root / f"{blob_id}.gz"
+
+    def put_text(self, text: str) -> BlobRef:
+        """Store *text* (the full value for a :class:`LargeString`) and return its reference."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        tmp = self.root / f".{uuid.uuid4().hex}.tmp"
+        try:
+            with SeekableGzipWriter(tmp) as writer:
+                chunks = text.iter_text() if isinstance(text, LargeString) else (text,)
+                for chunk in chunks:
+                    data = chunk.encode("utf-8", errors="surrogatepass")
+                    digest.update(data)
+                    writer.write(data)
+            blob_id = digest.hexdigest()
+            target = self.path_for(blob_id)
+            if target.exists():
+                # Refresh the mtime: run-log retention treats it as "last referenced".
+                os.utime(target)
+                return BlobRef(blob_id, writer.size)
+            if index_path(tmp).exists():
+                os.replace(index_path(tmp), index_path(target))
+            os.replace(tmp, target)
+            return BlobRef(blob_id, writer.size)
+        finally:
+            tmp.unlink(missing_ok=True)
+            index_path(tmp).unlink(missing_ok=True)
+
+    def open(self, blob_id: str) -> SeekableGzipReader:
+        path = self.path_for(blob_id)
+        if not path.is_file():
+            raise BlobNotFoundError(blob_id)
+        return SeekableGzipReader(path)
+
+
+def parse_byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Parse a single-range ``Range`` header into ``(start, end)``, end exclusive.
+
+    Returns ``None`` when the whole blob should be sent (no header, or a form
+    we do not serve such as multiple ranges).
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes=") :].strip().partition("-")
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiableError(header)
+            return max(0, size - suffix), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+    if start >= size or end <= start:
+        raise RangeNotSatisfiableError(header)
+    return start, min(end, size)
@@ -0,0 +1,109 @@
+"""Procedural placeholder card art, rendered locally without the network.
+
+The picture is derived from a hash of the title and prompt, so the same game
+always gets the same card: a two-colour diagonal gradient, a few glowing orbs
+and faint scanlines, encoded as a PNG with the standard library only.
+Rendering is pure Python and takes some 30-70 ms, holding the GIL, so the
+run manager calls it once per game and only while the game has no card.
+"""
+
+from __future__ import annotations
+
+import colorsys
+import hashlib
+import math
+import struct
+import zlib
+
+PLACEHOLDER_WIDTH = 384
+PLACEHOLDER_HEIGHT = 256
+
+
+def _png(width: int, height: int, rows: list[bytes]) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    # Filter type 0 (none) at the start of every scanline.
+    raw = b"".join(b"\x00" + row for row in rows)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _color(hue: float, saturation: float, value: float) -> tuple[float, float, float]:
+    red, green, blue = colorsys.hsv_to_rgb(hue % 1.0, saturation, value)
+    return red * 255, green * 255, blue * 255
+
+
+def render_placeholder_card(
+    title: str,
+    prompt: str = "",
+    *,
+    width: int = PLACEHOLDER_WIDTH,
+    height: int = PLACEHOLDER_HEIGHT,
+) -> bytes:
+    """PNG bytes of a deterministic placeholder card for *title* and *prompt*."""
+    seed = hashlib.sha256(f"{title.strip()}\n{' '.join(prompt.split())}".encode("utf-8")).digest()
+    hue = seed[0] / 255
+    top = _color(hue, 0.75, 0.35 + seed[1] / 255 * 0.2)
+    bottom = _color(hue + 0.35 + seed[2] / 255 * 0.3, 0.8, 0.12)
+    orbs = []
+    for index in range(3 + seed[3] % 3):
+        base = 4 + index * 5
+        orbs.append(
+            (
+                seed[base] / 255 * width,
+                seed[base + 1] / 255 * height,
+                (0.12 + seed[base + 2] / 255 * 0.25) * height,
+                _color(hue + 0.5 + seed[base + 3] / 255 * 0.3, 0.6, 1.0),
+            )
+        )
+
+    # The gradient runs along x + y, so every row is a slice of one strip;
+    # only pixels under an orb are computed one by one.
+    span = width + height
+    gradient = [
+        (
+            top[0] + (bottom[0] - top[0]) * (step / span),
+            top[1] + (bottom[1] - top[1]) * (step / span),
+            top[2] + (bottom[2] - top[2]) * (step / span),
+        )
+        for step in range(span)
+    ]
+    strips = {
+        dim: bytes(int(channel * dim) for pixel in gradient for channel in pixel) for dim in (1.0, 0.82)
+    }
+
+    rows = []
+    for y in range(height):
+        dim = 0.82 if y % 4 == 3 else 1.0  # scanlines
+        row = bytearray(strips[dim][y * 3 : (y + width) * 3])
+        # Only orbs that reach this row, with their squared vertical distance.
+        active = [
+            (orb_x, (y - orb_y) ** 2, radius * radius, color)
+            for orb_x, orb_y, radius, color in orbs
+            if abs(y - orb_y) < radius
+        ]
+        lit: set[int] = set()
+        for orb_x, dy_sq, radius_sq, _ in active:
+            reach = math.sqrt(radius_sq - dy_sq)
+            lit.update(range(max(0, math.floor(orb_x - reach)), min(width, math.ceil(orb_x + reach) + 1)))
+        for x in sorted(lit):
+            red, green, blue = gradient[x + y]
+            for orb_x, dy_sq, radius_sq, (orb_red, orb_green, orb_blue) in active:
+                distance_sq = (x - orb_x) ** 2 + dy_sq
+                if distance_sq < radius_sq:
+                    glow = (1 - distance_sq / radius_sq) ** 2 * 0.7
+                    red += (orb_red - red) * glow
+                    green += (orb_green - green) * glow
+                    blue += (orb_blue - blue) * glow
+            offset = x * 3
+            row[offset] = int(red * dim)
+            row[offset + 1] = int(green * dim)
+            row[offset + 2] = int(blue * dim)
+        rows.append(bytes(row))
+    return _png(width, height, rows)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from .run_timings import TokenUsage
+from .storage import GameStorage
+
+logger = logging.getLogger(__name__)
+
+SESSION_NAME = ".codex_session"
+LINEAGE_NAME = ".codex_sessions.jsonl"
+DEFAULT_MAX_TURNS = 20
+DEFAULT_MAX_TOKENS = 150_000
+REPLY_CHARS = 4000
+
+
+@dataclass
+class SessionInfo:
+    """The game's current Codex session and how big it has grown."""
+
+    session_id: str
+    parent: str | None = None
+    turns: int = 0
+    # Input tokens of the latest run: each resumed turn re-reads the whole
+    # history, so this tracks the session's size.
+    last_input_tokens: int = 0
+    total_input_tokens: int = 0
+    last_reply: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "sessionId": self.session_id,
+            "parent": self.parent,
+            "turns": self.turns,
+            "lastInputTokens": self.last_input_tokens,
+            "totalInputTokens": self.total_input_tokens,
+        }
+
+
+class CodexSessionStore:
+    """Per-game Codex sessions and their lineage.
+
+    ``.codex_session`` holds the ID that the next run resumes.
+    ``.codex_sessions.jsonl`` is an append-only log with one ``started`` line
+    per session (its parent and why the parent was rotated) and one ``run``
+    line per run (token usage and the final reply).  A session that
+    passes *max_turns* or *max_tokens* is rotated: the next run starts a
+    fresh one from a compact seed prompt instead of resuming.
+    Zero disables a limit.
+    """
+
+    def __init__(
+        self,
+        storage: GameStorage,
+        *,
+        max_turns: int = DEFAULT_MAX_TURNS,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+    ) -> None:
+        self.storage = storage
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._current: dict[str, SessionInfo | None] = {}
+
+    def _lineage_path(self, slug: str) -> Path:
+        return self.storage.game_dir(slug) / LINEAGE_NAME
+
+    def _load_locked(self, slug: str) -> SessionInfo | None:
+        if slug in self._current:
+            return self._current[slug]
+
+        game_dir = self.storage.game_dir(slug)
+        session_file = game_dir / SESSION_NAME
+        session_id = session_file.read_text(encoding="utf-8").strip() if session_file.exists() else ""
+        info = None
+        if session_id:
+            # Sessions from before the lineage log start with zero counts.
+            info = SessionInfo(session_id)
+            for entry in self.read_lineage(slug):
+                if entry.get("sessionId") != session_id:
+                    continue
+                if entry.get("event") == "started":
+                    info.parent = entry.get("parent")
+                elif entry.get("event") == "run":
+                    self._apply_run(info, entry)
+        self._current[slug] = info
+        return info
+
+    @staticmethod
+    def _apply_run(info: SessionInfo, entry: dict[str, Any]) -> None:
+        info.turns += entry.get("turns") or 1
+        info.last_input_tokens = entry.get("inputTokens") or 0
+        info.total_input_tokens += info.last_input_tokens
+        if entry.get("reply"):
+            info.last_reply = entry["reply"]
+
+    def current(self, slug: str) -> SessionInfo | None:
+        with self._lock:
+            return self._load_locked(slug)
+
+    def rotation_reason(self, info: SessionInfo) -> str | None:
+        """``"turns"`` or ``"tokens"`` when *info* is past a limit, else ``None``."""
+        if self.max_turns and info.turns >= self.max_turns:
+            return "turns"
+        if self.max_tokens and info.last_input_tokens >= self.max_tokens:
+            return "tokens"
+        return None
+
+    def record_run(
+        self,
+        slug: str,
+        *,
+        session_id: str,
+        run_id: str,
+        usage: TokenUsage,
+        reply: str | None = None,
+        rotated_from: str | None = None,
+        rotation_reason: str | None = None,
+    ) -> SessionInfo:
+        """Log a finished run of *session_id*, making it the game's current session.
+
+        A session not seen before gets a ``started`` line first, with
+        *rotated_from* as its parent.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            info = self._load_locked(slug)
+            lines = []
+            if info is None or info.session_id != session_id:
+                lines.append(
+                    {
+                        "event": "started",
+                        "sessionId": session_id,
+                        "parent": rotated_from,
+                        "reason": rotation_reason,
+                        "parentTurns": info.turns if info else None,
+                        "parentInputTokens": info.last_input_tokens if info else None,
+                        "runId": run_id,
+                        "at": now,
+                    }
+                )
+                info = SessionInfo(session_id, parent=rotated_from)
+            entry = {
+                "event": "run",
+                "sessionId": session_id,
+                "runId": run_id,
+                "turns": usage.turns,
+                "inputTokens": usage.input_tokens,
+                "cachedInputTokens": usage.cached_input_tokens,
+                "outputTokens": usage.output_tokens,
+                "reply": reply[:REPLY_CHARS] if reply else None,
+                "at": now,
+            }
+            lines.append(entry)
+            self._apply_run(info, entry)
+
+            game_dir = self.storage.game_dir(slug)
+            with (game_dir / LINEAGE_NAME).open("a", encoding="utf-8") as file:
+                file.write("".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines))
+            (game_dir / SESSION_NAME).write_text(session_id, encoding="utf-8")
+            self._current[slug] = info
+            return info
+
+    def read_lineage(self, slug: str) -> list[dict[str, Any]]:
+        path = self._lineage_path(slug)
+        if not path.exists():
+            return []
+        entries = []
+        with path.open("r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # torn final line after a crash
+        return entries
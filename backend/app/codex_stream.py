@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import codecs
+import json
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Iterator, Protocol, TextIO, Union
+
+# Lines up to this size are parsed in memory with json.loads.
+DEFAULT_SPILL_THRESHOLD = 1024 * 1024
+# Strings inside a spilled line keep this many characters in memory.
+DEFAULT_STRING_HEAD = 4096
+READ_CHUNK = 64 * 1024
+
+
+class ByteStream(Protocol):
+    async def read(self, n: int = -1) -> bytes: ...
+
+
+@dataclass(frozen=True)
+class SpilledLine:
+    """A JSONL line too large to hold in memory, stored verbatim on disk."""
+
+    path: Path
+    size: int
+
+    def iter_bytes(self, chunk_size: int = READ_CHUNK) -> Iterator[bytes]:
+        with self.path.open("rb") as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+
+
+Frame = Union[bytes, SpilledLine]
+
+
+class LargeString(str):
+    """First characters of a JSON string value whose full text was spilled to disk.
+
+    Behaves as the head string everywhere (slicing, ``json.dumps``), while
+    ``length`` and :meth:`iter_text` give access to the complete value.
+    """
+
+    path: Path
+    offset: int
+    size: int
+    length: int
+
+    def __new__(cls, head: str, *, path: Path, offset: int, size: int, length: int) -> "LargeString":
+        value = super().__new__(cls, head)
+        value.path = path
+        value.offset = offset
+        value.size = size
+        value.length = length
+        return value
+
+    def read_text(self) -> str:
+        """The full value, loaded into memory."""
+        return "".join(self.iter_text())
+
+    def iter_text(self, chunk_size: int = READ_CHUNK) -> Iterator[str]:
+        """Yield the full decoded value from disk in chunks."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with self.path.open("rb") as file:
+            file.seek(self.offset)
+            remaining = self.size
+            while remaining > 0:
+                chunk = file.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                if text := decoder.decode(chunk):
+                    yield text
+        if tail := decoder.decode(b"", final=True):
+            yield tail
+
+
+class CodexLineReader:
+    """Split a Codex stdout stream into lines of any length in bounded memory.
+
+    Reads fixed-size chunks instead of ``readline()``, so there is no
+    ``LimitOverrunError``.  Lines up to *spill_threshold* bytes come out as
+    ``bytes``; longer ones are written to *spill_dir* as they arrive and come
+    out as :class:`SpilledLine`.  With *spill* off they are cut to
+    *spill_threshold* bytes instead.
+    """
+
+    def __init__(
+        self,
+        stream: ByteStream,
+        *,
+        spill_dir: Path | None = None,
+        spill_threshold: int = DEFAULT_SPILL_THRESHOLD,
+        chunk_size: int = READ_CHUNK,
+        spill: bool = True,
+    ) -> None:
+        self.stream = stream
+        self.spill_threshold = spill_threshold
+        self.chunk_size = chunk_size
+        self.spill = spill
+        self.truncated_lines = 0
+        self._spill_root = spill_dir
+        self._spill_dir: Path | None = None
+        self._spill_count = 0
+
+    def _new_spill_path(self) -> Path:
+        if self._spill_dir is None:
+            if self._spill_root is not None:
+                self._spill_root.mkdir(parents=True, exist_ok=True)
+                self._spill_dir = self._spill_root
+            else:
+                self._spill_dir = Path(tempfile.mkdtemp(prefix="codex-spill-"))
+        self._spill_count += 1
+        return self._spill_dir / f"line-{self._spill_count:05d}.json"
+
+    async def __aiter__(self) -> AsyncIterator[Frame]:
+        buffer = bytearray()
+        spill_file: BinaryIO | None = None
+        spill_path: Path | None = None
+        spill_size = 0
+        # With spilling off, the tail of an oversized line is dropped.
+        discarding = False
+
+        def finish_line() -> Frame:
+            nonlocal buffer, spill_file, discarding
+            if spill_file is not None and spill_path is not None:
+                spill_file.close()
+                spill_file = None
+                return SpilledLine(spill_path, spill_size)
+            line, buffer, discarding = bytes(buffer), bytearray(), False
+            return line
+
+        while True:
+            chunk = await self.stream.read(self.chunk_size)
+            if not chunk:
+                break
+            start = 0
+            while start < len(chunk):
+                newline = chunk.find(b"\n", start)
+                end = len(chunk) if newline < 0 else newline
+                piece = chunk[start:end]
+                start = end + 1 if newline >= 0 else len(chunk)
+
+                if spill_file is not None:
+                    spill_file.write(piece)
+                    spill_size += len(piece)
+                elif not discarding:
+                    buffer += piece
+                    if len(buffer) > self.spill_threshold:
+                        if self.spill:
+                            spill_path = self._new_spill_path()
+                            spill_file = spill_path.open("wb")
+                            spill_file.write(buffer)
+                            spill_size = len(buffer)
+                            buffer = bytearray()
+                        else:
+                            del buffer[self.spill_threshold :]
+                            discarding = True
+                            self.truncated_lines += 1
+
+                if newline >= 0:
+                    yield finish_line()
+
+        if spill_file is not None or buffer:
+            yield finish_line()
+
+    def close(self) -> None:
+        """Delete spilled lines and any strings extracted from them."""
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+
+# Items whose text the user reads in full; never shortened to a head.
+FULL_TEXT_ITEMS = {"agent_message", "reasoning"}
+
+
+def parse_frame(frame: Frame, *, string_head: int = DEFAULT_STRING_HEAD) -> Any:
+    """Decode one JSONL frame; raises ``ValueError`` for malformed JSON.
+
+    Spilled lines are parsed from disk (blocking; run them off the event
+    loop).  Their long strings stay :class:`LargeString` heads, except the
+    ``text`` of :data:`FULL_TEXT_ITEMS`, which is read back whole.
+    """
+    if isinstance(frame, SpilledLine):
+        event = parse_large_json(frame.path, string_head=string_head)
+        item = event.get("item") if isinstance(event, dict) else None
+        if isinstance(item, dict) and item.get("type") in FULL_TEXT_ITEMS:
+            text = item.get("text")
+            if isinstance(text, LargeString):
+                item["text"] = text.read_text()
+        return event
+    text = frame.decode("utf-8", errors="replace").strip()
+    if not text:
+        raise ValueError("empty line")
+    return json.loads(text)
+
+
+# ----------------------------------------------------------------------
+# Streaming parser for spilled lines
+# ----------------------------------------------------------------------
+
+_PLAIN_RUN = re.compile(r'[^"\\]*')
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class _StreamingJSONParser:
+    """Recursive-descent JSON parser over a text file, read in chunks.
+
+    String values longer than *string_head* characters are streamed to a
+    sidecar file and returned as :class:`LargeString`, so memory stays bounded
+    by the chunk size plus the kept heads.
+    """
+
+    def __init__(self, file: TextIO, strings_path: Path, string_head: int) -> None:
+        self._file = file
+        self._strings_path = strings_path
+        self._strings_file: Any = None
+        self._string_head = string_head
+        self._buffer = ""
+        self._pos = 0
+
+    def _fill(self, needed: int = 1) -> bool:
+        """Make sure at least *needed* unread characters are buffered, if the file has them."""
+        while len(self._buffer) - self._pos < needed:
+            chunk = self._file.read(READ_CHUNK)
+            if not chunk:
+                return len(self._buffer) - self._pos >= needed
+            self._buffer = self._buffer[self._pos :] + chunk
+            self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        return self._buffer[self._pos] if self._fill() else ""
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            if not self._fill():
+                return
+            char = self._buffer[self._pos]
+            if char not in " \t\r\n":
+                return
+            self._pos += 1
+
+    def _expect(self, char: str) -> None:
+        self._skip_whitespace()
+        if self._peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self._pos}")
+        self._pos += 1
+
+    def parse(self) -> Any:
+        value = self._value()
+        self._skip_whitespace()
+        if self._peek():
+            raise ValueError("trailing data after JSON value")
+        if self._strings_file is not None:
+            self._strings_file.close()
+        return value
+
+    def _value(self) -> Any:
+        self._skip_whitespace()
+        char = self._peek()
+        if char == "{":
+            return self._object()
+        if char == "[":
+            return self._array()
+        if char == '"':
+            self._pos += 1
+            return self._string()
+        for literal, value in (("true", True), ("false", False), ("null", None)):
+            if char == literal[0]:
+                self._fill(len(literal))
+                if self._buffer.startswith(literal, self._pos):
+                    self._pos += len(literal)
+                    return value
+                raise ValueError(f"invalid literal at offset {self._pos}")
+        self._fill(64)
+        match = _NUMBER.match(self._buffer, self._pos)
+        if not match or not match.group():
+            raise ValueError(f"unexpected character {char!r}")
+        self._pos = match.end()
+        text = match.group()
+        return float(text) if any(c in text for c in ".eE") else int(text)
+
+    def _object(self) -> dict[str, Any]:
+        self._pos += 1
+        result: dict[str, Any] = {}
+        self._skip_whitespace()
+        if self._peek() == "}":
+            self._pos += 1
+            return result
+        while True:
+            self._expect('"')
+            key = str(self._string())
+            self._expect(":")
+            result[key] = self._value()
+            self._skip_whitespace()
+            char = self._peek()
+            self._pos += 1
+            if char == "}":
+                return result
+            if char != ",":
+                raise ValueError("expected ',' or '}' in object")
+
+    def _array(self) -> list[Any]:
+        self._pos += 1
+        result: list[Any] = []
+        self._skip_whitespace()
+        if self._peek() == "]":
+            self._pos += 1
+            return result
+        while True:
+            result.append(self._value())
+            self._skip_whitespace()
+            char = self._peek()
+            self._pos += 1
+            if char == "]":
+                return result
+            if char != ",":
+                raise ValueError("expected ',' or ']' in array")
+
+    def _string(self) -> str:
+        parts: list[str] = []
+        held = 0
+        spill_offset: int | None = None
+        spilled_bytes = 0
+        length = 0
+
+        def emit(text: str) -> None:
+            nonlocal held, spill_offset, spilled_bytes, length
+            length += len(text)
+            if spill_offset is None:
+                parts.append(text)
+                held += len(text)
+                if held <= self._string_head:
+                    return
+                # Too long to keep: move what we have to disk and keep only the head.
+                if self._strings_file is None:
+                    self._strings_file = self._strings_path.open("ab")
+                spill_offset = self._strings_file.tell()
+                text = "".join(parts)
+                parts.clear()
+                parts.append(text[: self._string_head])
+            encoded = text.encode("utf-8", errors="surrogatepass")
+            self._strings_file.write(encoded)
+            spilled_bytes += len(encoded)
+
+        while True:
+            if not self._fill():
+                raise ValueError("unterminated string")
+            match = _PLAIN_RUN.match(self._buffer, self._pos)
+            if match.end() > self._pos:
+                emit(match.group())
+                self._pos = match.end()
+                continue
+            char = self._buffer[self._pos]
+            if char == '"':
+                self._pos += 1
+                break
+            # Backslash escape.
+            self._fill(12)
+            kind = self._buffer[self._pos + 1 : self._pos + 2]
+            if kind in _ESCAPES:
+                emit(_ESCAPES[kind])
+                self._pos += 2
+            elif kind == "u":
+                code = int(self._buffer[self._pos + 2 : self._pos + 6], 16)
+                self._pos += 6
+                if 0xD800 <= code < 0xDC00 and self._buffer.startswith("\\u", self._pos):
+                    low = int(self._buffer[self._pos + 2 : self._pos + 6], 16)
+                    if 0xDC00 <= low < 0xE000:
+                        code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                        self._pos += 6
+                emit(chr(code))
+            else:
+                raise ValueError(f"invalid escape at offset {self._pos}")
+
+        if spill_offset is None:
+            return "".join(parts)
+        return LargeString(
+            parts[0],
+            path=self._strings_path,
+            offset=spill_offset,
+            size=spilled_bytes,
+            length=length,
+        )
+
+
+def parse_large_json(path: Path, *, string_head: int = DEFAULT_STRING_HEAD) -> Any:
+    """Parse the JSON document in *path* without loading its large strings into memory.
+
+    Long string values are written to ``<path>.strings`` and returned as
+    :class:`LargeString` heads.
+    """
+    strings_path = path.with_name(path.name + ".strings")
+    with path.open("r", encoding="utf-8", errors="replace") as file:
+        return _StreamingJSONParser(file, strings_path, string_head).parse()
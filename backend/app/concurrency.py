@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HostSignals:
+    """Point-in-time host load readings used to size the run pool."""
+
+    cpu_pressure: float | None = None
+    load_per_cpu: float | None = None
+    mem_available_ratio: float | None = None
+    run_latency_seconds: float | None = None
+
+
+@dataclass(frozen=True)
+class ConcurrencyDecision:
+    limit: int
+    active: int
+    queued: int
+    action: str
+    reason: str
+    signals: HostSignals
+    decided_at: datetime
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "action": self.action,
+            "reason": self.reason,
+            "signals": asdict(self.signals),
+            "decidedAt": self.decided_at.isoformat(),
+        }
+
+
+def _read_cpu_pressure(proc_root: Path) -> float | None:
+    """Return the PSI ``some avg10`` CPU stall percentage, if the kernel exposes it."""
+    try:
+        text = (proc_root / "pressure" / "cpu").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    for line in text.splitlines():
+        if not line.startswith("some "):
+            continue
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            if key == "avg10":
+                try:
+                    return float(value)
+                except ValueError:
+                    return None
+    return None
+
+
+def _read_load_per_cpu(proc_root: Path) -> float | None:
+    try:
+        one_minute = float((proc_root / "loadavg").read_text(encoding="utf-8").split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return one_minute / (os.cpu_count() or 1)
+
+
+def _read_mem_available_ratio(proc_root: Path) -> float | None:
+    try:
+        text = (proc_root / "meminfo").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    values: dict[str, int] = {}
+    for line in text.splitlines():
+        key, _, rest = line.partition(":")
+        if key in ("MemTotal", "MemAvailable"):
+            try:
+                values[key] = int(rest.split()[0])
+            except (ValueError, IndexError):
+                continue
+    total = values.get("MemTotal")
+    available = values.get("MemAvailable")
+    if not total or available is None:
+        return None
+    return available / total
+
+
+def read_host_signals(proc_root: Path = Path("/proc")) -> HostSignals:
+    """Sample CPU pressure, load and free memory. Missing sources read as ``None``."""
+    return HostSignals(
+        cpu_pressure=_read_cpu_pressure(proc_root),
+        load_per_cpu=_read_load_per_cpu(proc_root),
+        mem_available_ratio=_read_mem_available_ratio(proc_root),
+    )
+
+
+class ConcurrencyController:
+    """AIMD controller for the number of Codex runs allowed to execute at once.
+
+    The limit grows by one slot while runs are waiting and the host is healthy,
+    and is cut multiplicatively as soon as CPU pressure, memory or run latency
+    crosses its threshold.  It never leaves ``[floor, ceiling]``.
+    """
+
+    def __init__(
+        self,
+        *,
+        floor: int = 1,
+        ceiling: int = 1,
+        initial: int | None = None,
+        cpu_pressure_high: float = 40.0,
+        load_per_cpu_high: float = 1.5,
+        mem_available_min_ratio: float = 0.15,
+        run_latency_target_seconds: float = 900.0,
+        decrease_factor: float = 0.5,
+        latency_smoothing: float = 0.3,
+        signal_reader: Callable[[], HostSignals] = read_host_signals,
+    ) -> None:
+        if floor < 1:
+            raise ValueError("Concurrency floor must be at least 1")
+        if ceiling < floor:
+            raise ValueError("Concurrency ceiling must not be below the floor")
+
+        self.floor = floor
+        self.ceiling = ceiling
+        self.cpu_pressure_high = cpu_pressure_high
+        self.load_per_cpu_high = load_per_cpu_high
+        self.mem_available_min_ratio = mem_available_min_ratio
+        self.run_latency_target_seconds = run_latency_target_seconds
+        self.decrease_factor = decrease_factor
+        self.latency_smoothing = latency_smoothing
+        self._signal_reader = signal_reader
+
+        self._limit = min(max(initial or floor, floor), ceiling)
+        self._run_latency: float | None = None
+        self._decision = ConcurrencyDecision(
+            limit=self._limit,
+            active=0,
+            queued=0,
+            action="hold",
+            reason="initial limit",
+            signals=HostSignals(),
+            decided_at=datetime.now(timezone.utc),
+        )
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def decision(self) -> ConcurrencyDecision:
+        return self._decision
+
+    def record_run_duration(self, seconds: float) -> None:
+        """Fold a finished run's wall time into the smoothed latency signal."""
+        if self._run_latency is None:
+            self._run_latency = seconds
+        else:
+            alpha = self.latency_smoothing
+            self._run_latency = alpha * seconds + (1 - alpha) * self._run_latency
+
+    def evaluate(self, *, active: int, queued: int) -> ConcurrencyDecision:
+        """Re-read host signals and apply one AIMD step."""
+        try:
+            signals = self._signal_reader()
+        except Exception:
+            logger.exception("Reading host load signals failed")
+            signals = HostSignals()
+        signals = HostSignals(
+            cpu_pressure=signals.cpu_pressure,
+            load_per_cpu=signals.load_per_cpu,
+            mem_available_ratio=signals.mem_available_ratio,
+            run_latency_seconds=self._run_latency,
+        )
+
+        previous = self._limit
+        overload = self._overload_reason(signals)
+        if overload:
+            self._limit = max(self.floor, math.floor(previous * self.decrease_factor))
+            action = "decrease" if self._limit < previous else "hold"
+            reason = overload if action == "decrease" else f"{overload}; at floor"
+        elif queued > 0 and active >= previous:
+            self._limit = min(self.ceiling, previous + 1)
+            action = "increase" if self._limit > previous else "hold"
+            reason = "runs waiting, host healthy" if action == "increase" else "runs waiting; at ceiling"
+        else:
+            action = "hold"
+            reason = "free slots available" if active < previous else "no runs waiting"
+
+        self._decision = ConcurrencyDecision(
+            limit=self._limit,
+            active=active,
+            queued=queued,
+            action=action,
+            reason=reason,
+            signals=signals,
+            decided_at=datetime.now(timezone.utc),
+        )
+        if self._limit != previous:
+            logger.info(
+                "Run concurrency %s %d -> %d (%s)", action, previous, self._limit, reason
+            )
+        return self._decision
+
+    def _overload_reason(self, signals: HostSignals) -> str | None:
+        if signals.cpu_pressure is not None:
+            if signals.cpu_pressure > self.cpu_pressure_high:
+                return f"cpu pressure {signals.cpu_pressure:.1f}% > {self.cpu_pressure_high:.1f}%"
+        elif signals.load_per_cpu is not None and signals.load_per_cpu > self.load_per_cpu_high:
+            return f"load per cpu {signals.load_per_cpu:.2f} > {self.load_per_cpu_high:.2f}"
+
+        if (
+            signals.mem_available_ratio is not None
+            and signals.mem_available_ratio < self.mem_available_min_ratio
+        ):
+            return (
+                f"available memory {signals.mem_available_ratio:.0%}"
+                f" < {self.mem_available_min_ratio:.0%}"
+            )
+
+        if (
+            signals.run_latency_seconds is not None
+            and signals.run_latency_seconds > self.run_latency_target_seconds
+        ):
+            return (
+                f"run latency {signals.run_latency_seconds:.0f}s"
+                f" > {self.run_latency_target_seconds:.0f}s"
+            )
+        return None
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from . import metrics
+from .models import ChatMessage
+
+# Without a tokenizer dependency, ~4 characters per token is close enough
+# for English prose and code to size a budget.
+CHARS_PER_TOKEN = 4
+DEFAULT_PROMPT_BUDGET = 3000
+DEFAULT_AUX_BUDGET = 600
+# Share of the budget kept for the summary when older turns are left out.
+SUMMARY_SHARE = 0.3
+SUMMARY_LINE_CHARS = 160
+# Summary lines kept per prefix; the first (the original request) always stays.
+MAX_SUMMARY_LINES = 200
+SUMMARY_CACHE_SIZE = 1024
+
+EMPTY_CONTEXT = "(No prior chat context.)"
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _line(message: ChatMessage) -> str:
+    return f"{message.role.upper()}: {message.content.strip()}"
+
+
+def _summary_line(message: ChatMessage) -> str:
+    """First sentence of a message, clipped, as one summary bullet."""
+    text = " ".join(message.content.split())
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = match.group(1) if match else text
+    if len(sentence) > SUMMARY_LINE_CHARS:
+        sentence = sentence[: SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+    return f"- {message.role.upper()}: {sentence}"
+
+
+@dataclass(frozen=True)
+class _Summary:
+    lines: tuple[str, ...]
+    omitted: int = 0  # lines dropped from the middle to stay under MAX_SUMMARY_LINES
+
+    def extend(self, message: ChatMessage) -> "_Summary":
+        lines = (*self.lines, _summary_line(message))
+        if len(lines) <= MAX_SUMMARY_LINES:
+            return _Summary(lines, self.omitted)
+        return _Summary((lines[0], *lines[2:]), self.omitted + 1)
+
+
+class SummaryCache:
+    """Rolling extractive summaries of conversation prefixes, LRU by prefix hash.
+
+    The hash of messages ``[0:n]`` chains the hash of ``[0:n-1]``, so when a
+    chat grows by a turn the summary of the previous prefix is found and
+    extended by one line instead of being rebuilt.
+    """
+
+    def __init__(self, max_entries: int = SUMMARY_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Summary] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def prefix_hashes(messages: list[ChatMessage]) -> list[str]:
+        hashes = []
+        digest = b""
+        for message in messages:
+            digest = hashlib.sha256(
+                digest + message.role.encode() + b"\0" + message.content.encode("utf-8")
+            ).digest()
+            hashes.append(digest.hex())
+        return hashes
+
+    def summarize(self, messages: list[ChatMessage]) -> _Summary:
+        if not messages:
+            return _Summary(())
+        hashes = self.prefix_hashes(messages)
+        with self._lock:
+            start, summary = 0, _Summary(())
+            for index in range(len(hashes) - 1, -1, -1):
+                cached = self._entries.get(hashes[index])
+                if cached is not None:
+                    self._entries.move_to_end(hashes[index])
+                    start, summary = index + 1, cached
+                    break
+        metrics.SUMMARY_LOOKUPS.inc(result="hit" if start == len(messages) else "extended" if start else "miss")
+        if start == len(messages):
+            return summary
+        for message in messages[start:]:
+            summary = summary.extend(message)
+        with self._lock:
+            self._entries[hashes[-1]] = summary
+            self._entries.move_to_end(hashes[-1])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return summary
+
+
+SUMMARY_HEADER = "Summary of earlier messages:"
+
+
+def _dropped_line(count: int) -> str:
+    return f"- ({count} more earlier messages)"
+
+
+def _summary_floor(messages: list[ChatMessage]) -> int:
+    """Tokens a summary of *messages* always takes: header, first line, dropped marker and separator."""
+    return (
+        estimate_tokens(SUMMARY_HEADER)
+        + estimate_tokens(_summary_line(messages[0]))
+        + estimate_tokens(_dropped_line(len(messages)))
+        + 4
+    )
+
+
+def _fit_summary(summary: _Summary, budget_tokens: int) -> str:
+    """Header, first line and as many of the latest lines as fit in *budget_tokens*.
+
+    Header and first line are kept even when they alone exceed the budget.
+    """
+    if not summary.lines:
+        return ""
+    first, later = summary.lines[0], summary.lines[1:]
+    budget_tokens -= estimate_tokens(SUMMARY_HEADER) + estimate_tokens(first) + 2
+    costs = [estimate_tokens(line) + 1 for line in later]
+    if summary.omitted or sum(costs) > budget_tokens:
+        budget_tokens -= estimate_tokens(_dropped_line(len(later) + summary.omitted)) + 1
+    kept: list[str] = []
+    for line, cost in zip(reversed(later), reversed(costs)):
+        if cost > budget_tokens:
+            break
+        kept.append(line)
+        budget_tokens -= cost
+    dropped = len(later) - len(kept) + summary.omitted
+    lines = [SUMMARY_HEADER, first]
+    if dropped:
+        lines.append(_dropped_line(dropped))
+    lines.extend(reversed(kept))
+    return "\n".join(lines)
+
+
+class ContextPacker:
+    """Packs chat history into a token budget: recent turns verbatim, older ones summarized."""
+
+    def __init__(
+        self,
+        *,
+        prompt_budget: int = DEFAULT_PROMPT_BUDGET,
+        aux_budget: int = DEFAULT_AUX_BUDGET,
+        summaries: SummaryCache | None = None,
+    ) -> None:
+        self.prompt_budget = prompt_budget
+        self.aux_budget = aux_budget
+        self.summaries = summaries or SummaryCache()
+
+    def pack(self, chat_context: list[ChatMessage], *, budget: str = "prompt") -> str:
+        """Context block for the Codex prompt (``budget="prompt"``) or title/image prompts (``"aux"``)."""
+        budget_tokens = self.aux_budget if budget == "aux" else self.prompt_budget
+        messages = [message for message in chat_context if message.content.strip()]
+        if not messages:
+            return EMPTY_CONTEXT
+
+        # Newest first, verbatim, while they fit in what the summary leaves.
+        total = sum(estimate_tokens(_line(message)) + 1 for message in messages)
+        if total <= budget_tokens:
+            verbatim_budget = budget_tokens
+        else:
+            verbatim_budget = int(budget_tokens * (1 - SUMMARY_SHARE))
+            if len(messages) > 1:
+                # Leave room for the part of the summary that is always kept.
+                verbatim_budget = max(0, min(verbatim_budget, budget_tokens - _summary_floor(messages)))
+        recent: list[str] = []
+        used = 0
+        for message in reversed(messages):
+            line = _line(message)
+            cost = estimate_tokens(line) + 1
+            if used + cost > verbatim_budget:
+                if not recent:
+                    # The latest turn alone is over budget: keep its head.
+                    recent.append(line[: max(0, verbatim_budget - 1) * CHARS_PER_TOKEN].rstrip() + "…")
+                    used = verbatim_budget
+                break
+            recent.append(line)
+            used += cost
+        recent.reverse()
+
+        older = messages[: len(messages) - len(recent)]
+        parts = []
+        if older:
+            # One token for the blank line between summary and recent turns.
+            summary = _fit_summary(self.summaries.summarize(older), budget_tokens - used - 1)
+            if summary:
+                parts.append(summary)
+        parts.append("\n".join(recent))
+        block = "\n\n".join(parts)
+        metrics.CONTEXT_TOKENS.observe(estimate_tokens(block), budget=budget)
+        return block
+
+
+packer = ContextPacker()
+
+
+def configure_context_packing(*, prompt_budget: int, aux_budget: int) -> ContextPacker:
+    """Set the token budgets of the process-wide packer."""
+    packer.prompt_budget = prompt_budget
+    packer.aux_budget = aux_budget
+    return packer
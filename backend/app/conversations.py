@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from pathlib import Path
+
+from .models import ChatMessage
+from .storage import GameStorage
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_NAME = ".conversation.jsonl"
+
+
+class ConversationConflictError(Exception):
+    """The client's conversation version is not the stored one."""
+
+    def __init__(self, slug: str, expected: int, current: int) -> None:
+        super().__init__(f"{slug}: conversation is at version {current}, not {expected}")
+        self.slug = slug
+        self.expected = expected
+        self.current = current
+
+
+class ConversationStore:
+    """Per-game chat history in ``<game>/.conversation.jsonl``, one message per line.
+
+    The file is append-only and a conversation's version is its message
+    count, so a client that knows the version only sends the new prompt.
+    Messages are parsed once per process and then served from memory; a
+    torn final line after a crash is cut off the file on load.
+    """
+
+    def __init__(self, storage: GameStorage) -> None:
+        self.storage = storage
+        self._lock = threading.Lock()
+        self._messages: dict[str, list[ChatMessage]] = {}
+
+    def _path(self, slug: str) -> Path:
+        return self.storage.game_dir(slug) / CONVERSATION_NAME
+
+    def _load_locked(self, slug: str) -> list[ChatMessage]:
+        messages = self._messages.get(slug)
+        if messages is not None:
+            return messages
+
+        path = self._path(slug)
+        messages = []
+        if path.exists():
+            data = path.read_bytes()
+            if data and not data.endswith(b"\n"):
+                # Torn final line: drop it, or the next append would merge with it.
+                logger.warning("Dropping a torn final conversation line for %s", slug)
+                data = data[: data.rfind(b"\n") + 1]
+                with path.open("r+b") as file:
+                    file.truncate(len(data))
+            # Split the bytes: str.splitlines() would also break on U+2028 and friends,
+            # which json.dumps(ensure_ascii=False) writes raw.
+            for raw in data.split(b"\n"):
+                if not raw.strip():
+                    continue
+                line = raw.decode("utf-8", errors="replace")
+                try:
+                    messages.append(ChatMessage(**json.loads(line)))
+                except ValueError:
+                    logger.warning("Skipping unreadable conversation line for %s", slug)
+        self._messages[slug] = messages
+        return messages
+
+    def read(self, slug: str) -> tuple[int, list[ChatMessage]]:
+        """The conversation's version and a copy of its messages."""
+        with self._lock:
+            messages = self._load_locked(slug)
+            return len(messages), list(messages)
+
+    def version(self, slug: str) -> int:
+        with self._lock:
+            return len(self._load_locked(slug))
+
+    def append(
+        self,
+        slug: str,
+        messages: list[ChatMessage],
+        *,
+        expected_version: int | None = None,
+    ) -> tuple[int, list[ChatMessage]]:
+        """Append *messages* and return the new version and the full conversation.
+
+        With *expected_version*, nothing is written unless the conversation
+        is still at that version; otherwise :class:`ConversationConflictError`
+        is raised.
+        """
+        with self._lock:
+            stored = self._load_locked(slug)
+            if expected_version is not None and expected_version != len(stored):
+                raise ConversationConflictError(slug, expected_version, len(stored))
+            if messages:
+                with self._path(slug).open("a", encoding="utf-8") as file:
+                    file.write(
+                        "".join(
+                            json.dumps(message.model_dump(), ensure_ascii=False, separators=(",", ":")) + "\n"
+                            for message in messages
+                        )
+                    )
+                stored.extend(messages)
+            return len(stored), list(stored)
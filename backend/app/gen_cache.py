@@ -0,0 +1,209 @@
+"""Disk cache for generated titles and card images.
+
+Stdlib-only and free of package-relative imports so the card-image skill
+script can load this file directly without importing the backend app.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Eviction scans the directory, so run it only every this many writes
+# (and whenever the running size estimate crosses the budget).
+_EVICT_EVERY = 32
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.split())
+
+
+def cache_key(kind: str, *, model: str, prompt: str, context: str = "", params: dict[str, Any] | None = None) -> str:
+    """Stable key for one generation request.
+
+    *kind* separates titles from images; *context* is the chat-context block
+    exactly as sent; *params* holds every other request option that changes
+    the output (size, quality, prompt template...).
+    """
+    material = json.dumps(
+        {
+            "kind": kind,
+            "model": model,
+            "prompt": normalize_prompt(prompt),
+            "context": context,
+            "params": params or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def image_cache_key(*, model: str, prompt: str, size: str, quality: str, background: str = "auto") -> str:
+    """Key for one Images API render of *prompt* exactly as sent.
+
+    Shared by the backend and the card skill's script, so the same request
+    from either one reuses the image.  ``background="auto"`` is the API
+    default and is left out of the key.
+    """
+    params = {"size": size, "quality": quality}
+    if background != "auto":
+        params["background"] = background
+    return cache_key("image", model=model, prompt=prompt, params=params)
+
+
+class GenerationCache:
+    """Content cache under *root*: one file per key, ``<key[:2]>/<key>``.
+
+    A file's mtime is when it was written (for the TTL) and its atime, set
+    explicitly on every hit, is when it was last used (for LRU eviction
+    once the directory exceeds *max_bytes*).  Writes go through a temp file
+    and ``os.replace``, so concurrent readers, including other processes,
+    never see a partial entry.
+    """
+
+    def __init__(
+        self,
+        root: Path | None,
+        *,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._size_estimate: int | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None and self.max_bytes > 0
+
+    def _path(self, key: str) -> Path:
+        assert self.root is not None
+        return self.root / key[:2] / key
+
+    def get(self, key: str) -> bytes | None:
+        """Cached bytes for *key*, or ``None`` when missing or expired."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if self.ttl_seconds > 0 and time.time() - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            data = path.read_bytes()
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.warning("Could not read generation cache entry %s", path, exc_info=True)
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not self.enabled:
+            return
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            logger.warning("Could not write generation cache entry %s", path, exc_info=True)
+            return
+
+        with self._lock:
+            self._writes += 1
+            if self._size_estimate is not None:
+                self._size_estimate += len(data)
+            due = (
+                self._size_estimate is None
+                or self._size_estimate > self.max_bytes
+                or self._writes % _EVICT_EVERY == 0
+            )
+        if due:
+            self.evict()
+
+    def get_text(self, key: str) -> str | None:
+        data = self.get(key)
+        return data.decode("utf-8") if data is not None else None
+
+    def put_text(self, key: str, text: str) -> None:
+        self.put(key, text.encode("utf-8"))
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones down to the budget.
+
+        Returns the number of entries removed.
+        """
+        if not self.enabled or not self.root.is_dir():
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.root.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.endswith(".tmp"):
+                # Left behind by a crashed writer.
+                if now - stat.st_mtime > 3600:
+                    path.unlink(missing_ok=True)
+                continue
+            if self.ttl_seconds > 0 and now - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                removed += 1
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+        with self._lock:
+            self._size_estimate = total
+        if removed:
+            logger.info("Evicted %d generation cache entries (%d bytes kept)", removed, total)
+        return removed
+
+
+def default_cache_dir(project_root: Path) -> Path | None:
+    """``GENERATION_CACHE_DIR`` (empty disables the cache), else ``<root>/.cache/generation``."""
+    value = os.getenv("GENERATION_CACHE_DIR")
+    if value is None:
+        return project_root / ".cache" / "generation"
+    return Path(value).resolve() if value else None
+
+
+cache = GenerationCache(None)
+
+
+def configure_generation_cache(root: Path | None, *, ttl_seconds: float, max_bytes: int) -> GenerationCache:
+    """Point the process-wide cache at *root* (``None`` disables it)."""
+    cache.root = root
+    cache.ttl_seconds = ttl_seconds
+    cache.max_bytes = max_bytes
+    cache._size_estimate = None
+    return cache
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT = 4
+
+# Called with an event type and payload: ``aux_job`` status changes, and
+# whatever the job itself publishes.
+JobListener = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class AuxJob:
+    """One side job of a run (title, card image) for one game."""
+
+    kind: str
+    slug: str
+    run_id: str
+    detached: bool = False
+    state: str = "queued"  # queued, running, completed, failed, cancelled
+    error: Optional[str] = None
+    created: float = field(default_factory=time.monotonic)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    # Runs still waiting on this job: the one that started it and any that joined.
+    run_ids: set[str] = field(default_factory=set)
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    listeners: list[JobListener] = field(default_factory=list, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("completed", "failed", "cancelled")
+
+    def to_dict(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "job": self.kind,
+            "slug": self.slug,
+            "runId": self.run_id,
+            "state": self.state,
+            "detached": self.detached,
+            "error": self.error,
+            "waitMs": round(((self.started or now) - self.created) * 1000, 1),
+            "runMs": round(((self.finished or now) - self.started) * 1000, 1) if self.started else None,
+        }
+
+
+class AuxJobCoordinator:
+    """Owns the title and card-image jobs that runs start on the side.
+
+    At most one job per ``(slug, kind)`` is live: a second submit while one
+    is queued or running joins it instead of starting another.  Jobs wait
+    for one of *max_concurrent* slots, and every state change is reported to
+    the job's listeners (the runs that started or joined it), as is anything
+    the job sends through :meth:`publish`.  Jobs are
+    cancelled once every run waiting on them is, unless submitted
+    ``detached``; all are
+    cancelled at :meth:`shutdown`.  Tasks are referenced here, so they are
+    never garbage-collected mid-flight.
+    """
+
+    def __init__(self, *, max_concurrent: int = DEFAULT_MAX_CONCURRENT) -> None:
+        self.max_concurrent = max_concurrent
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._jobs: dict[tuple[str, str], AuxJob] = {}
+        self._notify_tasks: set[asyncio.Task] = set()
+
+    def submit(
+        self,
+        kind: str,
+        *,
+        slug: str,
+        run_id: str,
+        work: Callable[[], Awaitable[None]],
+        listener: JobListener | None = None,
+        detached: bool = False,
+    ) -> tuple[AuxJob, bool]:
+        """Start *work* as a *kind* job for *slug*, or join the live one.
+
+        Returns the job and whether it was newly created.  *listener* is
+        called with the job's status on every change, once straight away
+        when joining, and with every event the job publishes.
+        """
+        existing = self._jobs.get((slug, kind))
+        if existing is not None and not existing.done:
+            metrics.AUX_JOBS_DEDUPLICATED.inc(job=kind)
+            existing.run_ids.add(run_id)
+            if listener is not None:
+                existing.listeners.append(listener)
+                self._spawn_notify(listener, existing)
+            return existing, False
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        job = AuxJob(kind=kind, slug=slug, run_id=run_id, detached=detached, run_ids={run_id})
+        if listener is not None:
+            job.listeners.append(listener)
+        self._jobs[(slug, kind)] = job
+        job.task = asyncio.create_task(self._run(job, work))
+        return job, True
+
+    async def _run(self, job: AuxJob, work: Callable[[], Awaitable[None]]) -> None:
+        assert self._semaphore is not None
+        await self._notify(job)
+        try:
+            async with self._semaphore:
+                job.state = "running"
+                job.started = time.monotonic()
+                metrics.AUX_JOBS_RUNNING.inc(job=job.kind)
+                try:
+                    await self._notify(job)
+                    await work()
+                finally:
+                    metrics.AUX_JOBS_RUNNING.dec(job=job.kind)
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+            raise
+        except Exception as error:
+            # The job functions log their own failures; this only reports them.
+            job.state = "failed"
+            job.error = str(error)[:500]
+        else:
+            job.state = "completed"
+        finally:
+            job.finished = time.monotonic()
+            if self._jobs.get((job.slug, job.kind)) is job:
+                del self._jobs[(job.slug, job.kind)]
+            # Shielded so a cancelled job still reports that it was cancelled.
+            await asyncio.shield(self._notify(job))
+
+    async def publish(self, slug: str, kind: str, event_type: str, payload: dict[str, Any]) -> None:
+        """Send an event from the live *kind* job of *slug* to every run attached to it."""
+        job = self._jobs.get((slug, kind))
+        if job is not None:
+            await self._broadcast(job, event_type, payload)
+
+    async def _notify(self, job: AuxJob) -> None:
+        await self._broadcast(job, "aux_job", job.to_dict())
+
+    async def _broadcast(self, job: AuxJob, event_type: str, payload: dict[str, Any]) -> None:
+        for listener in list(job.listeners):
+            try:
+                await listener(event_type, payload)
+            except Exception:
+                logger.exception("Aux job listener failed for %s/%s", job.slug, job.kind)
+
+    def _spawn_notify(self, listener: JobListener, job: AuxJob) -> None:
+        task = asyncio.create_task(listener("aux_job", job.to_dict()))
+        self._notify_tasks.add(task)
+        task.add_done_callback(self._notify_tasks.discard)
+
+    def cancel_run(self, run_id: str) -> int:
+        """Drop *run_id* from its jobs and cancel attached ones no other run waits on.
+
+        Returns how many jobs were cancelled.
+        """
+        cancelled = 0
+        for job in list(self._jobs.values()):
+            if run_id not in job.run_ids:
+                continue
+            job.run_ids.discard(run_id)
+            if not job.run_ids and not job.detached and job.task is not None and not job.task.done():
+                job.task.cancel()
+                cancelled += 1
+        return cancelled
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [job.to_dict() for job in self._jobs.values()]
+
+    async def shutdown(self) -> None:
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
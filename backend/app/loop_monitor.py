@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LoopLagMonitor:
+    """Measure event-loop scheduling lag and capture whatever is blocking it.
+
+    A probe task sleeps for *interval* and records how late it wakes up.  A
+    watchdog thread watches the probe's heartbeat; once it is overdue by more
+    than *threshold*, the loop thread is stuck, so the watchdog snapshots that
+    thread's stack while the blocking call is still on it.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float = 0.1,
+        threshold: float = 0.1,
+        window: int = 2048,
+        max_stacks: int = 50,
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self._lags: deque[float] = deque(maxlen=window)
+        self._stalls: deque[dict[str, Any]] = deque(maxlen=max_stacks)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._open_stall: dict[str, Any] | None = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._state_lock = threading.Lock()
+
+    async def start(self) -> None:
+        if self._probe_task and not self._probe_task.done():
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._probe_task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        metrics.LOOP_LAG_SECONDS.set_function(self._quantiles)
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            with self._state_lock:
+                self._lags.append(lag)
+                self._heartbeat = time.monotonic()
+                if self._open_stall is not None:
+                    # The watchdog saw this stall start; now we know how long it lasted.
+                    self._open_stall["lagMs"] = round(lag * 1000, 1)
+                    self._open_stall = None
+            if lag > self.threshold:
+                metrics.LOOP_STALLS.inc()
+
+    def _watch(self) -> None:
+        poll = max(self.threshold / 4, 0.005)
+        while not self._stop.wait(poll):
+            with self._state_lock:
+                overdue = time.monotonic() - self._heartbeat - self.interval
+                if overdue <= self.threshold or self._open_stall is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id or 0)
+                if frame is None:
+                    continue
+                # Only file names and line numbers here: reading the source
+                # lines (linecache) would keep the probe waiting on this lock.
+                summary = traceback.StackSummary.extract(traceback.walk_stack(frame), lookup_lines=False)
+                del frame
+                stall = {
+                    "detectedAt": datetime.now(timezone.utc).isoformat(),
+                    "lagMs": None,
+                    "stack": [],
+                }
+                self._open_stall = stall
+            summary.reverse()
+            stack = summary.format()
+            with self._state_lock:
+                stall["stack"] = stack
+                self._stalls.append(stall)
+            logger.warning(
+                "Event loop blocked for >%.0fms at:\n%s",
+                overdue * 1000,
+                "".join(stall["stack"][-4:]),
+            )
+
+    def _quantiles(self) -> dict[tuple[str, ...], float]:
+        with self._state_lock:
+            ordered = sorted(self._lags)
+        if not ordered:
+            return {}
+        return {
+            (str(quantile),): ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+            for quantile in _QUANTILES
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        quantiles = self._quantiles()
+        with self._state_lock:
+            stalls = [dict(stall) for stall in reversed(self._stalls)]
+            samples = len(self._lags)
+            max_lag = max(self._lags, default=0.0)
+        return {
+            "intervalMs": self.interval * 1000,
+            "thresholdMs": self.threshold * 1000,
+            "samples": samples,
+            "lagMs": {
+                **{f"p{int(q * 100)}": round(quantiles.get((str(q),), 0.0) * 1000, 2) for q in _QUANTILES},
+                "max": round(max_lag * 1000, 2),
+            },
+            "stalls": stalls,
+        }
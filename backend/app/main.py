@@ -1,27 +1,73 @@
 from __future__ import annotations
 
+import asyncio
+import secrets
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Optional
+from typing import Any, AsyncIterator, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
+from . import metrics
+from .backfill import default_journal_path, plan_backfill, run_backfill
+from .blobs import BlobNotFoundError, BlobStore, RangeNotSatisfiableError, parse_byte_range
+from .codex_sessions import CodexSessionStore
+from .concurrency import ConcurrencyController
+from .context_packing import configure_context_packing
+from .conversations import ConversationConflictError
+from .gen_cache import configure_generation_cache
+from .loop_monitor import LoopLagMonitor
 from .models import (
     CancelRunResponse,
+    ConversationResponse,
     CreateGameRequest,
     GameRecord,
     GenerateGameRequest,
     GenerateGameResponse,
+    RunListResponse,
+    RunLogPage,
+    RunSummary,
 )
-from .run_manager import RunManager, stream_run_events
+from .openai_clients import RetryPolicy, configure_openai_clients
+from .profiling import (
+    ProfilerBusyError,
+    RequestTimingMiddleware,
+    RouteLatencyStats,
+    SamplingProfiler,
+)
+from .run_logs import RunLogStore
+from .run_manager import RunManager, stream_logged_events, stream_run_events
 from .settings import Settings, load_settings
 from .storage import GameNotFoundError, GameStorage
+from .tracing import configure_tracing, parse_traceparent, tracer
 
 
 def create_app(settings: Optional[Settings] = None) -> FastAPI:
     app_settings = settings or load_settings()
+    configure_tracing(
+        app_settings.trace_exporter,
+        app_settings.trace_file or app_settings.project_root / ".traces" / "spans.jsonl",
+    )
+    openai_clients = configure_openai_clients(
+        base_url=app_settings.openai_base_url,
+        timeout=app_settings.openai_timeout_seconds,
+        endpoint_limits={
+            "chat": app_settings.openai_chat_concurrency,
+            "images": app_settings.openai_image_concurrency,
+        },
+        retry=RetryPolicy(max_attempts=app_settings.openai_max_attempts),
+    )
+    configure_context_packing(
+        prompt_budget=app_settings.context_token_budget,
+        aux_budget=app_settings.context_aux_token_budget,
+    )
+    configure_generation_cache(
+        app_settings.generation_cache_dir,
+        ttl_seconds=app_settings.generation_cache_ttl_seconds,
+        max_bytes=app_settings.generation_cache_max_bytes,
+    )
     storage = GameStorage(app_settings.games_dir)
     manager = RunManager(
         storage=storage,
@@ -30,14 +76,53 @@ def create_app(settings: Optional[Settings] = None) -> FastAPI:
         codex_model=app_settings.codex_model,
         title_model=app_settings.title_model,
         image_model=app_settings.image_model,
+        concurrency=ConcurrencyController(
+            floor=app_settings.run_concurrency_min,
+            ceiling=app_settings.run_concurrency_max,
+            cpu_pressure_high=app_settings.cpu_pressure_high,
+            load_per_cpu_high=app_settings.load_per_cpu_high,
+            mem_available_min_ratio=app_settings.mem_available_min_ratio,
+            run_latency_target_seconds=app_settings.run_latency_target_seconds,
+        ),
+        concurrency_interval_seconds=app_settings.concurrency_interval_seconds,
+        record_traces=app_settings.record_codex_traces,
+        line_spill_bytes=app_settings.codex_line_spill_bytes,
+        run_logs=RunLogStore(
+            storage,
+            segment_bytes=app_settings.run_log_segment_bytes,
+            budget_bytes=app_settings.run_log_budget_bytes,
+        ),
+        card_draft_quality=app_settings.card_draft_quality,
+        title_budget_seconds=app_settings.title_budget_seconds,
+        aux_job_concurrency=app_settings.aux_job_concurrency,
+        sessions=CodexSessionStore(
+            storage,
+            max_turns=app_settings.codex_session_max_turns,
+            max_tokens=app_settings.codex_session_max_tokens,
+        ),
+    )
+
+    # The catalog backfill started from the admin API, if any; one at a time.
+    backfill: dict[str, Any] = {"task": None, "progress": None}
+
+    loop_monitor = LoopLagMonitor(
+        interval=app_settings.loop_lag_interval_ms / 1000,
+        threshold=app_settings.loop_lag_threshold_ms / 1000,
     )
 
     @asynccontextmanager
     async def lifespan(_: FastAPI) -> AsyncIterator[None]:
         storage.ensure_games_dir()
+        await loop_monitor.start()
         await manager.start()
         yield
+        if backfill["task"] is not None and not backfill["task"].done():
+            backfill["task"].cancel()
+            await asyncio.gather(backfill["task"], return_exceptions=True)
         await manager.shutdown()
+        await openai_clients.aclose()
+        await loop_monitor.stop()
+        tracer.shutdown()
 
     app = FastAPI(title="AI Game Studio API", lifespan=lifespan)
     app.state.storage = storage
@@ -51,6 +136,24 @@ def create_app(settings: Optional[Settings] = None) -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    latency_stats = RouteLatencyStats()
+    profiler = SamplingProfiler()
+    app.add_middleware(
+        RequestTimingMiddleware,
+        stats=latency_stats,
+        slow_request_ms=app_settings.slow_request_ms,
+    )
+
+    def require_admin(request: Request) -> None:
+        """Allow admin endpoints with ``X-Admin-Token``, or from localhost when no token is set."""
+        if app_settings.admin_token:
+            supplied = request.headers.get("x-admin-token", "")
+            if not secrets.compare_digest(supplied, app_settings.admin_token):
+                raise HTTPException(status_code=403, detail="Admin token required")
+            return
+        host = request.client.host if request.client else ""
+        if host not in ("127.0.0.1", "::1", "localhost"):
+            raise HTTPException(status_code=403, detail="Admin endpoints are localhost-only")
 
     app.mount("/games", StaticFiles(directory=app_settings.games_dir), name="games")
 
@@ -58,6 +161,99 @@ def create_app(settings: Optional[Settings] = None) -> FastAPI:
     async def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics_endpoint() -> PlainTextResponse:
+        return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+    @app.get("/api/admin/latency", dependencies=[Depends(require_admin)])
+    async def admin_latency() -> list[dict[str, Any]]:
+        return latency_stats.snapshot()
+
+    @app.get("/api/admin/loop-lag", dependencies=[Depends(require_admin)])
+    async def admin_loop_lag() -> dict[str, Any]:
+        return loop_monitor.snapshot()
+
+    @app.post(
+        "/api/admin/profile",
+        response_class=PlainTextResponse,
+        dependencies=[Depends(require_admin)],
+    )
+    async def admin_profile(
+        seconds: float = Query(default=10.0, gt=0, le=60),
+        interval_ms: float = Query(default=5.0, ge=1, le=1000),
+    ) -> PlainTextResponse:
+        try:
+            collapsed = await asyncio.to_thread(profiler.profile, seconds, interval_ms / 1000)
+        except ProfilerBusyError as error:
+            raise HTTPException(status_code=409, detail=str(error)) from error
+        return PlainTextResponse(
+            collapsed,
+            headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'},
+        )
+
+    @app.post("/api/admin/backfill", status_code=202, dependencies=[Depends(require_admin)])
+    async def admin_start_backfill(
+        concurrency: int = Query(default=4, ge=1, le=32),
+        rate: float = Query(default=0.0, ge=0, description="max items started per minute, 0 = no limit"),
+        fresh: bool = False,
+        dry_run: bool = False,
+    ) -> dict[str, Any]:
+        if backfill["task"] is not None and not backfill["task"].done():
+            raise HTTPException(status_code=409, detail="A backfill is already running")
+        plan = await asyncio.to_thread(
+            plan_backfill,
+            storage,
+            journal_path=default_journal_path(app_settings.project_root),
+            fresh=fresh,
+        )
+        if dry_run:
+            return {**plan.progress.to_dict(), "state": "dry_run", "items": [item.key for item in plan.items]}
+        backfill["progress"] = plan.progress
+        backfill["task"] = asyncio.create_task(
+            run_backfill(
+                storage,
+                plan,
+                run_index=manager.run_index,
+                title_model=app_settings.title_model,
+                image_model=app_settings.image_model,
+                concurrency=concurrency,
+                per_minute=rate,
+                is_busy=lambda slug: slug in manager.busy_slugs(),
+            )
+        )
+        return plan.progress.to_dict()
+
+    @app.get("/api/admin/backfill", dependencies=[Depends(require_admin)])
+    async def admin_backfill_status() -> dict[str, Any]:
+        task, progress = backfill["task"], backfill["progress"]
+        if progress is None:
+            raise HTTPException(status_code=404, detail="No backfill has been started")
+        if progress.state == "running" and task.done() and not task.cancelled() and task.exception():
+            progress.state = "failed"
+            progress.errors.append({"item": "", "error": str(task.exception())[:200]})
+        return progress.to_dict()
+
+    @app.delete("/api/admin/backfill", dependencies=[Depends(require_admin)])
+    async def admin_cancel_backfill() -> dict[str, Any]:
+        task, progress = backfill["task"], backfill["progress"]
+        if task is None or task.done():
+            raise HTTPException(status_code=409, detail="No backfill is running")
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return progress.to_dict()
+
+    @app.get("/api/concurrency")
+    async def concurrency() -> dict[str, Any]:
+        return manager.concurrency_status()
+
+    @app.get("/api/analytics/slow-tools")
+    async def slow_tools(limit: int = Query(default=20, ge=1, le=200)) -> dict[str, Any]:
+        """Slowest tool calls and commands of runs finished since startup (not persisted)."""
+        return {
+            "calls": manager.tool_stats.slowest_calls(limit),
+            "commands": manager.tool_stats.slowest_commands(limit),
+        }
+
     @app.get("/api/games", response_model=list[GameRecord])
     async def list_games() -> list[GameRecord]:
         return storage.list_games()
@@ -73,27 +269,121 @@ def create_app(settings: Optional[Settings] = None) -> FastAPI:
         except GameNotFoundError as error:
             raise HTTPException(status_code=404, detail="Game not found") from error
 
-    @app.post("/api/games/{slug}/generate", response_model=GenerateGameResponse)
-    async def generate_game(slug: str, request: GenerateGameRequest) -> GenerateGameResponse:
+    @app.get("/api/games/{slug}/conversation", response_model=ConversationResponse)
+    async def get_conversation(slug: str) -> ConversationResponse:
         try:
-            run = await manager.enqueue(
-                slug=slug,
-                prompt=request.prompt,
-                chat_context=request.chatContext,
+            version, messages = await asyncio.to_thread(manager.conversations.read, slug)
+        except GameNotFoundError as error:
+            raise HTTPException(status_code=404, detail="Game not found") from error
+        return ConversationResponse(slug=slug, version=version, messages=messages)
+
+    @app.get("/api/games/{slug}/sessions")
+    async def get_sessions(slug: str) -> dict[str, Any]:
+        """The game's current Codex session and its lineage log."""
+        try:
+            current = await asyncio.to_thread(manager.sessions.current, slug)
+            lineage = await asyncio.to_thread(manager.sessions.read_lineage, slug)
+        except GameNotFoundError as error:
+            raise HTTPException(status_code=404, detail="Game not found") from error
+        return {
+            "slug": slug,
+            "current": current.to_dict() if current else None,
+            "maxTurns": manager.sessions.max_turns,
+            "maxTokens": manager.sessions.max_tokens,
+            "lineage": lineage,
+        }
+
+    @app.get("/api/games/{slug}/runs", response_model=RunListResponse)
+    async def list_runs(
+        slug: str,
+        offset: int = Query(0, ge=0),
+        limit: int = Query(50, ge=1, le=500),
+    ) -> RunListResponse:
+        try:
+            runs, total = await asyncio.to_thread(
+                manager.run_index.list_runs, slug, offset=offset, limit=limit
             )
         except GameNotFoundError as error:
             raise HTTPException(status_code=404, detail="Game not found") from error
+        next_offset = offset + len(runs)
+        return RunListResponse(
+            runs=[RunSummary(**run) for run in runs],
+            total=total,
+            offset=offset,
+            nextOffset=next_offset if next_offset < total else None,
+        )
+
+    @app.get("/api/games/{slug}/blobs/{blob_id}")
+    async def get_blob(slug: str, blob_id: str, request: Request) -> Response:
+        try:
+            store = BlobStore(storage.game_dir(slug) / ".runs" / "blobs")
+            reader = store.open(blob_id)
+            size = await asyncio.to_thread(lambda: reader.size)
+        except (GameNotFoundError, BlobNotFoundError) as error:
+            raise HTTPException(status_code=404, detail="Blob not found") from error
 
-        return GenerateGameResponse(runId=run.run_id)
+        headers = {
+            "Accept-Ranges": "bytes",
+            # Content-addressed, so a blob never changes.
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": f'"{blob_id}"',
+        }
+        try:
+            byte_range = parse_byte_range(request.headers.get("range"), size)
+        except RangeNotSatisfiableError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+        start, end = byte_range or (0, size)
+        headers["Content-Length"] = str(end - start)
+        if byte_range:
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        return StreamingResponse(
+            reader.iter_range(start, end),
+            status_code=206 if byte_range else 200,
+            media_type="text/plain; charset=utf-8",
+            headers=headers,
+        )
+
+    @app.post("/api/games/{slug}/generate", response_model=GenerateGameResponse)
+    async def generate_game(
+        slug: str, request: GenerateGameRequest, http_request: Request
+    ) -> GenerateGameResponse:
+        with tracer.span(
+            "POST /api/games/{slug}/generate",
+            parent=parse_traceparent(http_request.headers.get("traceparent")),
+            attributes={"game.slug": slug},
+        ):
+            try:
+                run = await manager.enqueue(
+                    slug=slug,
+                    prompt=request.prompt,
+                    chat_context=request.chatContext,
+                    conversation_version=request.conversationVersion,
+                )
+            except GameNotFoundError as error:
+                raise HTTPException(status_code=404, detail="Game not found") from error
+            except ConversationConflictError as error:
+                raise HTTPException(
+                    status_code=409,
+                    detail={"message": "Conversation has changed", "conversationVersion": error.current},
+                ) from error
+
+        return GenerateGameResponse(runId=run.run_id, conversationVersion=run.conversation_version)
 
     @app.get("/api/runs/{run_id}/events")
     async def run_events(run_id: str) -> StreamingResponse:
         run = manager.get_run(run_id)
-        if not run:
-            raise HTTPException(status_code=404, detail="Run not found")
+        if run:
+            events = stream_run_events(run)
+        else:
+            # Finished before this process started: replay the log from disk.
+            slug = await asyncio.to_thread(manager.run_logs.find_run, run_id)
+            if slug is None:
+                raise HTTPException(status_code=404, detail="Run not found")
+            events = stream_logged_events(manager.run_logs, slug, run_id)
 
         return StreamingResponse(
-            stream_run_events(run),
+            events,
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -102,6 +392,48 @@ def create_app(settings: Optional[Settings] = None) -> FastAPI:
             },
         )
 
+    @app.get("/api/runs/{run_id}", response_model=RunSummary)
+    async def get_run(run_id: str) -> RunSummary:
+        run = manager.get_run(run_id)
+        slug = run.slug if run else await asyncio.to_thread(manager.run_logs.find_run, run_id)
+        record = await asyncio.to_thread(manager.run_index.get_run, slug, run_id) if slug else None
+        if record is None:
+            raise HTTPException(status_code=404, detail="Run not found")
+        return RunSummary(**record)
+
+    @app.get("/api/runs/{run_id}/log", response_model=RunLogPage)
+    async def read_run_log(
+        run_id: str,
+        types: list[str] = Query(default=[]),
+        offset: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        reverse: bool = False,
+    ) -> RunLogPage:
+        run = manager.get_run(run_id)
+        slug = run.slug if run else await asyncio.to_thread(manager.run_logs.find_run, run_id)
+        if slug is None:
+            raise HTTPException(status_code=404, detail="Run not found")
+        # Accept both ?types=a&types=b and ?types=a,b.
+        wanted = {name for value in types for name in value.split(",") if name}
+        events, total = await asyncio.to_thread(
+            manager.run_logs.read_events,
+            slug,
+            run_id,
+            types=wanted or None,
+            offset=offset,
+            limit=limit,
+            reverse=reverse,
+        )
+        next_offset = offset + limit
+        return RunLogPage(
+            runId=run_id,
+            total=total,
+            offset=offset,
+            reverse=reverse,
+            events=events,
+            nextOffset=next_offset if next_offset < total else None,
+        )
+
     @app.post("/api/runs/{run_id}/cancel", response_model=CancelRunResponse)
     async def cancel_run(run_id: str) -> CancelRunResponse:
         run = await manager.cancel(run_id)
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import bisect
+import math
+from typing import Callable, Iterable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RUN_SECONDS_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 1800.0, 3600.0)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        return "\n".join([*header, *self.samples()])
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def total(self) -> float:
+        """Sum over every label set."""
+        return sum(self._values.values())
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """A settable gauge, or a callback gauge read at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._function: Callable[[], float | dict[LabelValues, float]] | None = None
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float | dict[LabelValues, float]]) -> None:
+        """Read the gauge from *function* at scrape time.
+
+        Labelled gauges return a mapping of label values to readings.
+        """
+        self._function = function
+
+    def samples(self) -> Iterable[str]:
+        values = self._values
+        if self._function is not None:
+            reading = self._function()
+            if not isinstance(reading, dict):
+                yield f"{self.name} {_format_value(reading)}"
+                return
+            values = reading
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum.
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def count(self, **labels: str) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def samples(self) -> Iterable[str]:
+        bucket_labels = (*self.labelnames, "le")
+        for key, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = _format_labels(bucket_labels, (*key, _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(self._sums[key])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- Run queue ---
+QUEUE_DEPTH = REGISTRY.gauge("codex_runs_queued", "Runs waiting for a slot.")
+ACTIVE_RUNS = REGISTRY.gauge("codex_runs_active", "Runs currently executing.")
+RUN_SLOTS = REGISTRY.gauge("codex_run_slots", "Current concurrency limit for Codex runs.")
+QUEUE_POSITION = REGISTRY.histogram(
+    "codex_run_queue_position",
+    "Queue positions reported to waiting runs.",
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+RUN_WAIT_SECONDS = REGISTRY.histogram(
+    "codex_run_wait_seconds",
+    "Time from enqueue to start (or to cancellation), by final status.",
+    ("status",),
+    buckets=RUN_SECONDS_BUCKETS,
+)
+RUN_DURATION_SECONDS = REGISTRY.histogram(
+    "codex_run_duration_seconds",
+    "Time from start to finish of executed runs, by final status.",
+    ("status",),
+    buckets=RUN_SECONDS_BUCKETS,
+)
+
+# --- Codex token usage (from turn.completed) ---
+CODEX_INPUT_TOKENS = REGISTRY.counter(
+    "codex_input_tokens_total",
+    "Input tokens reported by Codex turns, by prompt template (or resume).",
+    ("prompt",),
+)
+CODEX_CACHED_INPUT_TOKENS = REGISTRY.counter(
+    "codex_cached_input_tokens_total",
+    "Input tokens served from the provider's prompt cache, by prompt template (or resume).",
+    ("prompt",),
+)
+CODEX_CACHED_TOKEN_RATIO = REGISTRY.histogram(
+    "codex_cached_token_ratio",
+    "Cached share of each Codex turn's input tokens, by prompt template (or resume).",
+    ("prompt",),
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0),
+)
+
+CODEX_SESSION_ROTATIONS = REGISTRY.counter(
+    "codex_session_rotations_total",
+    "Codex sessions replaced by a fresh seeded one instead of resumed, by reason (turns, tokens).",
+    ("reason",),
+)
+
+# --- Events ---
+EVENTS_EMITTED = REGISTRY.counter("run_events_emitted_total", "Run events emitted.", ("type",))
+SSE_SUBSCRIBERS = REGISTRY.gauge("sse_subscribers", "Open run event streams.")
+
+# --- Storage ---
+LIST_GAMES_SECONDS = REGISTRY.histogram("storage_list_games_seconds", "GameStorage.list_games latency.")
+CATALOG_SIZE = REGISTRY.gauge("storage_catalog_games", "Games returned by the last list_games call.")
+
+# --- Auxiliary jobs (title, image) ---
+AUX_JOB_SECONDS = REGISTRY.histogram(
+    "aux_job_seconds",
+    "Title and card-image job latency, by outcome.",
+    ("job", "outcome"),
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 120.0),
+)
+AUX_JOB_FAILURES = REGISTRY.counter("aux_job_failures_total", "Failed title and card-image jobs.", ("job",))
+AUX_JOBS_RUNNING = REGISTRY.gauge("aux_jobs_running", "Title and card-image jobs holding a slot.", ("job",))
+AUX_JOBS_DEDUPLICATED = REGISTRY.counter(
+    "aux_jobs_deduplicated_total",
+    "Title and card-image jobs joined instead of started, because one was already live for the game.",
+    ("job",),
+)
+TITLE_OUTCOMES = REGISTRY.counter(
+    "title_outcomes_total",
+    "How run titles were settled: api (within budget), upgraded (local first), "
+    "local (API failed), renamed (kept the user's title).",
+    ("outcome",),
+)
+GENERATION_CACHE_LOOKUPS = REGISTRY.counter(
+    "generation_cache_lookups_total",
+    "Title and card-image cache lookups, by job and result (hit, miss).",
+    ("job", "result"),
+)
+
+# --- HTTP ---
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time to the first response byte, by route.",
+    ("method", "route", "status"),
+)
+
+# --- Event loop ---
+LOOP_LAG_SECONDS = REGISTRY.gauge(
+    "event_loop_lag_seconds",
+    "Event-loop scheduling lag over the recent probe window.",
+    ("quantile",),
+)
+LOOP_STALLS = REGISTRY.counter(
+    "event_loop_stalls_total",
+    "Times the event loop was blocked longer than the lag threshold.",
+)
+
+# --- OpenAI API ---
+OPENAI_REQUEST_SECONDS = REGISTRY.histogram(
+    "openai_request_duration_seconds",
+    "Latency of single OpenAI API attempts, by endpoint and outcome.",
+    ("endpoint", "outcome"),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0, 120.0),
+)
+OPENAI_RETRIES = REGISTRY.counter(
+    "openai_retries_total",
+    "OpenAI API attempts that were retried, by endpoint and reason.",
+    ("endpoint", "reason"),
+)
+OPENAI_IN_FLIGHT = REGISTRY.gauge(
+    "openai_requests_in_flight",
+    "OpenAI API calls holding a concurrency slot, by endpoint.",
+    ("endpoint",),
+)
+
+# --- Chat context ---
+CONTEXT_TOKENS = REGISTRY.histogram(
+    "chat_context_tokens",
+    "Estimated tokens in packed chat-context blocks, by budget.",
+    ("budget",),
+    buckets=(50, 100, 250, 500, 1000, 2000, 3000, 5000, 10000),
+)
+SUMMARY_LOOKUPS = REGISTRY.counter(
+    "chat_context_summary_lookups_total",
+    "Rolling summary lookups by message-prefix hash, by result (hit, extended, miss).",
+    ("result",),
+)
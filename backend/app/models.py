@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Literal, Optional
+from typing import Any, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -18,7 +18,11 @@ class CreateGameRequest(BaseModel):
 
 class GenerateGameRequest(BaseModel):
     prompt: str = Field(min_length=1)
-    chatContext: list[ChatMessage] = Field(default_factory=list)
+    # Version of the stored conversation the client last saw; the prompt is
+    # appended to it, or the request is rejected with 409 if it moved on.
+    conversationVersion: Optional[int] = Field(default=None, ge=0)
+    # Legacy: the full history, used as is instead of the stored conversation.
+    chatContext: Optional[list[ChatMessage]] = None
 
 
 class GameRecord(BaseModel):
@@ -28,6 +32,9 @@ class GameRecord(BaseModel):
     updatedAt: datetime
     previewUrl: str
     imageUrl: Optional[str] = None
+    # "placeholder", "draft" or "final" while the card is being upgraded;
+    # None for cards that predate progressive generation.
+    cardStage: Optional[str] = None
 
 
 class RunStatus(str, Enum):
@@ -40,6 +47,13 @@ class RunStatus(str, Enum):
 
 class GenerateGameResponse(BaseModel):
     runId: str
+    conversationVersion: Optional[int] = None
+
+
+class ConversationResponse(BaseModel):
+    slug: str
+    version: int
+    messages: list[ChatMessage]
 
 
 class CancelRunResponse(BaseModel):
@@ -53,3 +67,44 @@ class RunEvent(BaseModel):
     slug: str
     timestamp: datetime
     payload: dict
+
+
+class EventTypeSummary(BaseModel):
+    count: int
+    firstOffset: int
+    lastOffset: int
+
+
+class RunSummary(BaseModel):
+    runId: str
+    slug: str
+    status: RunStatus
+    createdAt: Optional[datetime] = None
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
+    queueWaitMs: Optional[float] = None
+    durationMs: Optional[float] = None
+    totalMs: Optional[float] = None
+    prompt: str = ""
+    promptLength: int = 0
+    returnCode: Optional[int] = None
+    error: Optional[str] = None
+    events: int = 0
+    logBytes: int = 0
+    eventTypes: dict[str, EventTypeSummary] = Field(default_factory=dict)
+
+
+class RunListResponse(BaseModel):
+    runs: list[RunSummary]
+    total: int
+    offset: int
+    nextOffset: Optional[int] = None
+
+
+class RunLogPage(BaseModel):
+    runId: str
+    total: int
+    offset: int
+    reverse: bool
+    events: list[dict[str, Any]]
+    nextOffset: Optional[int] = None
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, TypeVar
+
+import openai
+from openai import AsyncOpenAI
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_ENDPOINT_LIMITS = {"chat": 8, "images": 2}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff for 429, 5xx and connection failures."""
+
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    # Upper bound on how long a server-sent Retry-After may make us wait.
+    max_retry_after: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number *attempt*: uniform up to the capped exponential ("full jitter")."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """Read ``Retry-After``/``retry-after-ms`` from an API error's response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    if value := headers.get("retry-after-ms"):
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_reason(error: Exception) -> str | None:
+    """Why *error* is worth retrying, or ``None`` when it is not."""
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(error, openai.APIConnectionError):
+        return "connection"
+    if isinstance(error, openai.APIStatusError):
+        if error.status_code == 429:
+            return "rate_limited"
+        if error.status_code >= 500:
+            return "server_error"
+    return None
+
+
+class OpenAIClients:
+    """One pooled ``AsyncOpenAI`` client for the process, with per-endpoint limits.
+
+    The client (and its keep-alive connection pool) is created on first use
+    and closed by :meth:`aclose` at shutdown.  :meth:`call` runs a request
+    under the endpoint's semaphore and retries it per :class:`RetryPolicy`;
+    the SDK's own retries are disabled so there is only one policy.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str | None = None,
+        timeout: float = 120.0,
+        endpoint_limits: dict[str, int] | None = None,
+        retry: RetryPolicy | None = None,
+    ) -> None:
+        self.base_url = base_url
+        self.timeout = timeout
+        self.endpoint_limits = dict(endpoint_limits or DEFAULT_ENDPOINT_LIMITS)
+        self.retry = retry or RetryPolicy()
+        self._client: AsyncOpenAI | None = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._in_flight: dict[str, int] = {}
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(base_url=self.base_url, timeout=self.timeout, max_retries=0)
+        return self._client
+
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(endpoint)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.endpoint_limits.get(endpoint, 4))
+            self._semaphores[endpoint] = semaphore
+        return semaphore
+
+    async def call(self, endpoint: str, request: Callable[[AsyncOpenAI], Awaitable[T]]) -> T:
+        """Run ``request(client)`` with the endpoint's concurrency limit and retry policy."""
+        attempt = 0
+        while True:
+            attempt += 1
+            async with self._semaphore(endpoint):
+                self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + 1
+                metrics.OPENAI_IN_FLIGHT.set(self._in_flight[endpoint], endpoint=endpoint)
+                started = time.perf_counter()
+                try:
+                    result = await request(self.client)
+                except Exception as error:
+                    failure = error
+                    reason = _retry_reason(error)
+                    metrics.OPENAI_REQUEST_SECONDS.observe(
+                        time.perf_counter() - started, endpoint=endpoint, outcome=reason or "error"
+                    )
+                    if reason is None or attempt >= self.retry.max_attempts:
+                        raise
+                else:
+                    metrics.OPENAI_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, outcome="ok")
+                    return result
+                finally:
+                    self._in_flight[endpoint] -= 1
+                    metrics.OPENAI_IN_FLIGHT.set(self._in_flight[endpoint], endpoint=endpoint)
+
+            # Back off outside the semaphore so waiting does not hold a slot.
+            delay = self.retry.backoff(attempt)
+            retry_after = retry_after_seconds(failure)
+            if retry_after is not None:
+                delay = min(max(delay, retry_after), self.retry.max_retry_after)
+            metrics.OPENAI_RETRIES.inc(endpoint=endpoint, reason=reason)
+            logger.warning(
+                "OpenAI %s attempt %d failed (%s); retrying in %.2fs", endpoint, attempt, reason, delay
+            )
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        """Close the connection pool; the next call starts a fresh client."""
+        client, self._client = self._client, None
+        # Semaphores belong to the loop that is shutting down.
+        self._semaphores.clear()
+        if client is not None:
+            await client.close()
+
+
+clients = OpenAIClients()
+
+
+def configure_openai_clients(
+    *,
+    base_url: str | None,
+    timeout: float,
+    endpoint_limits: dict[str, int],
+    retry: RetryPolicy,
+) -> OpenAIClients:
+    """Apply settings to the process-wide client manager before first use."""
+    clients.base_url = base_url
+    clients.timeout = timeout
+    clients.endpoint_limits = dict(endpoint_limits)
+    clients.retry = retry
+    return clients
+
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, MutableMapping
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RouteLatencyStats:
+    """Sliding window of recent request latencies per ``(method, route)``."""
+
+    def __init__(self, *, window: int = 1024) -> None:
+        self.window = window
+        self._ttfb: dict[tuple[str, str], deque[float]] = {}
+        self._total: dict[tuple[str, str], deque[float]] = {}
+        self._counts: Counter[tuple[str, str]] = Counter()
+
+    def record(self, method: str, route: str, ttfb_ms: float, total_ms: float) -> None:
+        key = (method, route)
+        if key not in self._ttfb:
+            self._ttfb[key] = deque(maxlen=self.window)
+            self._total[key] = deque(maxlen=self.window)
+        self._ttfb[key].append(ttfb_ms)
+        self._total[key].append(total_ms)
+        self._counts[key] += 1
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        rows = []
+        for key in sorted(self._ttfb):
+            method, route = key
+            row: dict[str, Any] = {"method": method, "route": route, "count": self._counts[key]}
+            for label, samples in (("ttfbMs", self._ttfb[key]), ("totalMs", self._total[key])):
+                ordered = sorted(samples)
+                row[label] = {
+                    "p50": round(_percentile(ordered, 0.50), 2),
+                    "p95": round(_percentile(ordered, 0.95), 2),
+                    "p99": round(_percentile(ordered, 0.99), 2),
+                    "max": round(ordered[-1], 2),
+                }
+            rows.append(row)
+        return rows
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware that times every HTTP request and logs slow ones.
+
+    Latency is split into time to the first response byte (the handler) and
+    time spent sending the body.  For ``text/event-stream`` responses only the
+    first part is judged against the slow-request threshold, since streams are
+    expected to stay open.
+    """
+
+    def __init__(self, app: ASGIApp, *, stats: RouteLatencyStats, slow_request_ms: float) -> None:
+        self.app = app
+        self.stats = stats
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        response: dict[str, Any] = {"status": 500, "first_byte": None, "streaming": False}
+
+        async def timed_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["first_byte"] = time.perf_counter()
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-type" and value.startswith(b"text/event-stream"):
+                        response["streaming"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            finished = time.perf_counter()
+            first_byte = response["first_byte"] or finished
+            self._record(scope, response, started, first_byte, finished)
+
+    def _record(
+        self,
+        scope: Scope,
+        response: dict[str, Any],
+        started: float,
+        first_byte: float,
+        finished: float,
+    ) -> None:
+        method = scope.get("method", "GET")
+        route = self._route_template(scope)
+        ttfb_ms = (first_byte - started) * 1000
+        total_ms = (finished - started) * 1000
+
+        self.stats.record(method, route, ttfb_ms, total_ms)
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            ttfb_ms / 1000, method=method, route=route, status=str(response["status"])
+        )
+
+        judged_ms = ttfb_ms if response["streaming"] else total_ms
+        if judged_ms >= self.slow_request_ms:
+            logger.warning(
+                "Slow request %s %s (%s) status=%s total=%.1fms handler=%.1fms body=%.1fms",
+                method,
+                scope.get("path", ""),
+                route,
+                response["status"],
+                total_ms,
+                ttfb_ms,
+                total_ms - ttfb_ms,
+            )
+
+    @staticmethod
+    def _route_template(scope: Scope) -> str:
+        route = scope.get("route")
+        if route is not None and hasattr(route, "path"):
+            return route.path
+        # Mounted apps (static game files) only leave their mount point behind.
+        if scope.get("root_path"):
+            return f"{scope['root_path']}/*"
+        return "<unmatched>"
+
+
+class ProfilerBusyError(Exception):
+    pass
+
+
+class SamplingProfiler:
+    """Statistical profiler that samples every thread's stack via ``sys._current_frames``.
+
+    Runs in a worker thread, so it observes the event loop thread without
+    restarting the server.  Output is in collapsed-stack format
+    (``thread;outer;inner count``), which flamegraph.pl and speedscope read
+    directly.
+    """
+
+    def __init__(self, *, max_seconds: float = 60.0) -> None:
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+
+    def profile(self, seconds: float, interval: float) -> str:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            samples = self._sample(min(seconds, self.max_seconds), interval)
+        finally:
+            self._lock.release()
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+    def _sample(self, seconds: float, interval: float) -> Counter[str]:
+        own_thread = threading.get_ident()
+        samples: Counter[str] = Counter()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                samples[self._collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+            time.sleep(interval)
+
+        return samples
+
+    @staticmethod
+    def _collapse(thread_name: str, frame: Any) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            stack.append(f"{code.co_name} ({filename}:{frame.f_lineno})".replace(";", ":"))
+            frame = frame.f_back
+        stack.append(thread_name.replace(";", ":").replace(" ", "_"))
+        return ";".join(reversed(stack))
@@ -0,0 +1,115 @@
+"""Versioned prompt templates laid out for provider-side prefix caching.
+
+Every template is a static prefix (instructions, skill routing, style rules)
+followed by variable sections, most stable first.  The prefix is a constant:
+nothing is interpolated into it, so it is byte-identical on every request and
+the provider can reuse its cached tokens.  Changing a prefix invalidates
+those caches; bump the template's version when you do
+(``tests/test_prompt_layout.py`` pins each version's prefix digest).
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    version: int
+    prefix: str
+    # (key, heading) of each variable section, in prompt order.
+    sections: tuple[tuple[str, str], ...]
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}/v{self.version}"
+
+    @property
+    def prefix_digest(self) -> str:
+        return hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()
+
+    def render_sections(self, **values: str) -> str:
+        """The variable part alone, for APIs that take the prefix separately (a system message)."""
+        missing = {key for key, _ in self.sections} - values.keys()
+        if missing:
+            raise KeyError(f"{self.id}: missing sections {sorted(missing)}")
+        return "\n\n".join(f"{heading}:\n{values[key].strip()}" for key, heading in self.sections)
+
+    def render(self, **values: str) -> str:
+        return self.prefix + self.render_sections(**values)
+
+
+GAME_PROMPT = PromptTemplate(
+    name="game",
+    version=2,
+    prefix=(
+        "You are Codex building a browser game inside this folder.\n"
+        "\n"
+        "Use the $game-build-orchestrator skill.\n"
+        "Edit only files in the current working directory.\n"
+        "Ensure index.html is the playable entrypoint.\n"
+        "Do NOT modify game.json (managed separately).\n"
+        "\n"
+        "The prior chat context comes first, then the user request to act on.\n"
+        "\n"
+    ),
+    sections=(("context", "Prior chat context"), ("request", "User request")),
+)
+
+# A fresh session replacing one that grew too large: same instructions, then
+# what the old session knew, compacted.
+SESSION_SEED_PROMPT = PromptTemplate(
+    name="session-seed",
+    version=1,
+    prefix=(
+        "You are Codex building a browser game inside this folder.\n"
+        "\n"
+        "Use the $game-build-orchestrator skill.\n"
+        "Edit only files in the current working directory.\n"
+        "Ensure index.html is the playable entrypoint.\n"
+        "Do NOT modify game.json (managed separately).\n"
+        "\n"
+        "This continues earlier work on the game in this folder. The files are already there; "
+        "read them before changing anything. Below are the current files, the recent chat, "
+        "your last reply, then the user request to act on.\n"
+        "\n"
+    ),
+    sections=(
+        ("files", "Current files"),
+        ("context", "Recent chat"),
+        ("last_reply", "Your last reply"),
+        ("request", "User request"),
+    ),
+)
+
+TITLE_PROMPT = PromptTemplate(
+    name="title",
+    version=2,
+    prefix=(
+        "You are a creative game naming assistant. "
+        "Given a game description, return ONLY a short, catchy game title. "
+        "No quotes, no explanation, no punctuation beyond what the title needs. "
+        "Keep it under 60 characters."
+    ),
+    sections=(("context", "Chat context"), ("description", "Game description")),
+)
+
+CARD_ART_PROMPT = PromptTemplate(
+    name="card-art",
+    version=2,
+    prefix=(
+        "Polished arcade key-art game card.\n"
+        "Style: clean, vibrant arcade key art. "
+        "Composition: one focal action scene with a readable silhouette. "
+        "Constraints: no text, no logo, no watermark, no UI elements.\n"
+        "\n"
+    ),
+    sections=(("context", "Context"), ("game", "Game")),
+)
+
+TEMPLATES = {
+    template.id: template
+    for template in (GAME_PROMPT, SESSION_SEED_PROMPT, TITLE_PROMPT, CARD_ART_PROMPT)
+}
@@ -1,22 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import os
+import re
 from pathlib import Path
 
-from openai import AsyncOpenAI
-
+from . import metrics
+from .context_packing import packer
+from .gen_cache import cache, cache_key, image_cache_key
 from .models import ChatMessage
+from .openai_clients import clients
+from .prompt_templates import CARD_ART_PROMPT, GAME_PROMPT, SESSION_SEED_PROMPT, TITLE_PROMPT
+from .storage import UNTITLED_TITLE
 
 
-def _build_chat_context_block(chat_context: list[ChatMessage]) -> str:
-    context_lines = []
-    for msg in chat_context[-24:]:
-        role = msg.role.upper()
-        content = msg.content.strip()
-        if not content:
-            continue
-        context_lines.append(f"{role}: {content}")
-    return "\n".join(context_lines) if context_lines else "(No prior chat context.)"
+def _build_chat_context_block(chat_context: list[ChatMessage], *, budget: str = "prompt") -> str:
+    """Recent messages verbatim and a summary of older ones, within the *budget* ("prompt" or "aux")."""
+    return packer.pack(chat_context, budget=budget)
 
 
 def build_game_prompt(
@@ -24,22 +25,72 @@ def build_game_prompt(
     prompt: str,
     chat_context: list[ChatMessage],
 ) -> str:
-    context_block = _build_chat_context_block(chat_context)
+    """Prompt for a new Codex session: the static ``GAME_PROMPT`` prefix, then context and request."""
+    return GAME_PROMPT.render(context=_build_chat_context_block(chat_context), request=prompt)
 
-    return f"""
-You are Codex building a browser game inside this folder.
 
-Use the $game-build-orchestrator skill.
-Edit only files in the current working directory.
-Ensure index.html is the playable entrypoint.
-Do NOT modify game.json (managed separately).
+def build_session_seed_prompt(
+    *,
+    prompt: str,
+    chat_context: list[ChatMessage],
+    files: list[str],
+    last_reply: str | None,
+) -> str:
+    """Prompt that starts a fresh Codex session in place of a rotated one.
+
+    *files* are paths relative to the game folder.
+    """
+    return SESSION_SEED_PROMPT.render(
+        files="\n".join(f"- {path}" for path in files) or "(none)",
+        context=_build_chat_context_block(chat_context),
+        last_reply=(last_reply or "").strip() or "(none)",
+        request=prompt,
+    )
+
 
-Prior chat context:
-{context_block}
+def build_title_messages(*, prompt: str, context_block: str) -> list[dict[str, str]]:
+    """Chat messages for a title request; the system message is the static ``TITLE_PROMPT`` prefix."""
+    return [
+        {"role": "system", "content": TITLE_PROMPT.prefix},
+        {"role": "user", "content": TITLE_PROMPT.render_sections(context=context_block, description=prompt)},
+    ]
 
-User request:
-{prompt.strip()}
-""".strip()
+
+def build_card_art_prompt(*, prompt: str, context_block: str) -> str:
+    return CARD_ART_PROMPT.render(context=context_block, game=prompt)
+
+
+# Words that say nothing about what makes a game distinctive.
+_TITLE_STOPWORDS = frozenset(
+    """
+    a about add all also an and any are as at be browser build but by can could create
+    different do does each every for from game games get gets has have html i in into is
+    it its just let like make me more my need new of on one or over please play player
+    players playable same should simple so some something that the their them then there
+    these this to up use using want we where which while who will with would you your
+    """.split()
+)
+
+
+def local_title(prompt: str, *, max_words: int = 3) -> str:
+    """Deterministic title from the prompt's first distinctive words, no network.
+
+    Used when the title API is slow; e.g. "make a neon snake game where you
+    dodge lasers" gives "Neon Snake Dodge".
+    """
+    words: list[str] = []
+    for word in re.findall(r"[A-Za-z][A-Za-z0-9'-]*", prompt):
+        cleaned = word.strip("'-")
+        if len(cleaned) < 3 or cleaned.lower() in _TITLE_STOPWORDS:
+            continue
+        if cleaned.lower() not in (seen.lower() for seen in words):
+            words.append(cleaned)
+        if len(words) == max_words:
+            break
+    if not words:
+        return UNTITLED_TITLE
+    title = " ".join(word if word.isupper() else word.capitalize() for word in words)
+    return title[:60].rstrip()
 
 
 async def generate_title(
@@ -47,31 +98,43 @@ async def generate_title(
     prompt: str,
     chat_context: list[ChatMessage],
     model: str = "gpt-4o-mini",
+    use_cache: bool = True,
 ) -> str:
-    """Call the OpenAI API to generate a short, creative game title."""
-    context_block = _build_chat_context_block(chat_context)
-
-    system_msg = (
-        "You are a creative game naming assistant. "
-        "Given a game description, return ONLY a short, catchy game title. "
-        "No quotes, no explanation, no punctuation beyond what the title needs. "
-        "Keep it under 60 characters."
-    )
-    user_msg = f"Game description:\n{prompt.strip()}\n\nChat context:\n{context_block}"
+    """Call the OpenAI API to generate a short, creative game title.
+
+    Results are cached on disk by model, prompt, context and request options;
+    pass ``use_cache=False`` to always ask the API (the result is still stored).
+    """
+    context_block = _build_chat_context_block(chat_context, budget="aux")
+    messages = build_title_messages(prompt=prompt, context_block=context_block)
 
-    client = AsyncOpenAI()
-    response = await client.chat.completions.create(
+    key = cache_key(
+        "title",
         model=model,
-        messages=[
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": user_msg},
-        ],
-        max_tokens=60,
-        temperature=0.9,
+        prompt=prompt,
+        context=context_block,
+        params={"template": TITLE_PROMPT.id, "max_tokens": 60, "temperature": 0.9},
+    )
+    if use_cache and (cached := await asyncio.to_thread(cache.get_text, key)) is not None:
+        metrics.GENERATION_CACHE_LOOKUPS.inc(job="title", result="hit")
+        return cached
+    metrics.GENERATION_CACHE_LOOKUPS.inc(job="title", result="miss")
+
+    response = await clients.call(
+        "chat",
+        lambda client: client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=60,
+            temperature=0.9,
+        ),
     )
 
     title = (response.choices[0].message.content or "").strip().strip('"\'')
-    return title or "Untitled Game"
+    if not title:
+        return UNTITLED_TITLE
+    await asyncio.to_thread(cache.put_text, key, title)
+    return title
 
 
 async def generate_card_image(
@@ -82,30 +145,45 @@ async def generate_card_image(
     model: str = "gpt-image-1",
     size: str = "1536x1024",
     quality: str = "medium",
+    use_cache: bool = True,
 ) -> Path:
-    """Generate a game card image via the OpenAI Images API and save it to *output_path*."""
-    context_block = _build_chat_context_block(chat_context)
-
-    art_prompt = (
-        f"Polished arcade key-art game card for: {prompt.strip()}\n"
-        f"Context: {context_block}\n"
-        "Style: clean, vibrant arcade key art. "
-        "Composition: one focal action scene with a readable silhouette. "
-        "Constraints: no text, no logo, no watermark, no UI elements."
-    )
+    """Generate a game card image via the OpenAI Images API and save it to *output_path*.
 
-    client = AsyncOpenAI()
-    result = await client.images.generate(
-        model=model,
-        prompt=art_prompt,
-        size=size,
-        quality=quality,
+    Cached like :func:`generate_title`, keyed on the full art prompt, so a
+    repeated request only copies the stored PNG.
+    """
+    context_block = _build_chat_context_block(chat_context, budget="aux")
+
+    art_prompt = build_card_art_prompt(prompt=prompt, context_block=context_block)
+
+    # The art prompt already embeds the user prompt and the context block.
+    key = image_cache_key(model=model, prompt=art_prompt, size=size, quality=quality)
+    image_bytes = await asyncio.to_thread(cache.get, key) if use_cache else None
+    metrics.GENERATION_CACHE_LOOKUPS.inc(job="image", result="miss" if image_bytes is None else "hit")
+    if image_bytes is None:
+        image_bytes = await _request_card_image(art_prompt, model=model, size=size, quality=quality)
+        await asyncio.to_thread(cache.put, key, image_bytes)
+
+    # Written aside and renamed, so a card being replaced is never half-written.
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_name(f".{output_path.name}.tmp")
+    await asyncio.to_thread(tmp.write_bytes, image_bytes)
+    os.replace(tmp, output_path)
+    return output_path
+
+
+async def _request_card_image(art_prompt: str, *, model: str, size: str, quality: str) -> bytes:
+    result = await clients.call(
+        "images",
+        lambda client: client.images.generate(
+            model=model,
+            prompt=art_prompt,
+            size=size,
+            quality=quality,
+        ),
     )
 
     if not result.data or not result.data[0].b64_json:
         raise RuntimeError("No image was returned by the API")
 
-    image_bytes = base64.b64decode(result.data[0].b64_json)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_bytes(image_bytes)
-    return output_path
+    return base64.b64decode(result.data[0].b64_json)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+from .codex_stream import Frame, SpilledLine
+
+if TYPE_CHECKING:
+    from .run_manager import RunManager, RunState
+
+logger = logging.getLogger(__name__)
+
+TRACE_SUFFIX = ".codex.jsonl.gz"
+TRACE_VERSION = 1
+
+
+class TraceRecorder:
+    """Tee raw Codex stdout lines, with their arrival offsets, into a gzip JSONL trace.
+
+    The first record is a header; each following record is ``{"t": seconds,
+    "line": text}``.  Undecodable bytes survive the round trip through
+    ``surrogateescape``.
+    """
+
+    def __init__(self, path: Path, *, run_id: str, slug: str) -> None:
+        self.path = path
+        self._started = time.monotonic()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._file.write(
+            json.dumps(
+                {
+                    "version": TRACE_VERSION,
+                    "runId": run_id,
+                    "slug": slug,
+                    "recordedAt": datetime.now(timezone.utc).isoformat(),
+                }
+            )
+            + "\n"
+        )
+
+    def record(self, line: Frame) -> None:
+        offset = round(time.monotonic() - self._started, 6)
+        if not isinstance(line, SpilledLine):
+            text = line.decode("utf-8", errors="surrogateescape")
+            self._file.write(json.dumps({"t": offset, "line": text}) + "\n")
+            return
+        # Stream an oversized line into the record chunk by chunk.  Each byte
+        # of a split UTF-8 sequence becomes its own surrogate, so the bytes
+        # still round-trip exactly.
+        self._file.write(f'{{"t": {json.dumps(offset)}, "line": "')
+        for chunk in line.iter_bytes():
+            self._file.write(json.dumps(chunk.decode("utf-8", errors="surrogateescape"))[1:-1])
+        self._file.write('"}\n')
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_trace(path: Path) -> Iterator[tuple[float, bytes]]:
+    """Yield ``(offset_seconds, raw_line)`` pairs; a truncated trace ends early."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        try:
+            for index, raw in enumerate(file):
+                record = json.loads(raw)
+                if index == 0 and "version" in record:
+                    continue
+                yield record["t"], record["line"].encode("utf-8", errors="surrogateescape")
+        except (EOFError, gzip.BadGzipFile):
+            logger.warning("Trace %s is truncated; replaying what was recorded", path)
+
+
+class ReplayStream:
+    """Feed recorded lines through the ``asyncio.StreamReader`` interface.
+
+    *speed* ``1.0`` reproduces the recorded timing, larger values compress it,
+    and ``0`` delivers every line as fast as the consumer reads.
+    """
+
+    def __init__(self, lines: list[tuple[float, bytes]], *, speed: float = 0.0) -> None:
+        self._lines = lines
+        self._index = 0
+        self._speed = speed
+        self._started: float | None = None
+        self._buffer = b""
+
+    async def _next_line(self) -> bytes:
+        if self._index >= len(self._lines):
+            return b""
+        offset, line = self._lines[self._index]
+        self._index += 1
+        if self._speed > 0:
+            if self._started is None:
+                self._started = time.monotonic()
+            delay = offset / self._speed - (time.monotonic() - self._started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        # Frames are recorded without their terminator; the live stream had one.
+        return line + b"\n"
+
+    async def readline(self) -> bytes:
+        if self._buffer:
+            newline = self._buffer.find(b"\n")
+            if newline >= 0:
+                line, self._buffer = self._buffer[: newline + 1], self._buffer[newline + 1 :]
+                return line
+            line, self._buffer = self._buffer, b""
+            return line
+        return await self._next_line()
+
+    async def read(self, n: int = -1) -> bytes:
+        if not self._buffer:
+            self._buffer = await self._next_line()
+        if n < 0 or n >= len(self._buffer):
+            chunk, self._buffer = self._buffer, b""
+        else:
+            chunk, self._buffer = self._buffer[:n], self._buffer[n:]
+        return chunk
+
+
+def normalize_events(events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Drop per-run and wall-clock fields so replays of one trace compare equal."""
+    return [{"type": event["type"], "payload": event["payload"]} for event in events]
+
+
+def events_digest(events: list[dict[str, Any]]) -> str:
+    encoded = json.dumps(normalize_events(events), sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    trace: str
+    lines: int
+    bytes: int
+    events: int
+    seconds: float
+    digest: str
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds else float("inf")
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds else float("inf")
+
+
+async def replay_trace(
+    manager: "RunManager",
+    run: "RunState",
+    trace_path: Path,
+    *,
+    speed: float = 0.0,
+) -> ReplayResult:
+    """Push a recorded trace through ``_consume_stdout`` and measure it."""
+    lines = list(read_trace(trace_path))
+    emitted_before = len(run.backlog)
+
+    started = time.perf_counter()
+    await manager._consume_stdout(run, ReplayStream(lines, speed=speed))  # type: ignore[arg-type]
+    elapsed = time.perf_counter() - started
+
+    emitted = run.backlog[emitted_before:]
+    return ReplayResult(
+        trace=trace_path.name,
+        lines=len(lines),
+        bytes=sum(len(line) for _, line in lines),
+        events=len(emitted),
+        seconds=elapsed,
+        digest=events_digest(emitted),
+    )
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from .run_logs import RUN_ID_PATTERN, RunLogStore
+from .storage import GameNotFoundError
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "index.jsonl"
+PROMPT_SUMMARY_CHARS = 160
+# High-volume event types update the record in memory only; it is written
+# out on the next lifecycle event (at the latest, run_finished).
+_UNPERSISTED_TYPES = {"codex_thinking", "codex_tool_call", "codex_tool_output", "queue_position"}
+
+
+def summarize_prompt(prompt: str) -> str:
+    text = " ".join(prompt.split())
+    if len(text) > PROMPT_SUMMARY_CHARS:
+        text = text[: PROMPT_SUMMARY_CHARS - 1] + "…"
+    return text
+
+
+def _new_record(slug: str, run_id: str) -> dict[str, Any]:
+    return {
+        "runId": run_id,
+        "slug": slug,
+        "status": "queued",
+        "createdAt": None,
+        "startedAt": None,
+        "finishedAt": None,
+        "queueWaitMs": None,
+        "durationMs": None,
+        "totalMs": None,
+        "prompt": "",
+        "promptLength": 0,
+        "returnCode": None,
+        "error": None,
+        "events": 0,
+        "logBytes": 0,
+        "eventTypes": {},
+    }
+
+
+def apply_event(record: dict[str, Any], event: dict[str, Any], size: int) -> None:
+    """Fold one logged event (*size* bytes, newline included) into a run record."""
+    event_type = event.get("type", "")
+    payload = event.get("payload") or {}
+    timestamp = event.get("timestamp")
+    offset = record["logBytes"]
+
+    stats = record["eventTypes"].setdefault(event_type, {"count": 0, "firstOffset": offset, "lastOffset": offset})
+    stats["count"] += 1
+    stats["lastOffset"] = offset
+    record["events"] += 1
+    record["logBytes"] = offset + size
+    if record["createdAt"] is None:
+        record["createdAt"] = timestamp
+
+    if event_type == "status":
+        status = payload.get("status")
+        if status in ("queued", "running", "cancelled"):
+            record["status"] = status
+        if status == "running" and record["startedAt"] is None:
+            record["startedAt"] = timestamp
+    elif event_type == "run_finished":
+        record["status"] = payload.get("status", record["status"])
+        record["finishedAt"] = timestamp
+        record["returnCode"] = payload.get("returnCode")
+        error = payload.get("error")
+        record["error"] = error[:500] if isinstance(error, str) else None
+        timings = payload.get("timings") or {}
+        record["queueWaitMs"] = timings.get("queueWaitMs")
+        record["durationMs"] = timings.get("runMs")
+        record["totalMs"] = timings.get("totalMs")
+
+
+class RunIndex:
+    """Per-game run summaries in ``.runs/index.jsonl``, kept up to date from ``_emit``.
+
+    The file is append-only: each line is the latest full record for one run
+    and later lines win, with ``{"runId": ..., "deleted": true}`` marking runs
+    removed by retention.  Records are cached in memory after the first read
+    and the file is rewritten once it holds mostly superseded lines.  Games
+    whose logs predate the index get it rebuilt from the logs once.
+
+    :meth:`observe` runs on the event loop and never touches the disk or
+    ``_lock``: it folds the event into the run's working record and queues a
+    snapshot.  :meth:`flush` (off the loop) applies queued snapshots and
+    writes them out; readers flush first, so they never see stale records.
+    """
+
+    def __init__(self, run_logs: RunLogStore) -> None:
+        self.run_logs = run_logs
+        # Guards the files and the loaded records; only ever taken off the loop.
+        self._lock = threading.Lock()
+        self._records: dict[str, dict[str, dict[str, Any]]] = {}
+        self._lines: dict[str, int] = {}
+        # Event-loop side: the records being built from live events, and
+        # snapshots (slug, run ID, record, persist) waiting for a flush.
+        self._working: dict[tuple[str, str], dict[str, Any]] = {}
+        self._pending: deque[tuple[str, str, dict[str, Any], bool]] = deque()
+
+    def _path(self, slug: str) -> Path:
+        return self.run_logs.runs_dir(slug) / INDEX_NAME
+
+    # --- Loading ---
+
+    def _load_locked(self, slug: str) -> dict[str, dict[str, Any]]:
+        records = self._records.get(slug)
+        if records is not None:
+            return records
+
+        path = self._path(slug)
+        records = {}
+        lines = 0
+        if path.exists():
+            with path.open("r", encoding="utf-8") as file:
+                for line in file:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line after a crash
+                    if record.get("deleted"):
+                        records.pop(record["runId"], None)
+                    else:
+                        records[record["runId"]] = record
+        else:
+            records = self._rebuild(slug)
+            lines = len(records)
+            if records:
+                self._write_all(path, records)
+
+        self._records[slug] = records
+        self._lines[slug] = lines
+        return records
+
+    def _rebuild(self, slug: str) -> dict[str, dict[str, Any]]:
+        runs_dir = self.run_logs.runs_dir(slug)
+        # <runId>.jsonl and <runId>.<n>.jsonl[.gz] only: not the index or temp files.
+        run_ids = {
+            path.name.split(".", 1)[0]
+            for path in runs_dir.iterdir()
+            if path.name.endswith((".jsonl", ".jsonl.gz")) and RUN_ID_PATTERN.match(path.name.split(".", 1)[0])
+        } if runs_dir.is_dir() else set()
+        records = {}
+        for run_id in run_ids:
+            record = _new_record(slug, run_id)
+            for line in self.run_logs.iter_lines(slug, run_id):
+                try:
+                    apply_event(record, json.loads(line), len(line) + 1)
+                except ValueError:
+                    continue
+            if record["events"]:
+                records[run_id] = record
+        if records:
+            logger.info("Rebuilt run index for %s from %d logs", slug, len(records))
+        return records
+
+    def _write_all(self, path: Path, records: dict[str, dict[str, Any]]) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as file:
+            for record in records.values():
+                file.write(json.dumps(record) + "\n")
+        os.replace(tmp, path)
+
+    def _append_locked(self, slug: str, record: dict[str, Any]) -> None:
+        path = self._path(slug)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+        self._lines[slug] = self._lines.get(slug, 0) + 1
+
+    # --- Writing ---
+
+    def observe(
+        self,
+        slug: str,
+        run_id: str,
+        event: dict[str, Any],
+        size: int,
+        *,
+        prompt: str | None = None,
+    ) -> None:
+        """Fold an event just appended to the run's log into its record (in memory only).
+
+        Call :meth:`flush` off the loop afterwards to apply and persist it.
+        """
+        record = self._working.get((slug, run_id))
+        if record is None:
+            record = self._working[(slug, run_id)] = _new_record(slug, run_id)
+        if prompt is not None and not record["prompt"]:
+            record["prompt"] = summarize_prompt(prompt)
+            record["promptLength"] = len(prompt)
+        apply_event(record, event, size)
+        # The working record keeps changing on the loop; hand over a copy.
+        snapshot = {**record, "eventTypes": {name: dict(stats) for name, stats in record["eventTypes"].items()}}
+        self._pending.append((slug, run_id, snapshot, event.get("type") not in _UNPERSISTED_TYPES))
+        if event.get("type") == "run_finished":
+            # Its final snapshot is queued, and a finished run gets no more events.
+            del self._working[(slug, run_id)]
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def flush(self) -> None:
+        """Apply queued snapshots and append the persisted ones (blocking)."""
+        with self._lock:
+            self._drain_locked()
+
+    def _drain_locked(self) -> None:
+        while self._pending:
+            slug, run_id, record, persist = self._pending.popleft()
+            try:
+                records = self._load_locked(slug)
+            except GameNotFoundError:
+                continue
+            # Live snapshots are complete, so they replace anything a rebuild
+            # just read from the log.
+            records[run_id] = record
+            if persist:
+                self._append_locked(slug, record)
+
+    def remove(self, slug: str, run_ids: list[str]) -> None:
+        with self._lock:
+            self._drain_locked()
+            records = self._load_locked(slug)
+            for run_id in run_ids:
+                if records.pop(run_id, None) is not None:
+                    self._append_locked(slug, {"runId": run_id, "deleted": True})
+
+    def compact(self, slug: str) -> None:
+        """Rewrite the index with one line per run once superseded lines dominate."""
+        with self._lock:
+            self._drain_locked()
+            records = self._load_locked(slug)
+            if self._lines.get(slug, 0) <= 2 * len(records) + 100:
+                return
+            self._write_all(self._path(slug), records)
+            self._lines[slug] = len(records)
+
+    # --- Reading ---
+
+    def list_runs(self, slug: str, *, offset: int = 0, limit: int = 50) -> tuple[list[dict[str, Any]], int]:
+        """Newest-first page of run records and the total number of runs."""
+        with self._lock:
+            self._drain_locked()
+            records = sorted(
+                self._load_locked(slug).values(),
+                key=lambda record: record["createdAt"] or "",
+                reverse=True,
+            )
+            # Copies, since the live records keep changing on the event loop.
+            return copy.deepcopy(records[offset : offset + limit]), len(records)
+
+    def get_run(self, slug: str, run_id: str) -> dict[str, Any] | None:
+        try:
+            with self._lock:
+                self._drain_locked()
+                return copy.deepcopy(self._load_locked(slug).get(run_id))
+        except GameNotFoundError:
+            return None
@@ -0,0 +1,451 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+from .seekable_gzip import SeekableGzipReader, compress_file, index_path
+from .storage import GameNotFoundError, GameStorage
+
+logger = logging.getLogger(__name__)
+
+RUN_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+# <runId>.jsonl is the segment being appended to; sealed segments are
+# <runId>.<n>.jsonl until compressed to <runId>.<n>.jsonl.gz.
+_SEGMENT_PATTERN = re.compile(r"^(?P<run>[0-9a-f]{32})\.(?P<index>\d{3,})\.jsonl(?P<gz>\.gz)?$")
+DEFAULT_SEGMENT_BYTES = 8 * 1024 * 1024
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+# <runId>.lines: one fixed-width record per event (logical byte offset, line
+# length, CRC-32 of the event type), so reads can seek instead of scanning.
+LINE_INDEX_SUFFIX = ".lines"
+_LINE_RECORD = struct.Struct("<QII")
+# Unsealed logs of finished runs untouched for this long get compressed.
+STALE_LOG_SECONDS = 3600
+
+
+@dataclass
+class _RunFiles:
+    run_id: str
+    paths: list[Path] = field(default_factory=list)
+    size: int = 0
+    newest: float = 0.0
+
+
+class RunLogStore:
+    """Event logs under ``<game>/.runs``: appends, rotation, compression and retention.
+
+    The active segment of a run is plain JSONL, with a fixed-width
+    ``<runId>.lines`` index of every event beside it.  Once it grows past
+    *segment_bytes*, or the run finishes, it is sealed (renamed, on the event
+    loop thread, so no append can race it) and then compressed to seekable
+    gzip off the loop.  Readers see one stream of events across all segments.
+    *budget_bytes* caps the ``.runs`` folder of each game; ``0`` disables it.
+    """
+
+    def __init__(
+        self,
+        storage: GameStorage,
+        *,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        budget_bytes: int = DEFAULT_BUDGET_BYTES,
+    ) -> None:
+        self.storage = storage
+        self.segment_bytes = segment_bytes
+        self.budget_bytes = budget_bytes
+        # Logical end of each run's event stream, for the line index.
+        self._next_offset: dict[tuple[str, str], int] = {}
+        # Segments being compressed right now: a run's own finish and another
+        # run's stale sweep can both reach the same sealed segment.
+        self._compressing: set[Path] = set()
+        self._compress_lock = threading.Lock()
+
+    def runs_dir(self, slug: str) -> Path:
+        return self.storage.game_dir(slug) / ".runs"
+
+    # --- Writing ---
+
+    def append(self, slug: str, run_id: str, line: str, event_type: str = "") -> Path | None:
+        """Append one encoded event *line*; returns a sealed segment to compress when the active one got too big."""
+        runs_dir = self.runs_dir(slug)
+        path = runs_dir / f"{run_id}.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        key = (slug, run_id)
+        offset = self._next_offset.get(key)
+        if offset is None:
+            offset = self._line_index_end(slug, run_id)
+        with path.open("a", encoding="utf-8") as file:
+            file.write(line)
+            size = file.tell()
+        # Events are ASCII-only JSON, so characters and bytes agree.
+        with (runs_dir / f"{run_id}{LINE_INDEX_SUFFIX}").open("ab") as index:
+            index.write(_LINE_RECORD.pack(offset, len(line), zlib.crc32(event_type.encode("utf-8"))))
+        self._next_offset[key] = offset + len(line)
+        if self.segment_bytes and size >= self.segment_bytes:
+            return self.seal(slug, run_id)
+        return None
+
+    def seal(self, slug: str, run_id: str) -> Path | None:
+        """Move the active segment aside as the run's next numbered segment."""
+        runs_dir = self.runs_dir(slug)
+        active = runs_dir / f"{run_id}.jsonl"
+        if not active.exists():
+            return None
+        indexes = [index for index, _ in self._segments(runs_dir, run_id)]
+        sealed = runs_dir / f"{run_id}.{(max(indexes) + 1) if indexes else 0:03d}.jsonl"
+        os.replace(active, sealed)
+        return sealed
+
+    def compress(self, path: Path) -> bool:
+        """Compress a sealed segment or ``.last.txt`` in place (blocking).
+
+        Returns ``False`` without doing anything when *path* is already being
+        compressed by another thread or is gone (compressed meanwhile).
+        """
+        with self._compress_lock:
+            if path in self._compressing:
+                return False
+            self._compressing.add(path)
+        try:
+            try:
+                compress_file(path, path.with_name(path.name + ".gz"))
+            except FileNotFoundError:
+                if path.exists():
+                    raise
+                return False
+            path.unlink(missing_ok=True)
+            return True
+        finally:
+            with self._compress_lock:
+                self._compressing.discard(path)
+
+    def finish(self, slug: str, run_id: str, sealed: Path | None, *, active_runs: set[str]) -> list[str]:
+        """Compress what a finished run left behind, then apply the retention budget.
+
+        Runs off the event loop.  Returns the IDs of runs removed for space.
+        """
+        runs_dir = self.runs_dir(slug)
+        # A late event (e.g. a title job) re-reads the offset from the line index.
+        self._next_offset.pop((slug, run_id), None)
+        if sealed is not None and sealed.exists():
+            self.compress(sealed)
+        last_message = runs_dir / f"{run_id}.last.txt"
+        if last_message.exists():
+            self.compress(last_message)
+        self._compress_stale(runs_dir, active_runs | {run_id})
+        return self.enforce_retention(slug, keep=active_runs)
+
+    def _compress_stale(self, runs_dir: Path, skip: set[str]) -> None:
+        """Compress plain logs left by earlier runs (older releases, crashes, late events)."""
+        cutoff = time.time() - STALE_LOG_SECONDS
+        for path in runs_dir.glob("*.jsonl"):
+            run_id = path.name.split(".", 1)[0]
+            if run_id in skip or not RUN_ID_PATTERN.match(run_id):
+                continue
+            try:
+                if not _SEGMENT_PATTERN.match(path.name):
+                    # An unsealed log may still get a late event (e.g. a title
+                    # job finishing after its run), so leave recent ones alone.
+                    if path.stat().st_mtime > cutoff:
+                        continue
+                    path = self.seal(runs_dir.parent.name, run_id) or path
+                self.compress(path)
+            except OSError:
+                logger.exception("Could not compress %s", path)
+
+    # --- Reading ---
+
+    def _segments(self, runs_dir: Path, run_id: str) -> list[tuple[int, Path]]:
+        by_index: dict[int, Path] = {}
+        for path in runs_dir.glob(f"{run_id}.*.jsonl*"):
+            match = _SEGMENT_PATTERN.match(path.name)
+            if not match:
+                continue
+            index = int(match["index"])
+            # A finished .gz wins over the plain file it was made from.
+            if match["gz"] or index not in by_index:
+                by_index[index] = path
+        return sorted(by_index.items())
+
+    def segment_paths(self, slug: str, run_id: str) -> list[Path]:
+        """Every segment of a run in order, the active plain-JSONL one last."""
+        runs_dir = self.runs_dir(slug)
+        paths = [path for _, path in self._segments(runs_dir, run_id)]
+        active = runs_dir / f"{run_id}.jsonl"
+        if active.exists():
+            paths.append(active)
+        return paths
+
+    def has_run(self, slug: str, run_id: str) -> bool:
+        return bool(self.segment_paths(slug, run_id))
+
+    def iter_lines(self, slug: str, run_id: str) -> Iterator[bytes]:
+        """Stream raw JSONL lines across all segments, decompressing as it goes."""
+        for path in self.segment_paths(slug, run_id):
+            try:
+                if path.suffix == ".gz":
+                    yield from SeekableGzipReader(path).iter_lines()
+                else:
+                    with path.open("rb") as file:
+                        for line in file:
+                            yield line.rstrip(b"\n")
+            except FileNotFoundError:
+                # Compressed or pruned while we were reading; the .gz takes over.
+                gz = path.with_name(path.name + ".gz")
+                if path.suffix != ".gz" and gz.exists():
+                    yield from SeekableGzipReader(gz).iter_lines()
+
+    def iter_events(self, slug: str, run_id: str) -> Iterator[dict[str, Any]]:
+        for line in self.iter_lines(slug, run_id):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning("Skipping corrupt event line in run %s", run_id)
+
+    def _line_index_end(self, slug: str, run_id: str) -> int:
+        """Logical end offset of a run's events, building its line index if missing."""
+        path = self.runs_dir(slug) / f"{run_id}{LINE_INDEX_SUFFIX}"
+        if not path.exists():
+            self.build_line_index(slug, run_id)
+        size = path.stat().st_size if path.exists() else 0
+        if size < _LINE_RECORD.size:
+            return 0
+        with path.open("rb") as file:
+            file.seek(size - size % _LINE_RECORD.size - _LINE_RECORD.size)
+            offset, length, _ = _LINE_RECORD.unpack(file.read(_LINE_RECORD.size))
+        return offset + length
+
+    def build_line_index(self, slug: str, run_id: str) -> None:
+        """Write ``<runId>.lines`` for a log from before line indexes existed."""
+        runs_dir = self.runs_dir(slug)
+        if not self.segment_paths(slug, run_id):
+            return
+        tmp = runs_dir / f"{run_id}{LINE_INDEX_SUFFIX}.tmp"
+        offset = 0
+        with tmp.open("wb") as index:
+            for line in self.iter_lines(slug, run_id):
+                try:
+                    event_type = json.loads(line).get("type", "")
+                except (ValueError, AttributeError):
+                    event_type = ""
+                index.write(_LINE_RECORD.pack(offset, len(line) + 1, zlib.crc32(event_type.encode("utf-8"))))
+                offset += len(line) + 1
+        os.replace(tmp, runs_dir / f"{run_id}{LINE_INDEX_SUFFIX}")
+
+    def _segment_spans(self, slug: str, run_id: str) -> list[tuple[int, int, Path]]:
+        spans = []
+        position = 0
+        for path in self.segment_paths(slug, run_id):
+            size = SeekableGzipReader(path).size if path.suffix == ".gz" else path.stat().st_size
+            spans.append((position, position + size, path))
+            position += size
+        return spans
+
+    def _read_logical(self, spans: list[tuple[int, int, Path]], start: int, end: int) -> bytes:
+        parts = []
+        for span_start, span_end, path in spans:
+            if span_end <= start or span_start >= end:
+                continue
+            lo, hi = max(start, span_start) - span_start, min(end, span_end) - span_start
+            if path.suffix == ".gz":
+                parts.append(SeekableGzipReader(path).read_range(lo, hi))
+            else:
+                with path.open("rb") as file:
+                    file.seek(lo)
+                    parts.append(file.read(hi - lo))
+        return b"".join(parts)
+
+    def read_events(
+        self,
+        slug: str,
+        run_id: str,
+        *,
+        types: set[str] | None = None,
+        offset: int = 0,
+        limit: int = 100,
+        reverse: bool = False,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """A page of a run's events and the number matching *types*.
+
+        With *reverse* the page counts from the newest event and comes back
+        newest first, so ``reverse=True, limit=200`` is a tail.  Only the line
+        index and the selected byte ranges are read.
+        """
+        path = self.runs_dir(slug) / f"{run_id}{LINE_INDEX_SUFFIX}"
+        if not path.exists():
+            self.build_line_index(slug, run_id)
+        if not path.exists():
+            return [], 0
+        data = path.read_bytes()
+        records = list(_LINE_RECORD.iter_unpack(data[: len(data) - len(data) % _LINE_RECORD.size]))
+        if types:
+            codes = {zlib.crc32(event_type.encode("utf-8")) for event_type in types}
+            records = [record for record in records if record[2] in codes]
+        total = len(records)
+        if reverse:
+            records = records[::-1]
+        page = records[offset : offset + limit]
+        if not page:
+            return [], total
+
+        # Read runs of adjacent lines with one range each.
+        spans = self._segment_spans(slug, run_id)
+        by_offset: dict[int, bytes] = {}
+        ordered = sorted(page)
+        group = [ordered[0]]
+        for record in [*ordered[1:], None]:
+            if record is not None and record[0] == group[-1][0] + group[-1][1]:
+                group.append(record)
+                continue
+            blob = self._read_logical(spans, group[0][0], group[-1][0] + group[-1][1])
+            for start, length, _ in group:
+                by_offset[start] = blob[start - group[0][0] : start - group[0][0] + length]
+            if record is not None:
+                group = [record]
+
+        events = []
+        for start, _, _ in page:
+            try:
+                event = json.loads(by_offset[start])
+            except ValueError:
+                logger.warning("Line index of run %s points at a corrupt line", run_id)
+                continue
+            # A CRC collision is possible in principle; the real type decides.
+            if not types or event.get("type") in types:
+                events.append(event)
+        return events, total
+
+    def read_last_message(self, slug: str, run_id: str) -> str | None:
+        runs_dir = self.runs_dir(slug)
+        plain = runs_dir / f"{run_id}.last.txt"
+        if plain.exists():
+            return plain.read_text(encoding="utf-8").strip()
+        compressed = plain.with_name(plain.name + ".gz")
+        if compressed.exists():
+            with gzip.open(compressed, "rt", encoding="utf-8") as file:
+                return file.read().strip()
+        return None
+
+    def find_run(self, run_id: str) -> str | None:
+        """Return the slug of the game that has logs for *run_id*, if any."""
+        if not RUN_ID_PATTERN.match(run_id):
+            return None
+        for path in self.storage.games_dir.glob(f"*/.runs/{run_id}.*"):
+            return path.parent.parent.name
+        return None
+
+    # --- Retention ---
+
+    def _group_by_run(self, runs_dir: Path) -> dict[str, _RunFiles]:
+        groups: dict[str, _RunFiles] = {}
+        for path in runs_dir.iterdir():
+            run_id = path.name.split(".", 1)[0]
+            if not RUN_ID_PATTERN.match(run_id):
+                continue
+            group = groups.setdefault(run_id, _RunFiles(run_id))
+            # Leftover spill directories count too; children come before their folder.
+            for file in [*path.rglob("*"), path] if path.is_dir() else [path]:
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    continue  # a compression temp file that just got renamed
+                group.paths.append(file)
+                group.size += stat.st_size
+                group.newest = max(group.newest, stat.st_mtime)
+        return groups
+
+    def _run_started(self, slug: str, run_id: str) -> float | None:
+        for event in self.iter_events(slug, run_id):
+            timestamp = event.get("timestamp")
+            if isinstance(timestamp, str):
+                try:
+                    return datetime.fromisoformat(timestamp).timestamp()
+                except ValueError:
+                    return None
+            return None
+        return None
+
+    def enforce_retention(self, slug: str, *, keep: set[str]) -> list[str]:
+        """Delete the oldest runs (and blobs only they used) until the folder fits the budget.
+
+        Runs in *keep* and the newest run are never deleted.
+        """
+        if not self.budget_bytes:
+            return []
+        try:
+            runs_dir = self.runs_dir(slug)
+        except GameNotFoundError:
+            return []
+        if not runs_dir.is_dir():
+            return []
+
+        groups = self._group_by_run(runs_dir)
+        blobs_dir = runs_dir / "blobs"
+        blobs = [(path, path.stat()) for path in blobs_dir.iterdir()] if blobs_dir.is_dir() else []
+        total = sum(group.size for group in groups.values()) + sum(stat.st_size for _, stat in blobs)
+        if total <= self.budget_bytes:
+            return []
+
+        # Each blob with its index: last referenced (mtime) and bytes freed by deleting it.
+        sizes = {path: stat.st_size for path, stat in blobs}
+        blob_files = {
+            path: (stat.st_mtime, stat.st_size + sizes.get(index_path(path), 0))
+            for path, stat in blobs
+            if path.suffix == ".gz"
+        }
+
+        starts: dict[str, float | None] = {}
+
+        def blob_cutoff(retained: list[_RunFiles]) -> float | None:
+            # Blobs have their mtime refreshed on every reuse, so one older than
+            # the start of the oldest retained run is not referenced by any of them.
+            for group in retained:
+                if group.run_id not in starts:
+                    starts[group.run_id] = self._run_started(slug, group.run_id)
+            known = [starts[group.run_id] for group in retained]
+            return None if None in known else min(known)
+
+        removed: list[str] = []
+        unused_blobs: list[Path] = []
+        retained = sorted(groups.values(), key=lambda group: group.newest)
+        # The newest run is never pruned, so a game whose blobs alone exceed
+        # the budget keeps its latest history.
+        while total > self.budget_bytes and len(retained) > 1:
+            candidate = next((group for group in retained[:-1] if group.run_id not in keep), None)
+            if candidate is None:
+                break
+            retained.remove(candidate)
+            for path in sorted(candidate.paths, key=lambda path: len(path.parts), reverse=True):
+                if path.is_dir():
+                    path.rmdir()
+                else:
+                    path.unlink(missing_ok=True)
+            total -= candidate.size
+            removed.append(candidate.run_id)
+
+            cutoff = blob_cutoff(retained)
+            if cutoff is not None:
+                for path, (mtime, size) in list(blob_files.items()):
+                    if mtime < cutoff:
+                        del blob_files[path]
+                        unused_blobs.append(path)
+                        total -= size
+
+        for path in unused_blobs:
+            path.unlink(missing_ok=True)
+            index_path(path).unlink(missing_ok=True)
+
+        if removed:
+            logger.info("Pruned %d run(s) from %s to stay under %d bytes", len(removed), slug, self.budget_bytes)
+        return removed
@@ -1,20 +1,48 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import json
 import logging
 import os
+import time
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Optional
-
+from typing import Any, Awaitable, Callable, Optional
+
+from . import metrics
+from .blobs import BlobStore
+from .card_placeholder import render_placeholder_card
+from .codex_sessions import CodexSessionStore
+from .codex_stream import DEFAULT_SPILL_THRESHOLD, CodexLineReader, Frame, SpilledLine, parse_frame
+from .concurrency import ConcurrencyController
+from .conversations import ConversationStore
+from .jobs import DEFAULT_MAX_CONCURRENT, AuxJobCoordinator
 from .models import ChatMessage, RunStatus
+from .prompt_templates import GAME_PROMPT, SESSION_SEED_PROMPT
+from .prompting import (
+    build_game_prompt,
+    build_session_seed_prompt,
+    generate_card_image,
+    generate_title,
+    local_title,
+)
+from .replay import TRACE_SUFFIX, TraceRecorder
+from .run_index import RunIndex
+from .run_logs import RunLogStore
+from .run_timings import RunTimings, TokenUsage, ToolCallTiming, ToolTimingStats
+from .storage import UNTITLED_TITLE, GameNotFoundError, GameStorage
+from .tracing import NOOP_SPAN, Span, tracer
 
 logger = logging.getLogger(__name__)
-from .prompting import build_game_prompt, generate_card_image, generate_title
-from .storage import GameNotFoundError, GameStorage
+
+
+def _record_and_parse(recorder: TraceRecorder | None, frame: Frame) -> Any:
+    if recorder:
+        recorder.record(frame)
+    return parse_frame(frame)
 
 
 @dataclass
@@ -31,11 +59,26 @@ class RunState:
     process: asyncio.subprocess.Process | None = None
     return_code: int | None = None
     last_message: str | None = None
+    # Latest agent message seen in the stream (resumed sessions write no last-message file).
+    last_response: str | None = None
+    # Set when the context came from the stored conversation; the run's
+    # reply is then appended to it.
+    conversation_version: int | None = None
     session_id: str | None = None
+    # Session this run's fresh one replaces, and why ("turns" or "tokens").
+    rotated_from: str | None = None
+    rotation_reason: str | None = None
     error: str | None = None
     cancelled: bool = False
+    # Set once run_finished has been emitted.
+    finished: bool = False
     subscribers: set[asyncio.Queue] = field(default_factory=set)
     backlog: list[dict[str, Any]] = field(default_factory=list)
+    timings: RunTimings = field(default_factory=RunTimings)
+    # Template ID of the prompt sent to Codex, or "resume" for a resumed session.
+    prompt_layout: str = ""
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    trace_span: Span = field(default_factory=lambda: NOOP_SPAN)
 
     def subscribe(self) -> asyncio.Queue:
         queue: asyncio.Queue = asyncio.Queue()
@@ -58,6 +101,16 @@ class RunManager:
         codex_model: str | None,
         title_model: str,
         image_model: str,
+        concurrency: ConcurrencyController | None = None,
+        concurrency_interval_seconds: float = 5.0,
+        record_traces: bool = False,
+        line_spill_bytes: int = DEFAULT_SPILL_THRESHOLD,
+        run_logs: RunLogStore | None = None,
+        conversations: ConversationStore | None = None,
+        sessions: CodexSessionStore | None = None,
+        card_draft_quality: str | None = "low",
+        title_budget_seconds: float = 3.0,
+        aux_job_concurrency: int = DEFAULT_MAX_CONCURRENT,
     ) -> None:
         self.storage = storage
         self.project_root = project_root
@@ -65,39 +118,86 @@ class RunManager:
         self.codex_model = codex_model
         self.title_model = title_model
         self.image_model = image_model
+        self.card_draft_quality = card_draft_quality
+        self.title_budget_seconds = title_budget_seconds
+        self.jobs = AuxJobCoordinator(max_concurrent=aux_job_concurrency)
+        self.concurrency = concurrency or ConcurrencyController()
+        self.concurrency_interval_seconds = concurrency_interval_seconds
+        self.record_traces = record_traces
+        self.line_spill_bytes = line_spill_bytes
+        self.run_logs = run_logs or RunLogStore(storage)
+        self.run_index = RunIndex(self.run_logs)
+        self.conversations = conversations or ConversationStore(storage)
+        self.sessions = sessions or CodexSessionStore(storage)
 
         self._runs: dict[str, RunState] = {}
-        self._queue: Optional[asyncio.Queue[str]] = None
+        self.tool_stats = ToolTimingStats()
+        # Run IDs waiting for a slot, in enqueue order.
+        self._pending: list[str] = []
+        self._active: dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
         self._lock: Optional[asyncio.Lock] = None
         self._worker_task: Optional[asyncio.Task] = None
+        self._controller_task: Optional[asyncio.Task] = None
+        # Log compression jobs; referenced here so they are not garbage-collected mid-flight.
+        self._log_tasks: set[asyncio.Task] = set()
+        self._index_flush: Optional[asyncio.Task] = None
 
     async def start(self) -> None:
-        if self._queue is None:
-            self._queue = asyncio.Queue()
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
         if self._lock is None:
             self._lock = asyncio.Lock()
         if self._worker_task and not self._worker_task.done():
             return
         self._worker_task = asyncio.create_task(self._worker_loop())
+        self._controller_task = asyncio.create_task(self._controller_loop())
+        self._register_metrics()
 
     async def shutdown(self) -> None:
-        if not self._worker_task:
-            return
-        self._worker_task.cancel()
-        try:
-            await self._worker_task
-        except asyncio.CancelledError:
-            pass
+        tasks = [
+            task
+            for task in (self._worker_task, self._controller_task, *self._active.values())
+            if task is not None
+        ]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.jobs.shutdown()
+        # Let in-flight log compression finish rather than leave a .tmp behind.
+        if self._log_tasks:
+            await asyncio.gather(*self._log_tasks, return_exceptions=True)
 
     async def enqueue(
         self,
         *,
         slug: str,
         prompt: str,
-        chat_context: list[ChatMessage],
+        chat_context: list[ChatMessage] | None = None,
+        conversation_version: int | None = None,
     ) -> RunState:
+        """Queue a run for *slug*.
+
+        Without *chat_context*, *prompt* is appended to the game's stored
+        conversation, which then serves as the context; *conversation_version*
+        is the version the client expects it to be at
+        (:class:`ConversationConflictError` if it is not).
+        """
         self.storage.game_dir(slug)
 
+        stored_version: int | None = None
+        if chat_context is None:
+            stored_version, chat_context = await asyncio.to_thread(
+                self.conversations.append,
+                slug,
+                [ChatMessage(role="user", content=prompt)],
+                expected_version=conversation_version,
+            )
+
         run = RunState(
             run_id=uuid.uuid4().hex,
             slug=slug,
@@ -105,22 +205,53 @@ class RunManager:
             chat_context=chat_context,
             status=RunStatus.queued,
             created_at=datetime.now(timezone.utc),
+            conversation_version=stored_version,
+        )
+        # Root span for the whole run. Under the generate request it joins
+        # that request's trace (the client's traceparent, or a fresh ID);
+        # the run ID is only used as the trace ID when enqueued outside one.
+        run.trace_span = tracer.start_span(
+            "run",
+            trace_id=run.run_id,
+            attributes={"run.id": run.run_id, "game.slug": slug},
         )
 
-        if self._lock is None or self._queue is None:
+        if self._lock is None or self._wakeup is None:
             raise RuntimeError("RunManager must be started before enqueue")
 
-        async with self._lock:
-            self._runs[run.run_id] = run
-            await self._queue.put(run.run_id)
-            self._refresh_queue_positions_locked()
+        with tracer.span("enqueue", parent=run.trace_span):
+            async with self._lock:
+                self._runs[run.run_id] = run
+                self._pending.append(run.run_id)
+                self._refresh_queue_positions_locked()
+            self._wakeup.set()
 
-        await self._emit(run, "status", {"status": RunStatus.queued.value})
+        queued_payload: dict[str, Any] = {"status": RunStatus.queued.value}
+        if tracer.enabled:
+            queued_payload["traceId"] = run.trace_span.trace_id
+        await self._emit(run, "status", queued_payload)
         return run
 
     def get_run(self, run_id: str) -> RunState | None:
         return self._runs.get(run_id)
 
+    def busy_slugs(self) -> set[str]:
+        """Games with a queued or running run."""
+        return {
+            run.slug
+            for run in self._runs.values()
+            if run.status in (RunStatus.queued, RunStatus.running)
+        }
+
+    def concurrency_status(self) -> dict[str, Any]:
+        """Current slot limit, occupancy and the reason behind the last decision."""
+        status = self.concurrency.decision.to_dict()
+        status["active"] = len(self._active)
+        status["queued"] = len(self._pending)
+        status["activeRunIds"] = list(self._active)
+        status["auxJobs"] = self.jobs.snapshot()
+        return status
+
     async def cancel(self, run_id: str) -> RunState | None:
         run = self._runs.get(run_id)
         if not run:
@@ -131,6 +262,9 @@ class RunManager:
 
         run.cancelled = True
 
+        if self._lock is None or self._wakeup is None:
+            raise RuntimeError("RunManager lock is not initialized")
+
         if run.status == RunStatus.running:
             if run.process:
                 run.process.terminate()
@@ -139,6 +273,13 @@ class RunManager:
 
         run.status = RunStatus.cancelled
         run.finished_at = datetime.now(timezone.utc)
+        run.timings.mark("finished")
+        async with self._lock:
+            if run_id in self._pending:
+                self._pending.remove(run_id)
+            self._refresh_queue_positions_locked()
+        # Runs queued behind this one may be able to start now.
+        self._wakeup.set()
         await self._emit(run, "status", {"status": RunStatus.cancelled.value})
         await self._emit(
             run,
@@ -147,37 +288,119 @@ class RunManager:
                 "status": RunStatus.cancelled.value,
                 "returnCode": None,
                 "lastMessage": run.last_message,
+                "timings": run.timings.to_dict(),
+                **self._conversation_fields(run),
             },
         )
-
-        if self._lock is None:
-            raise RuntimeError("RunManager lock is not initialized")
-
-        async with self._lock:
-            self._refresh_queue_positions_locked()
-
         return run
 
+    def _register_metrics(self) -> None:
+        metrics.QUEUE_DEPTH.set_function(lambda: len(self._pending))
+        metrics.ACTIVE_RUNS.set_function(lambda: len(self._active))
+        metrics.RUN_SLOTS.set_function(lambda: self.concurrency.limit)
+        metrics.SSE_SUBSCRIBERS.set_function(
+            lambda: sum(len(run.subscribers) for run in self._runs.values())
+        )
+
     async def _worker_loop(self) -> None:
         while True:
-            if self._queue is None or self._lock is None:
+            if self._wakeup is None or self._lock is None:
                 raise RuntimeError("RunManager queue is not initialized")
 
-            run_id = await self._queue.get()
-            run = self._runs.get(run_id)
-            if not run:
-                continue
-
-            if run.status == RunStatus.cancelled:
-                continue
+            await self._wakeup.wait()
+            self._wakeup.clear()
 
             async with self._lock:
+                self._dispatch_locked()
                 self._refresh_queue_positions_locked()
 
-            await self._execute_run(run)
+    async def _controller_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.concurrency_interval_seconds)
+            if self._lock is None or self._wakeup is None:
+                raise RuntimeError("RunManager queue is not initialized")
 
             async with self._lock:
-                self._refresh_queue_positions_locked()
+                previous = self.concurrency.limit
+                self.concurrency.evaluate(
+                    active=len(self._active),
+                    queued=len(self._pending),
+                )
+                if self.concurrency.limit > previous:
+                    self._wakeup.set()
+
+    def _dispatch_locked(self) -> None:
+        """Start queued runs until every slot is taken.
+
+        Runs for a game that already has an active run stay queued, so two
+        Codex processes never edit the same folder at once.
+        """
+        busy_slugs = {self._runs[run_id].slug for run_id in self._active}
+        remaining: list[str] = []
+
+        for run_id in self._pending:
+            run = self._runs.get(run_id)
+            if not run or run.status == RunStatus.cancelled:
+                continue
+            if len(self._active) >= self.concurrency.limit or run.slug in busy_slugs:
+                remaining.append(run_id)
+                continue
+            busy_slugs.add(run.slug)
+            self._active[run_id] = asyncio.create_task(self._run_slot(run))
+
+        self._pending = remaining
+
+    async def _run_slot(self, run: RunState) -> None:
+        tracer.record_span(
+            "queue_wait",
+            start_ns=int(run.created_at.timestamp() * 1e9),
+            end_ns=time.time_ns(),
+            parent=run.trace_span,
+        )
+        try:
+            # Cancelled between being dispatched and this task starting.
+            if run.status != RunStatus.cancelled:
+                with tracer.span("execute_run", parent=run.trace_span):
+                    await self._execute_run(run)
+        except Exception as exc:
+            logger.exception("Run %s crashed", run.run_id)
+            await self._fail_run(run, exc)
+        finally:
+            if run.started_at and run.finished_at and run.status == RunStatus.completed:
+                self.concurrency.record_run_duration(
+                    (run.finished_at - run.started_at).total_seconds()
+                )
+            if self._lock is not None and self._wakeup is not None:
+                async with self._lock:
+                    self._active.pop(run.run_id, None)
+                self._wakeup.set()
+
+    async def _fail_run(self, run: RunState, exc: Exception) -> None:
+        """Finish a run whose execution raised, so it never stays ``running``."""
+        if run.finished:
+            return
+        if run.process and run.process.returncode is None:
+            run.process.kill()
+        run.status = RunStatus.failed
+        run.error = run.error or f"Internal error: {exc}"
+        run.finished_at = datetime.now(timezone.utc)
+        run.timings.mark("finished")
+        try:
+            await self._emit(run, "error", {"message": run.error})
+            await self._emit(
+                run,
+                "run_finished",
+                {
+                    "status": run.status.value,
+                    "returnCode": run.process.returncode if run.process else None,
+                    "lastMessage": run.last_message,
+                    "error": run.error,
+                    "timings": run.timings.to_dict(),
+                    **self._conversation_fields(run),
+                },
+            )
+        except Exception:
+            logger.exception("Could not finish crashed run %s", run.run_id)
 
     async def _execute_run(self, run: RunState) -> None:
         run_dir = self.storage.game_dir(run.slug)
@@ -186,17 +409,40 @@ class RunManager:
 
         run.status = RunStatus.running
         run.started_at = datetime.now(timezone.utc)
+        run.timings.mark("started")
         run.queue_position = None
         await self._emit(run, "status", {"status": RunStatus.running.value})
 
         # Check whether we can resume an existing Codex session for this game.
-        existing_session_id = self._load_session_id(run.slug)
+        session = await asyncio.to_thread(self.sessions.current, run.slug)
+        rotation = self.sessions.rotation_reason(session) if session else None
+        existing_session_id = session.session_id if session and not rotation else None
 
         if existing_session_id:
             # Resume: send only the user's latest message; Codex already has
             # the full conversation history.
             game_prompt = run.prompt.strip()
+            run.prompt_layout = "resume"
             last_message_path: Path | None = None
+        elif session and rotation:
+            # The session has grown too large to resume cheaply: start a
+            # fresh one seeded with a compact summary of where things stand.
+            game_prompt = build_session_seed_prompt(
+                prompt=run.prompt,
+                chat_context=run.chat_context,
+                files=await asyncio.to_thread(self._list_game_files, run_dir),
+                last_reply=session.last_reply,
+            )
+            run.prompt_layout = SESSION_SEED_PROMPT.id
+            run.rotated_from = session.session_id
+            run.rotation_reason = rotation
+            last_message_path = runs_dir / f"{run.run_id}.last.txt"
+            metrics.CODEX_SESSION_ROTATIONS.inc(reason=rotation)
+            await self._emit(
+                run,
+                "session_rotated",
+                {"reason": rotation, "previousSession": session.to_dict()},
+            )
         else:
             # New session: build the full prompt with system instructions and
             # prior chat context.
@@ -204,21 +450,26 @@ class RunManager:
                 prompt=run.prompt,
                 chat_context=run.chat_context,
             )
+            run.prompt_layout = GAME_PROMPT.id
             last_message_path = runs_dir / f"{run.run_id}.last.txt"
 
         # --- Launch primary game Codex process ---
+        run.timings.mark("spawn_started")
         try:
-            game_proc = await self._spawn_codex(
-                run_dir,
-                game_prompt,
-                last_message_path,
-                session_id=existing_session_id,
-            )
+            with tracer.span("spawn_codex", attributes={"codex.resume": bool(existing_session_id)}):
+                game_proc = await self._spawn_codex(
+                    run_dir,
+                    game_prompt,
+                    last_message_path,
+                    session_id=existing_session_id,
+                )
         except FileNotFoundError:
             run.status = RunStatus.failed
             run.error = f"Codex binary not found: {self.codex_bin}"
             run.finished_at = datetime.now(timezone.utc)
+            run.timings.mark("finished")
             await self._emit(run, "error", {"message": run.error})
+            await self._record_reply(run)
             await self._emit(
                 run,
                 "run_finished",
@@ -227,23 +478,36 @@ class RunManager:
                     "returnCode": None,
                     "lastMessage": None,
                     "error": run.error,
+                    "timings": run.timings.to_dict(),
+                    **self._conversation_fields(run),
                 },
             )
             return
 
+        run.timings.mark("spawned")
         run.process = game_proc
 
         # --- Generate title via OpenAI API (only for untitled games) ---
         game = self.storage.read_game(run.slug)
-        if game.title == "Untitled Game":
-            asyncio.create_task(self._generate_and_save_title(run))
+        if game.title == UNTITLED_TITLE:
+            self._submit_aux_job(run, "title", self._generate_and_save_title)
 
-        # --- Generate card image via OpenAI Images API (only when missing) ---
-        if not game.imageUrl:
-            asyncio.create_task(self._generate_and_save_card_image(run))
+        # --- Generate card image via OpenAI Images API (missing or not final) ---
+        # Detached: an image render is slow and paid for, so a cancelled run
+        # still gets its card (and the result lands in the generation cache).
+        if not game.imageUrl or game.cardStage in ("placeholder", "draft"):
+            self._submit_aux_job(run, "image", self._generate_and_save_card_image, detached=True)
 
         # --- Stream the game process output to the client ---
-        stdout_task = asyncio.create_task(self._consume_stdout(run, game_proc.stdout))
+        trace_path = runs_dir / f"{run.run_id}{TRACE_SUFFIX}" if self.record_traces else None
+        stdout_task = asyncio.create_task(
+            self._consume_stdout(
+                run,
+                game_proc.stdout,
+                trace_path=trace_path,
+                spill_dir=runs_dir / f"{run.run_id}.spill",
+            )
+        )
         stderr_task = asyncio.create_task(self._consume_stderr(run, game_proc.stderr))
 
         # Wait for the game process — this is what the user cares about.
@@ -253,24 +517,37 @@ class RunManager:
 
         run.return_code = return_code
         run.finished_at = datetime.now(timezone.utc)
+        run.timings.mark("finished")
 
         if last_message_path and last_message_path.exists():
             run.last_message = last_message_path.read_text(encoding="utf-8").strip()
 
-        # Persist the session ID so the next run for this game can resume.
+        # Persist the session and its usage so the next run can resume (or rotate) it.
         if run.session_id:
-            self._save_session_id(run.slug, run.session_id)
+            await asyncio.to_thread(
+                self.sessions.record_run,
+                run.slug,
+                session_id=run.session_id,
+                run_id=run.run_id,
+                usage=run.usage,
+                reply=run.last_message or run.last_response,
+                rotated_from=run.rotated_from,
+                rotation_reason=run.rotation_reason,
+            )
 
         if run.cancelled and return_code != 0:
             run.status = RunStatus.cancelled
+            self.jobs.cancel_run(run.run_id)
         elif return_code == 0:
             run.status = RunStatus.completed
-            self.storage.touch_game(run.slug)
+            with tracer.span("touch_game"):
+                self.storage.touch_game(run.slug)
         else:
             run.status = RunStatus.failed
             if not run.error:
                 run.error = f"Codex exited with code {return_code}"
 
+        await self._record_reply(run)
         await self._emit(
             run,
             "run_finished",
@@ -279,24 +556,58 @@ class RunManager:
                 "returnCode": run.return_code,
                 "lastMessage": run.last_message,
                 "error": run.error,
+                "timings": run.timings.to_dict(),
+                "usage": run.usage.to_dict(),
+                **self._conversation_fields(run),
             },
         )
 
     # ------------------------------------------------------------------
-    # Session persistence helpers
+    # Conversation helpers
     # ------------------------------------------------------------------
 
-    def _load_session_id(self, slug: str) -> str | None:
-        """Load persisted Codex session ID for a game, if any."""
-        session_file = self.storage.game_dir(slug) / ".codex_session"
-        if session_file.exists():
-            return session_file.read_text(encoding="utf-8").strip() or None
-        return None
+    async def _record_reply(self, run: RunState) -> None:
+        """Append the run's reply, or its failure, to the stored conversation."""
+        if run.conversation_version is None:
+            return
+        reply = run.last_message or run.last_response
+        if run.status == RunStatus.failed:
+            message = ChatMessage(role="system", content=f"Generation failed: {run.error}")
+        elif reply:
+            message = ChatMessage(role="assistant", content=reply)
+        else:
+            return
+        try:
+            run.conversation_version, _ = await asyncio.to_thread(
+                self.conversations.append, run.slug, [message]
+            )
+        except (OSError, GameNotFoundError):
+            logger.exception("Could not record the reply of run %s", run.run_id)
+
+    @staticmethod
+    def _conversation_fields(run: RunState) -> dict[str, Any]:
+        if run.conversation_version is None:
+            return {}
+        return {"conversationVersion": run.conversation_version}
 
-    def _save_session_id(self, slug: str, session_id: str) -> None:
-        """Persist Codex session ID so subsequent runs can resume."""
-        session_file = self.storage.game_dir(slug) / ".codex_session"
-        session_file.write_text(session_id, encoding="utf-8")
+    # ------------------------------------------------------------------
+    # Session helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _list_game_files(game_dir: Path, limit: int = 200) -> list[str]:
+        """Visible files of the game folder with their sizes, for a session seed prompt."""
+        files = []
+        for path in sorted(game_dir.rglob("*")):
+            relative = path.relative_to(game_dir)
+            if any(part.startswith(".") or part == "node_modules" for part in relative.parts):
+                continue
+            if path.is_file():
+                files.append(f"{relative.as_posix()} ({path.stat().st_size} bytes)")
+                if len(files) == limit:
+                    files.append("... (more files not listed)")
+                    break
+        return files
 
     # ------------------------------------------------------------------
     # Codex subprocess helpers
@@ -361,62 +672,204 @@ class RunManager:
 
         return process
 
+    def _submit_aux_job(
+        self,
+        run: RunState,
+        kind: str,
+        job: Callable[[RunState], Awaitable[None]],
+        *,
+        detached: bool = False,
+    ) -> None:
+        """Start a side job for the run through the coordinator, or join the game's live one.
+
+        Either way the run's event stream gets ``aux_job`` status events and
+        the job's ``metadata_updated`` events.
+        """
+
+        async def report(event_type: str, payload: dict[str, Any]) -> None:
+            await self._emit(run, event_type, payload)
+
+        self.jobs.submit(
+            kind,
+            slug=run.slug,
+            run_id=run.run_id,
+            work=lambda: job(run),
+            listener=report,
+            detached=detached,
+        )
+
     async def _generate_and_save_title(self, run: RunState) -> None:
-        """Generate a game title via the OpenAI API and write it to game.json."""
-        try:
-            title = await generate_title(
+        """Generate a game title via the OpenAI API and write it to game.json.
+
+        When the API has not answered within ``title_budget_seconds``, a
+        local keyword title is written first and upgraded once the API
+        responds, unless the game was renamed in between.
+        """
+        started = time.perf_counter()
+        request = asyncio.ensure_future(
+            generate_title(
                 prompt=run.prompt,
                 chat_context=run.chat_context,
                 model=self.title_model,
             )
-            self.storage.update_title(run.slug, title)
-            await self._emit(run, "metadata_updated", {"task": "title"})
+        )
+        local: str | None = None
+        try:
+            with tracer.span("generate_title", parent=run.trace_span):
+                done, _ = await asyncio.wait({request}, timeout=self.title_budget_seconds)
+                if not done:
+                    candidate = local_title(run.prompt)
+                    if candidate != UNTITLED_TITLE and self.storage.update_title(
+                        run.slug, candidate, source="local", expected=UNTITLED_TITLE
+                    ):
+                        local = candidate
+                        await self._announce(run, "title", {"task": "title", "source": "local"})
+                title = await request
+                updated = self.storage.update_title(
+                    run.slug, title, source="generated", expected=local or UNTITLED_TITLE
+                )
+            if updated is None:
+                metrics.TITLE_OUTCOMES.inc(outcome="renamed")
+                logger.info("Kept the title of slug=%s, which was renamed during generation", run.slug)
+            else:
+                metrics.TITLE_OUTCOMES.inc(outcome="upgraded" if local else "api")
+                await self._announce(run, "title", {"task": "title", "source": "generated"})
         except Exception:
+            if local:
+                metrics.TITLE_OUTCOMES.inc(outcome="local")
+            metrics.AUX_JOB_FAILURES.inc(job="title")
+            metrics.AUX_JOB_SECONDS.observe(time.perf_counter() - started, job="title", outcome="error")
             logger.exception("Title generation failed for slug=%s", run.slug)
+            raise
+        else:
+            metrics.AUX_JOB_SECONDS.observe(time.perf_counter() - started, job="title", outcome="ok")
+        finally:
+            request.cancel()
 
     async def _generate_and_save_card_image(self, run: RunState) -> None:
-        """Generate a card image via the OpenAI Images API and save it to the game folder."""
+        """Give the game a card at once, then upgrade it in the background.
+
+        Stages, each followed by a ``metadata_updated`` event: a local
+        placeholder (only when the game has no card yet), an optional
+        low-quality render and the final render.  Each replaces ``card.png``
+        atomically; a draft that arrives after the final render is dropped.
+        """
+        started = time.perf_counter()
+        draft_task: asyncio.Task | None = None
         try:
             run_dir = self.storage.game_dir(run.slug)
-            output_path = run_dir / "card.png"
-            await generate_card_image(
-                prompt=run.prompt,
-                chat_context=run.chat_context,
-                output_path=output_path,
-                model=self.image_model,
-            )
-            self.storage.touch_game(run.slug)
-            await self._emit(run, "metadata_updated", {"task": "image"})
+            card_path = run_dir / "card.png"
+            game = self.storage.read_game(run.slug)
+            if not game.imageUrl:
+                with tracer.span("card_placeholder", parent=run.trace_span):
+                    image = await asyncio.to_thread(render_placeholder_card, game.title, run.prompt)
+                    tmp = run_dir / f".card.{run.run_id}.placeholder.png"
+                    await asyncio.to_thread(tmp.write_bytes, image)
+                    os.replace(tmp, card_path)
+                await self._set_card_stage(run, "placeholder")
+
+            if self.card_draft_quality:
+                draft_task = asyncio.create_task(self._render_card_draft(run, run_dir, card_path))
+            with tracer.span("generate_card_image", parent=run.trace_span):
+                await generate_card_image(
+                    prompt=run.prompt,
+                    chat_context=run.chat_context,
+                    output_path=card_path,
+                    model=self.image_model,
+                )
+            await self._set_card_stage(run, "final")
+        except asyncio.CancelledError:
+            if draft_task is not None:
+                draft_task.cancel()
+            raise
         except Exception:
+            metrics.AUX_JOB_FAILURES.inc(job="image")
+            metrics.AUX_JOB_SECONDS.observe(time.perf_counter() - started, job="image", outcome="error")
             logger.exception("Card image generation failed for slug=%s", run.slug)
+            # A draft still in flight is the best card we will get now.
+            if draft_task is not None:
+                await asyncio.gather(draft_task, return_exceptions=True)
+            raise
+        else:
+            metrics.AUX_JOB_SECONDS.observe(time.perf_counter() - started, job="image", outcome="ok")
+        finally:
+            # Pointless once the final card is in.
+            if draft_task is not None:
+                draft_task.cancel()
+                await asyncio.gather(draft_task, return_exceptions=True)
+
+    async def _render_card_draft(self, run: RunState, run_dir: Path, card_path: Path) -> None:
+        tmp = run_dir / f".card.{run.run_id}.draft.png"
+        try:
+            with tracer.span("generate_card_draft", parent=run.trace_span):
+                await generate_card_image(
+                    prompt=run.prompt,
+                    chat_context=run.chat_context,
+                    output_path=tmp,
+                    model=self.image_model,
+                    quality=self.card_draft_quality or "low",
+                )
+            # No await between the check and the swap, so the final render
+            # cannot land in between.
+            if self.storage.read_game(run.slug).cardStage == "final":
+                return
+            os.replace(tmp, card_path)
+            await self._set_card_stage(run, "draft")
+        except Exception:
+            logger.warning("Draft card render failed for slug=%s", run.slug, exc_info=True)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    async def _set_card_stage(self, run: RunState, stage: str) -> None:
+        self.storage.set_card_stage(run.slug, stage)
+        await self._announce(run, "image", {"task": "image", "stage": stage})
+
+    async def _announce(self, run: RunState, kind: str, payload: dict[str, Any]) -> None:
+        """``metadata_updated`` for every run attached to the game's *kind* job, not just the one that started it."""
+        await self.jobs.publish(run.slug, kind, "metadata_updated", payload)
 
     async def _consume_stdout(
         self,
         run: RunState,
         stream: asyncio.StreamReader | None,
+        trace_path: Path | None = None,
+        spill_dir: Path | None = None,
     ) -> None:
+        """Parse Codex JSONL from *stream*, optionally teeing raw lines to *trace_path*.
+
+        Lines larger than ``line_spill_bytes`` are spilled to *spill_dir* (a
+        temp directory when omitted) and parsed from disk; the spill files are
+        removed once the stream ends.
+        """
         if stream is None:
             return
 
-        while True:
-            line = await stream.readline()
-            if not line:
-                return
-
-            text = line.decode("utf-8", errors="replace").strip()
-            if not text:
-                continue
-
+        recorder = TraceRecorder(trace_path, run_id=run.run_id, slug=run.slug) if trace_path else None
+        reader = CodexLineReader(stream, spill_dir=spill_dir, spill_threshold=self.line_spill_bytes)
+        with tracer.span("consume_stdout") as span:
+            events = 0
             try:
-                event = json.loads(text)
-            except json.JSONDecodeError:
-                # Non-JSON line (e.g. a CLI warning) — skip, don't abort.
-                continue
-
-            if not isinstance(event, dict):
-                continue
-
-            await self._forward_codex_event(run, event)
+                async for frame in reader:
+                    try:
+                        if isinstance(frame, SpilledLine):
+                            # Megabytes of disk I/O: keep it off the event loop.
+                            event = await asyncio.to_thread(_record_and_parse, recorder, frame)
+                        else:
+                            event = _record_and_parse(recorder, frame)
+                    except (ValueError, RecursionError):
+                        # Blank or non-JSON line (e.g. a CLI warning) — skip, don't abort.
+                        continue
+
+                    if not isinstance(event, dict):
+                        continue
+
+                    events += 1
+                    await self._forward_codex_event(run, event)
+                span.set_attribute("codex.events", events)
+            finally:
+                reader.close()
+                if recorder:
+                    recorder.close()
 
     async def _forward_codex_event(
         self, run: RunState, event: dict[str, Any]
@@ -432,11 +885,19 @@ class RunManager:
 
         # --- Session / thread ID ---
         if top_type == "thread.started":
+            run.timings.mark("thread_started")
             thread_id = event.get("thread_id")
             if isinstance(thread_id, str) and thread_id:
                 run.session_id = thread_id
             return
 
+        # --- Token usage; the cached share shows how much of the prompt prefix was reused ---
+        if top_type == "turn.completed":
+            usage = TokenUsage.parse(event.get("usage"))
+            if usage is not None:
+                self._record_usage(run, usage)
+            return
+
         # --- Item events (the interesting ones) ---
         item = event.get("item")
         if not isinstance(item, dict):
@@ -457,6 +918,11 @@ class RunManager:
         # Tool call started (shell command or other execution)
         if item_type == "command_execution" and top_type == "item.started":
             command = item.get("command", "")
+            run.timings.tool_started(
+                item_id,
+                "shell_command",
+                command if isinstance(command, str) else str(command),
+            )
             await self._emit(
                 run,
                 "codex_tool_call",
@@ -473,9 +939,12 @@ class RunManager:
             output = item.get("aggregated_output", "")
             if not isinstance(output, str):
                 output = str(output)
+            blob = await self._store_tool_output(run, output)
             if len(output) > 500:
                 output = output[:500] + "\u2026"
             exit_code = item.get("exit_code")
+            run.timings.mark("first_output")
+            self._record_tool_span(run.timings.tool_completed(item_id, exit_code))
             await self._emit(
                 run,
                 "codex_tool_output",
@@ -483,6 +952,7 @@ class RunManager:
                     "callId": item_id,
                     "output": output,
                     "exitCode": exit_code,
+                    **blob,
                 },
             )
             return
@@ -496,21 +966,25 @@ class RunManager:
             if top_type == "item.started":
                 raw_input = item.get("arguments") or item.get("input") or ""
                 display = self._summarize_tool_input(name, raw_input)
+                run.timings.tool_started(item_id, name, display)
                 await self._emit(
                     run,
                     "codex_tool_call",
                     {"callId": item_id, "name": name, "input": display},
                 )
             else:
+                run.timings.mark("first_output")
+                self._record_tool_span(run.timings.tool_completed(item_id))
                 raw_output = item.get("output", "")
                 if not isinstance(raw_output, str):
                     raw_output = str(raw_output)
+                blob = await self._store_tool_output(run, raw_output)
                 if len(raw_output) > 500:
                     raw_output = raw_output[:500] + "\u2026"
                 await self._emit(
                     run,
                     "codex_tool_output",
-                    {"callId": item_id, "output": raw_output},
+                    {"callId": item_id, "output": raw_output, **blob},
                 )
             return
 
@@ -518,11 +992,49 @@ class RunManager:
         if item_type == "agent_message" and top_type == "item.completed":
             text = item.get("text", "")
             if isinstance(text, str) and text.strip():
+                run.timings.mark("first_output")
+                run.last_response = text.strip()
                 await self._emit(
                     run, "assistant_response", {"text": text.strip()}
                 )
             return
 
+    def _record_usage(self, run: RunState, usage: TokenUsage) -> None:
+        run.usage.add(usage)
+        layout = run.prompt_layout or "unknown"
+        metrics.CODEX_INPUT_TOKENS.inc(usage.input_tokens, prompt=layout)
+        metrics.CODEX_CACHED_INPUT_TOKENS.inc(usage.cached_input_tokens, prompt=layout)
+        if usage.cached_ratio is not None:
+            metrics.CODEX_CACHED_TOKEN_RATIO.observe(usage.cached_ratio, prompt=layout)
+
+    async def _store_tool_output(self, run: RunState, output: str) -> dict[str, Any]:
+        """Keep the untruncated *output* as a blob; returns the event fields referencing it."""
+        if not output:
+            return {}
+        store = BlobStore(self.storage.game_dir(run.slug) / ".runs" / "blobs")
+        try:
+            ref = await asyncio.to_thread(store.put_text, output)
+        except OSError:
+            logger.exception("Could not store tool output for run=%s", run.run_id)
+            return {}
+        return {"blobId": ref.blob_id, "blobSize": ref.size}
+
+    @staticmethod
+    def _record_tool_span(call: ToolCallTiming | None) -> None:
+        if call is None or call.finished is None:
+            return
+        end_ns = time.time_ns()
+        tracer.record_span(
+            "tool_call",
+            start_ns=end_ns - int((call.finished - call.started) * 1e9),
+            end_ns=end_ns,
+            attributes={
+                "tool.name": call.name,
+                "tool.command": call.command,
+                "tool.exit_code": call.exit_code if call.exit_code is not None else "",
+            },
+        )
+
     @staticmethod
     def _summarize_tool_input(name: str, raw_input: Any) -> str:
         """Produce a short human-readable label for a tool invocation."""
@@ -549,11 +1061,8 @@ class RunManager:
         if stream is None:
             return
 
-        while True:
-            line = await stream.readline()
-            if not line:
-                return
-
+        # Only the first line is kept, so overlong lines are cut rather than spilled.
+        async for line in CodexLineReader(stream, spill_threshold=4096, spill=False):
             text = line.decode("utf-8", errors="replace").strip()
             if not text:
                 continue
@@ -562,6 +1071,11 @@ class RunManager:
                 run.error = text
 
     async def _emit(self, run: RunState, event_type: str, payload: dict[str, Any]) -> None:
+        if run.finished:
+            # A detached side job outliving its run: the log is sealed and
+            # every stream has ended at run_finished.
+            logger.debug("Dropping %s event for finished run %s", event_type, run.run_id)
+            return
         event = {
             "type": event_type,
             "runId": run.run_id,
@@ -570,34 +1084,104 @@ class RunManager:
             "payload": payload,
         }
 
+        metrics.EVENTS_EMITTED.inc(type=event_type)
+        if event_type == "run_finished":
+            run.finished = True
+            self._observe_finished_run(run)
+
         run.backlog.append(event)
         for queue in list(run.subscribers):
             queue.put_nowait(event)
 
-        event_path = self.storage.game_dir(run.slug) / ".runs" / f"{run.run_id}.jsonl"
-        event_path.parent.mkdir(parents=True, exist_ok=True)
-        with event_path.open("a", encoding="utf-8") as file:
-            file.write(json.dumps(event) + "\n")
+        line = json.dumps(event) + "\n"
+        sealed = self.run_logs.append(run.slug, run.run_id, line, event_type)
+        self.run_index.observe(run.slug, run.run_id, event, len(line), prompt=run.prompt)
+        self._schedule_index_flush()
+        if event_type == "run_finished":
+            sealed = self.run_logs.seal(run.slug, run.run_id) or sealed
+            self._spawn_log_task(self._finish_run_logs(run, sealed))
+        elif sealed is not None:
+            self._spawn_log_task(asyncio.to_thread(self.run_logs.compress, sealed))
+
+    def _schedule_index_flush(self) -> None:
+        """Persist queued run-index records off the loop; one flusher at a time."""
+        if self._index_flush is None or self._index_flush.done():
+            self._index_flush = asyncio.create_task(self._flush_run_index())
+            self._log_tasks.add(self._index_flush)
+            self._index_flush.add_done_callback(self._log_tasks.discard)
+
+    async def _flush_run_index(self) -> None:
+        while self.run_index.has_pending:
+            try:
+                await asyncio.to_thread(self.run_index.flush)
+            except Exception:
+                logger.exception("Could not write the run index")
+                return
+
+    def _spawn_log_task(self, coro: Any) -> None:
+        task = asyncio.create_task(coro)
+        self._log_tasks.add(task)
+        task.add_done_callback(self._log_tasks.discard)
+
+    async def _finish_run_logs(self, run: RunState, sealed: Path | None) -> None:
+        """Compress a finished run's logs and prune old runs, off the event loop."""
+        active_runs = {
+            other.run_id
+            for other in self._runs.values()
+            if other.status in (RunStatus.queued, RunStatus.running)
+        }
+        try:
+            removed = await asyncio.to_thread(
+                self.run_logs.finish, run.slug, run.run_id, sealed, active_runs=active_runs
+            )
+            if removed:
+                await asyncio.to_thread(self.run_index.remove, run.slug, removed)
+            await asyncio.to_thread(self.run_index.compact, run.slug)
+        except Exception:
+            logger.exception("Could not compress logs for run=%s", run.run_id)
+
+    def _observe_finished_run(self, run: RunState) -> None:
+        self.tool_stats.record_run(run_id=run.run_id, slug=run.slug, timings=run.timings)
+        run.trace_span.set_attribute("run.status", run.status.value)
+        run.trace_span.set_status(run.status != RunStatus.failed, run.error or "")
+        run.trace_span.end()
+        status = run.status.value
+        finished_at = run.finished_at or datetime.now(timezone.utc)
+        waited_until = run.started_at or finished_at
+        metrics.RUN_WAIT_SECONDS.observe(
+            (waited_until - run.created_at).total_seconds(), status=status
+        )
+        if run.started_at:
+            metrics.RUN_DURATION_SECONDS.observe(
+                (finished_at - run.started_at).total_seconds(), status=status
+            )
 
     def _refresh_queue_positions_locked(self) -> None:
         queued_runs = sorted(
             (
                 run
-                for run in self._runs.values()
-                if run.status == RunStatus.queued and not run.cancelled
+                for run in (self._runs.get(run_id) for run_id in self._pending)
+                if run and run.status == RunStatus.queued and not run.cancelled
             ),
             key=lambda run: run.created_at,
         )
 
+        decision = self.concurrency.decision
         for index, run in enumerate(queued_runs, start=1):
             if run.queue_position == index:
                 continue
             run.queue_position = index
+            metrics.QUEUE_POSITION.observe(index)
             asyncio.create_task(
                 self._emit(
                     run,
                     "queue_position",
-                    {"position": index},
+                    {
+                        "position": index,
+                        "runSlots": self.concurrency.limit,
+                        "activeRuns": len(self._active),
+                        "reason": decision.reason,
+                    },
                 )
             )
 
@@ -607,6 +1191,17 @@ class RunManager:
                 run.queue_position = None
 
 
+async def stream_logged_events(run_logs: RunLogStore, slug: str, run_id: str, batch_size: int = 200):
+    """SSE catch-up for a run that is no longer in memory, read from its log on disk."""
+    events = run_logs.iter_events(slug, run_id)
+    while True:
+        batch = await asyncio.to_thread(lambda: list(itertools.islice(events, batch_size)))
+        if not batch:
+            return
+        for event in batch:
+            yield f"data: {json.dumps(event)}\n\n"
+
+
 async def stream_run_events(run: RunState):
     queue = run.subscribe()
     try:
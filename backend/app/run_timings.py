@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+
+def _ms(start: float | None, end: float | None) -> float | None:
+    if start is None or end is None:
+        return None
+    return round((end - start) * 1000, 1)
+
+
+@dataclass
+class ToolCallTiming:
+    call_id: str
+    name: str
+    command: str
+    started: float
+    finished: float | None = None
+    exit_code: int | None = None
+
+    @property
+    def duration_ms(self) -> float | None:
+        return _ms(self.started, self.finished)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "callId": self.call_id,
+            "name": self.name,
+            "command": self.command,
+            "durationMs": self.duration_ms,
+            "exitCode": self.exit_code,
+        }
+
+
+@dataclass
+class RunTimings:
+    """Monotonic checkpoints for one run, reported as millisecond offsets."""
+
+    enqueued: float = field(default_factory=time.monotonic)
+    started: float | None = None
+    spawn_started: float | None = None
+    spawned: float | None = None
+    thread_started: float | None = None
+    first_output: float | None = None
+    finished: float | None = None
+    tool_calls: dict[str, ToolCallTiming] = field(default_factory=dict)
+
+    def mark(self, checkpoint: str) -> None:
+        """Record *checkpoint* now, keeping the first value if it was already set."""
+        if getattr(self, checkpoint) is None:
+            setattr(self, checkpoint, time.monotonic())
+
+    def tool_started(self, call_id: str, name: str, command: str) -> None:
+        if call_id and call_id not in self.tool_calls:
+            self.tool_calls[call_id] = ToolCallTiming(
+                call_id=call_id,
+                name=name,
+                command=command[:200],
+                started=time.monotonic(),
+            )
+
+    def tool_completed(self, call_id: str, exit_code: Any = None) -> ToolCallTiming | None:
+        call = self.tool_calls.get(call_id)
+        if call is None or call.finished is not None:
+            return None
+        call.finished = time.monotonic()
+        call.exit_code = exit_code if isinstance(exit_code, int) else None
+        return call
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "queueWaitMs": _ms(self.enqueued, self.started),
+            "spawnMs": _ms(self.spawn_started, self.spawned),
+            "threadStartedMs": _ms(self.started, self.thread_started),
+            "firstOutputMs": _ms(self.started, self.first_output),
+            "runMs": _ms(self.started, self.finished),
+            "totalMs": _ms(self.enqueued, self.finished),
+            "tools": [call.to_dict() for call in self.tool_calls.values()],
+        }
+
+
+@dataclass
+class TokenUsage:
+    """Token counts summed over a run's ``turn.completed`` events."""
+
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    turns: int = 0
+
+    @staticmethod
+    def parse(usage: Any) -> "TokenUsage | None":
+        """One turn's usage from a ``turn.completed`` payload, or ``None`` if it has none."""
+        if not isinstance(usage, dict):
+            return None
+
+        def count(key: str) -> int:
+            value = usage.get(key)
+            return value if isinstance(value, int) and value > 0 else 0
+
+        return TokenUsage(
+            input_tokens=count("input_tokens"),
+            cached_input_tokens=count("cached_input_tokens"),
+            output_tokens=count("output_tokens"),
+            turns=1,
+        )
+
+    def add(self, other: "TokenUsage") -> None:
+        self.input_tokens += other.input_tokens
+        self.cached_input_tokens += other.cached_input_tokens
+        self.output_tokens += other.output_tokens
+        self.turns += other.turns
+
+    @property
+    def cached_ratio(self) -> float | None:
+        """Share of input tokens the provider served from its prompt cache."""
+        if not self.input_tokens:
+            return None
+        return min(1.0, self.cached_input_tokens / self.input_tokens)
+
+    def to_dict(self) -> dict[str, Any]:
+        ratio = self.cached_ratio
+        return {
+            "inputTokens": self.input_tokens,
+            "cachedInputTokens": self.cached_input_tokens,
+            "outputTokens": self.output_tokens,
+            "turns": self.turns,
+            "cachedRatio": round(ratio, 4) if ratio is not None else None,
+        }
+
+
+class ToolTimingStats:
+    """Slowest tool calls and per-command aggregates across runs since startup."""
+
+    def __init__(self, *, keep_slowest: int = 200, max_commands: int = 2000) -> None:
+        self.keep_slowest = keep_slowest
+        self.max_commands = max_commands
+        # Min-heap of (durationMs, sequence, entry) holding the slowest calls.
+        self._slowest: list[tuple[float, int, dict[str, Any]]] = []
+        self._sequence = 0
+        self._by_command: dict[str, dict[str, Any]] = {}
+
+    def record_run(self, *, run_id: str, slug: str, timings: RunTimings) -> None:
+        for call in timings.tool_calls.values():
+            duration = call.duration_ms
+            if duration is None:
+                continue
+            self._record_call(run_id, slug, call, duration)
+
+    def _record_call(self, run_id: str, slug: str, call: ToolCallTiming, duration: float) -> None:
+        entry = {**call.to_dict(), "runId": run_id, "slug": slug}
+        self._sequence += 1
+        item = (duration, self._sequence, entry)
+        if len(self._slowest) < self.keep_slowest:
+            heapq.heappush(self._slowest, item)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+        stats = self._by_command.get(call.command)
+        if stats is None:
+            if len(self._by_command) >= self.max_commands:
+                return
+            stats = self._by_command[call.command] = {
+                "command": call.command,
+                "name": call.name,
+                "count": 0,
+                "totalMs": 0.0,
+                "maxMs": 0.0,
+                "failures": 0,
+            }
+        stats["count"] += 1
+        stats["totalMs"] += duration
+        stats["maxMs"] = max(stats["maxMs"], duration)
+        if call.exit_code not in (None, 0):
+            stats["failures"] += 1
+
+    def slowest_calls(self, limit: int) -> list[dict[str, Any]]:
+        return [entry for _, _, entry in heapq.nlargest(limit, self._slowest)]
+
+    def slowest_commands(self, limit: int) -> list[dict[str, Any]]:
+        ranked = sorted(self._by_command.values(), key=lambda stats: stats["maxMs"], reverse=True)
+        return [
+            {
+                **stats,
+                "totalMs": round(stats["totalMs"], 1),
+                "meanMs": round(stats["totalMs"] / stats["count"], 1),
+            }
+            for stats in ranked[:limit]
+        ]
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterator
+
+# Uncompressed bytes per gzip member; a random read decompresses at most one extra frame.
+DEFAULT_FRAME_SIZE = 64 * 1024
+INDEX_SUFFIX = ".idx"
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+class SeekableGzipWriter:
+    """Write a gzip file as a series of independent members ("frames").
+
+    The result is an ordinary gzip file (``zcat`` reads it), but because each
+    frame starts a fresh deflate stream, a reader holding the frame offsets
+    can start decompressing anywhere.  The offsets go to a ``.idx`` sidecar
+    on :meth:`close`; single-frame files get no sidecar.
+    """
+
+    def __init__(self, path: Path, *, frame_size: int = DEFAULT_FRAME_SIZE, level: int = 6) -> None:
+        self.path = path
+        self.frame_size = frame_size
+        self.level = level
+        self.size = 0
+        self._file = path.open("wb")
+        self._pending = bytearray()
+        # (uncompressed offset, compressed offset) of every frame.
+        self._frames: list[tuple[int, int]] = []
+        self._compressed = 0
+
+    def write(self, data: bytes) -> None:
+        self._pending += data
+        while len(self._pending) >= self.frame_size:
+            self._flush_frame(bytes(self._pending[: self.frame_size]))
+            del self._pending[: self.frame_size]
+
+    def _flush_frame(self, data: bytes) -> None:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        member = compressor.compress(data) + compressor.flush()
+        self._frames.append((self.size, self._compressed))
+        self._file.write(member)
+        self.size += len(data)
+        self._compressed += len(member)
+
+    def close(self) -> None:
+        if self._pending or not self._frames:
+            self._flush_frame(bytes(self._pending))
+            self._pending.clear()
+        self._file.close()
+        if len(self._frames) > 1:
+            index = {"frameSize": self.frame_size, "size": self.size, "frames": self._frames}
+            tmp = index_path(self.path).with_name(index_path(self.path).name + ".tmp")
+            tmp.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, index_path(self.path))
+
+    def __enter__(self) -> "SeekableGzipWriter":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+class SeekableGzipReader:
+    """Random-access reads over a file written by :class:`SeekableGzipWriter`.
+
+    Without a sidecar (single frame, or a plain gzip file) reads fall back to
+    decompressing from the start, which is still streaming and bounded.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._starts: list[int] = [0]
+        self._offsets: list[int] = [0]
+        self._size: int | None = None
+        try:
+            index = json.loads(index_path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self._starts = [start for start, _ in index["frames"]]
+        self._offsets = [offset for _, offset in index["frames"]]
+        self._size = index["size"]
+
+    @property
+    def size(self) -> int:
+        """Uncompressed size; computed by a full pass when there is no index."""
+        if self._size is None:
+            self._size = sum(len(chunk) for chunk in self._decompress_from(0))
+        return self._size
+
+    def _decompress_from(self, frame: int) -> Iterator[bytes]:
+        with self.path.open("rb") as file:
+            file.seek(self._offsets[frame])
+            decompressor = zlib.decompressobj(31)
+            while True:
+                raw = file.read(DEFAULT_FRAME_SIZE)
+                if not raw:
+                    break
+                while raw:
+                    chunk = decompressor.decompress(raw)
+                    if chunk:
+                        yield chunk
+                    if not decompressor.eof:
+                        break
+                    # End of one member: the rest belongs to the next one.
+                    raw = decompressor.unused_data
+                    decompressor = zlib.decompressobj(31)
+
+    def iter_range(self, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        """Yield uncompressed bytes ``[start, end)`` in chunks."""
+        frame = max(0, bisect.bisect_right(self._starts, start) - 1)
+        position = self._starts[frame]
+        for chunk in self._decompress_from(frame):
+            chunk_end = position + len(chunk)
+            if chunk_end > start:
+                lo = max(0, start - position)
+                hi = len(chunk) if end is None else min(len(chunk), end - position)
+                if hi > lo:
+                    yield chunk[lo:hi]
+            position = chunk_end
+            if end is not None and position >= end:
+                return
+
+    def read_range(self, start: int, end: int) -> bytes:
+        return b"".join(self.iter_range(start, end))
+
+    def iter_lines(self, start: int = 0) -> Iterator[bytes]:
+        """Yield newline-terminated lines from *start* without the newline."""
+        pending = b""
+        for chunk in self.iter_range(start):
+            pending += chunk
+            lines = pending.split(b"\n")
+            pending = lines.pop()
+            yield from lines
+        if pending:
+            yield pending
+
+
+def compress_file(source: Path, target: Path, *, frame_size: int = DEFAULT_FRAME_SIZE) -> None:
+    """Compress *source* into a seekable gzip at *target*, atomically.
+
+    The temp file is private to this process and thread, so concurrent
+    writers of one target never interleave; the last ``os.replace`` wins
+    with a complete file.
+    """
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with source.open("rb") as file, SeekableGzipWriter(tmp, frame_size=frame_size) as writer:
+            while chunk := file.read(frame_size):
+                writer.write(chunk)
+        if index_path(tmp).exists():
+            os.replace(index_path(tmp), index_path(target))
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+        index_path(tmp).unlink(missing_ok=True)
+
@@ -6,6 +6,11 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+from .gen_cache import default_cache_dir
+
+RUN_CONCURRENCY_MIN = 1
+RUN_CONCURRENCY_MAX = 4
+
 
 @dataclass(frozen=True)
 class Settings:
@@ -15,6 +20,53 @@ class Settings:
     codex_model: str | None
     title_model: str
     image_model: str
+    run_concurrency_min: int = RUN_CONCURRENCY_MIN
+    run_concurrency_max: int = RUN_CONCURRENCY_MAX
+    concurrency_interval_seconds: float = 5.0
+    cpu_pressure_high: float = 40.0
+    load_per_cpu_high: float = 1.5
+    mem_available_min_ratio: float = 0.15
+    run_latency_target_seconds: float = 900.0
+    trace_exporter: str = "none"
+    trace_file: Path | None = None
+    admin_token: str | None = None
+    slow_request_ms: float = 500.0
+    loop_lag_interval_ms: float = 100.0
+    loop_lag_threshold_ms: float = 100.0
+    record_codex_traces: bool = False
+    codex_line_spill_bytes: int = 1024 * 1024
+    run_log_segment_bytes: int = 8 * 1024 * 1024
+    run_log_budget_bytes: int = 256 * 1024 * 1024
+    openai_base_url: str | None = None
+    openai_timeout_seconds: float = 120.0
+    openai_chat_concurrency: int = 8
+    openai_image_concurrency: int = 2
+    openai_max_attempts: int = 4
+    generation_cache_dir: Path | None = None
+    generation_cache_ttl_seconds: float = 30 * 24 * 3600
+    generation_cache_max_bytes: int = 512 * 1024 * 1024
+    card_draft_quality: str | None = "low"
+    title_budget_seconds: float = 3.0
+    aux_job_concurrency: int = 4
+    context_token_budget: int = 3000
+    context_aux_token_budget: int = 600
+    codex_session_max_turns: int = 20
+    codex_session_max_tokens: int = 150_000
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_optional_quality(name: str, default: str) -> str | None:
+    value = os.getenv(name, default).strip().lower()
+    return None if value in ("", "none", "off") else value
 
 
 def load_settings() -> Settings:
@@ -32,4 +84,36 @@ def load_settings() -> Settings:
         codex_model=(os.getenv("CODEX_MODEL") or None),
         title_model=os.getenv("TITLE_MODEL", "gpt-4o-mini"),
         image_model=os.getenv("IMAGE_MODEL", "gpt-image-1"),
+        run_concurrency_min=_env_int("RUN_CONCURRENCY_MIN", RUN_CONCURRENCY_MIN),
+        run_concurrency_max=_env_int("RUN_CONCURRENCY_MAX", RUN_CONCURRENCY_MAX),
+        concurrency_interval_seconds=_env_float("CONCURRENCY_INTERVAL_SECONDS", 5.0),
+        cpu_pressure_high=_env_float("CPU_PRESSURE_HIGH", 40.0),
+        load_per_cpu_high=_env_float("LOAD_PER_CPU_HIGH", 1.5),
+        mem_available_min_ratio=_env_float("MEM_AVAILABLE_MIN_RATIO", 0.15),
+        run_latency_target_seconds=_env_float("RUN_LATENCY_TARGET_SECONDS", 900.0),
+        trace_exporter=os.getenv("TRACE_EXPORTER", "none").lower(),
+        trace_file=Path(os.getenv("TRACE_FILE", project_root / ".traces" / "spans.jsonl")).resolve(),
+        admin_token=(os.getenv("ADMIN_TOKEN") or None),
+        slow_request_ms=_env_float("SLOW_REQUEST_MS", 500.0),
+        loop_lag_interval_ms=_env_float("LOOP_LAG_INTERVAL_MS", 100.0),
+        loop_lag_threshold_ms=_env_float("LOOP_LAG_THRESHOLD_MS", 100.0),
+        record_codex_traces=os.getenv("RECORD_CODEX_TRACES", "").lower() in ("1", "true", "yes"),
+        codex_line_spill_bytes=_env_int("CODEX_LINE_SPILL_BYTES", 1024 * 1024),
+        run_log_segment_bytes=_env_int("RUN_LOG_SEGMENT_BYTES", 8 * 1024 * 1024),
+        run_log_budget_bytes=_env_int("RUN_LOG_BUDGET_BYTES", 256 * 1024 * 1024),
+        openai_base_url=(os.getenv("OPENAI_BASE_URL") or None),
+        openai_timeout_seconds=_env_float("OPENAI_TIMEOUT_SECONDS", 120.0),
+        openai_chat_concurrency=_env_int("OPENAI_CHAT_CONCURRENCY", 8),
+        openai_image_concurrency=_env_int("OPENAI_IMAGE_CONCURRENCY", 2),
+        openai_max_attempts=_env_int("OPENAI_MAX_ATTEMPTS", 4),
+        generation_cache_dir=default_cache_dir(project_root),
+        generation_cache_ttl_seconds=_env_float("GENERATION_CACHE_TTL_SECONDS", 30 * 24 * 3600),
+        generation_cache_max_bytes=_env_int("GENERATION_CACHE_MAX_BYTES", 512 * 1024 * 1024),
+        card_draft_quality=_env_optional_quality("CARD_DRAFT_QUALITY", "low"),
+        title_budget_seconds=_env_float("TITLE_BUDGET_SECONDS", 3.0),
+        aux_job_concurrency=_env_int("AUX_JOB_CONCURRENCY", 4),
+        context_token_budget=_env_int("CONTEXT_TOKEN_BUDGET", 3000),
+        context_aux_token_budget=_env_int("CONTEXT_AUX_TOKEN_BUDGET", 600),
+        codex_session_max_turns=_env_int("CODEX_SESSION_MAX_TURNS", 20),
+        codex_session_max_tokens=_env_int("CODEX_SESSION_MAX_TOKENS", 150_000),
     )
@@ -3,13 +3,18 @@ from __future__ import annotations
 import json
 import re
 import shutil
+import time
 from collections.abc import Iterable
 from datetime import datetime, timezone
 from pathlib import Path
 
+from . import metrics
 from .models import GameRecord
 
 
+UNTITLED_TITLE = "Untitled Game"
+
+
 class GameNotFoundError(Exception):
     pass
 
@@ -31,6 +36,7 @@ class GameStorage:
         self.games_dir.mkdir(parents=True, exist_ok=True)
 
     def list_games(self) -> list[GameRecord]:
+        started = time.perf_counter()
         self.ensure_games_dir()
         games_by_slug: dict[str, GameRecord] = {}
 
@@ -53,6 +59,9 @@ class GameStorage:
 
         games = list(games_by_slug.values())
         games.sort(key=lambda g: g.updatedAt, reverse=True)
+
+        metrics.LIST_GAMES_SECONDS.observe(time.perf_counter() - started)
+        metrics.CATALOG_SIZE.set(len(games))
         return games
 
     def create_game(self, title: str | None = None) -> GameRecord:
@@ -76,7 +85,7 @@ class GameStorage:
         timestamp = now_utc()
         metadata = {
             "slug": slug,
-            "title": normalized_title or "Untitled Game",
+            "title": normalized_title or UNTITLED_TITLE,
             "createdAt": timestamp.isoformat(),
             "updatedAt": timestamp.isoformat(),
         }
@@ -103,6 +112,7 @@ class GameStorage:
                     updatedAt=datetime.fromisoformat(data["updatedAt"]),
                     previewUrl=f"/games/{data['slug']}/index.html",
                     imageUrl=self._image_url_for_directory(game_dir, data["slug"]),
+                    cardStage=data.get("cardStage"),
                 )
 
             # Folder exists without metadata: infer and bootstrap metadata.
@@ -126,15 +136,46 @@ class GameStorage:
 
         raise GameNotFoundError(slug)
 
-    def update_title(self, slug: str, title: str) -> GameRecord:
-        """Set the game's title in game.json and bump updatedAt."""
+    def update_title(
+        self,
+        slug: str,
+        title: str,
+        *,
+        source: str | None = None,
+        expected: str | None = None,
+    ) -> GameRecord | None:
+        """Set the game's title in game.json and bump updatedAt.
+
+        With *expected*, the title is only replaced while it still equals
+        *expected*; otherwise nothing is written and ``None`` is returned.
+        *source* (``local``, ``generated``) is stored as ``titleSource``.
+        """
         game_dir = self.games_dir / slug
         metadata_path = game_dir / "game.json"
         if not metadata_path.exists():
             raise GameNotFoundError(slug)
 
         data = json.loads(metadata_path.read_text(encoding="utf-8"))
+        if expected is not None and data.get("title") != expected:
+            return None
         data["title"] = title
+        if source is not None:
+            data["titleSource"] = source
+        else:
+            data.pop("titleSource", None)
+        data["updatedAt"] = now_utc().isoformat()
+        self._write_metadata(game_dir, data)
+        return self.read_game(slug)
+
+    def set_card_stage(self, slug: str, stage: str) -> GameRecord:
+        """Record which card image stage is on disk and bump updatedAt."""
+        game_dir = self.games_dir / slug
+        metadata_path = game_dir / "game.json"
+        if not metadata_path.exists():
+            raise GameNotFoundError(slug)
+
+        data = json.loads(metadata_path.read_text(encoding="utf-8"))
+        data["cardStage"] = stage
         data["updatedAt"] = now_utc().isoformat()
         self._write_metadata(game_dir, data)
         return self.read_game(slug)
@@ -249,8 +290,12 @@ class GameStorage:
     def _image_url_for_directory(self, game_dir: Path, slug: str) -> str | None:
         for filename in self._card_image_candidates():
             candidate = game_dir / filename
-            if candidate.exists():
-                return f"/games/{slug}/{filename}"
+            try:
+                modified = candidate.stat().st_mtime_ns // 1_000_000
+            except FileNotFoundError:
+                continue
+            # Versioned so clients refetch when a card is upgraded in place.
+            return f"/games/{slug}/{filename}?v={modified}"
         return None
 
     def _image_url_for_legacy_file(self, slug: str) -> str | None:
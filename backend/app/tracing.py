@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional, Protocol, TextIO
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+
+
+@dataclass
+class Span:
+    """A single timed operation, serialised in the OTLP/JSON span layout."""
+
+    name: str
+    context: SpanContext
+    parent_span_id: str | None
+    start_ns: int
+    tracer: Optional["Tracer"] = None
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status_code: str = "STATUS_CODE_UNSET"
+    status_message: str = ""
+
+    @property
+    def trace_id(self) -> str:
+        return self.context.trace_id
+
+    @property
+    def recording(self) -> bool:
+        return self.tracer is not None and self.end_ns is None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.recording:
+            self.attributes[key] = value
+
+    def set_status(self, ok: bool, message: str = "") -> None:
+        if self.recording:
+            self.status_code = "STATUS_CODE_OK" if ok else "STATUS_CODE_ERROR"
+            self.status_message = message
+
+    def end(self, end_ns: int | None = None) -> None:
+        if not self.recording:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        assert self.tracer is not None
+        self.tracer.exporter.export(self)
+
+    def to_otlp(self) -> dict[str, Any]:
+        return {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or 0),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+
+
+# Returned by a disabled tracer: accepts every call and records nothing.
+NOOP_SPAN = Span(name="", context=SpanContext("0" * 32, "0" * 16), parent_span_id=None, start_ns=0)
+
+_current_span: ContextVar[Span] = ContextVar("current_span", default=NOOP_SPAN)
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class NoopExporter:
+    def export(self, span: Span) -> None:
+        return None
+
+    def shutdown(self) -> None:
+        return None
+
+
+class StreamExporter:
+    """Write one OTLP/JSON span per line to a text stream (stdout by default).
+
+    Spans end on the event loop, so :meth:`export` only queues the line; a
+    writer thread drains the queue and writes and flushes in batches.
+    """
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        self.stream = stream or sys.stdout
+        self._queue: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="span-exporter", daemon=True)
+        self._writer.start()
+
+    def export(self, span: Span) -> None:
+        if not self._closed:
+            self._queue.put(json.dumps(span.to_otlp()) + "\n")
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [line for line in batch if line is not None]
+            if lines and not self.stream.closed:
+                try:
+                    self.stream.write("".join(lines))
+                    self.stream.flush()
+                except (OSError, ValueError):
+                    logger.exception("Could not write %d spans", len(lines))
+            if len(lines) < len(batch):
+                return
+
+    def shutdown(self) -> None:
+        """Write out queued spans and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+
+
+class FileExporter(StreamExporter):
+    """Append spans as JSONL to *path*, ready for offline critical-path analysis."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(path.open("a", encoding="utf-8"))
+
+    def shutdown(self) -> None:
+        super().shutdown()
+        self.stream.close()
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter | None = None) -> None:
+        self.exporter: SpanExporter = exporter or NoopExporter()
+
+    @property
+    def enabled(self) -> bool:
+        return not isinstance(self.exporter, NoopExporter)
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        parent: Span | SpanContext | None = None,
+        trace_id: str | None = None,
+        start_ns: int | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Span:
+        """Start a span under *parent*, or under the current span when omitted.
+
+        *trace_id* is only used when the span turns out to be a trace root.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        if parent is None:
+            parent = _current_span.get()
+        parent_context = parent.context if isinstance(parent, Span) else parent
+        if parent_context is NOOP_SPAN.context:
+            parent_context = None
+
+        return Span(
+            name=name,
+            context=SpanContext(
+                trace_id=parent_context.trace_id if parent_context else (trace_id or os.urandom(16).hex()),
+                span_id=os.urandom(8).hex(),
+            ),
+            parent_span_id=parent_context.span_id if parent_context else None,
+            start_ns=start_ns or time.time_ns(),
+            tracer=self,
+            attributes=dict(attributes or {}),
+        )
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        *,
+        parent: Span | SpanContext | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Iterator[Span]:
+        """Run the block inside a new current span, marking it failed on exceptions."""
+        span = self.start_span(name, parent=parent, attributes=attributes)
+        with self.use_span(span):
+            try:
+                yield span
+            except BaseException as error:
+                span.set_status(False, f"{type(error).__name__}: {error}")
+                raise
+            finally:
+                span.end()
+
+    @contextmanager
+    def use_span(self, span: Span) -> Iterator[Span]:
+        """Make *span* current for the block without ending it."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    def record_span(
+        self,
+        name: str,
+        *,
+        start_ns: int,
+        end_ns: int,
+        parent: Span | SpanContext | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> None:
+        """Export a span for an interval that has already elapsed."""
+        span = self.start_span(name, parent=parent, start_ns=start_ns, attributes=attributes)
+        span.end(end_ns)
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+def current_span() -> Span:
+    return _current_span.get()
+
+
+def parse_traceparent(header: str | None) -> SpanContext | None:
+    """Parse a W3C ``traceparent`` header into a remote parent context."""
+    if not header:
+        return None
+    match = _TRACEPARENT_RE.match(header.strip().lower())
+    if not match:
+        return None
+    return SpanContext(trace_id=match.group(1), span_id=match.group(2))
+
+
+def build_exporter(name: str, path: Path) -> SpanExporter:
+    if name in ("", "none"):
+        return NoopExporter()
+    if name in ("console", "stdout"):
+        return StreamExporter()
+    if name == "file":
+        return FileExporter(path)
+    logger.warning("Unknown TRACE_EXPORTER=%r; tracing disabled", name)
+    return NoopExporter()
+
+
+tracer = Tracer()
+
+
+def configure_tracing(name: str, path: Path) -> Tracer:
+    """Point the process-wide tracer at the exporter named by ``TRACE_EXPORTER``."""
+    tracer.exporter.shutdown()
+    tracer.exporter = build_exporter(name, path)
+    return tracer
@@ -0,0 +1,92 @@
+"""Shared helpers for the benchmark scripts: result files and comparisons."""
+
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+FAKE_CODEX = Path(__file__).resolve().parent / "fake_codex.py"
+
+# Make ``app`` importable when a benchmark is run as a plain script.
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        "p50": round(pick(0.50), 3),
+        "p95": round(pick(0.95), 3),
+        "p99": round(pick(0.99), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def save_results(suite: str, results: dict[str, Any], out_dir: Path | None = None) -> Path:
+    """Write *results* with environment details to ``results/<suite>-<rev>-<time>.json``."""
+    out_dir = out_dir or RESULTS_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    revision = git_revision()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    document = {
+        "suite": suite,
+        "revision": revision,
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    path = out_dir / f"{suite}-{revision}-{stamp}.json"
+    path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    return path
+
+
+def _flatten(prefix: str, value: Any, into: dict[str, float]) -> None:
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else str(key), child, into)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        into[prefix] = float(value)
+
+
+def compare(current: dict[str, Any], baseline_path: Path) -> None:
+    """Print every numeric result next to the same metric from *baseline_path*."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    now: dict[str, float] = {}
+    before: dict[str, float] = {}
+    _flatten("", current, now)
+    _flatten("", baseline.get("results", {}), before)
+
+    print(f"\nCompared with {baseline_path.name} (revision {baseline.get('revision')}):")
+    for key in sorted(now):
+        if key not in before:
+            continue
+        old, new = before[key], now[key]
+        change = f"{(new - old) / old:+.1%}" if old else "n/a"
+        print(f"  {key:<60} {old:>14.3f} -> {new:>14.3f}  {change}")
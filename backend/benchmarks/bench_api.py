@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+End-to-end API latency benchmark over the real ASGI app.
+
+Usage:
+    cd backend
+    python benchmarks/bench_api.py [--users 20] [--duration 20] [--uvicorn] [--compare results/<file>.json]
+
+The app from create_app() runs in-process behind httpx's ASGI transport (or,
+with --uvicorn, in a local uvicorn server) with a temp GAMES_DIR and the fake
+Codex CLI.  Virtual users loop over a weighted mix of list, get, create,
+generate, stream and cancel requests; the report gives p50/p95/p99 latency
+and throughput per route.  Generation targets pre-seeded games that already
+have a title and card, so no OpenAI calls are made.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+import httpx
+from _common import BACKEND_DIR, FAKE_CODEX, compare, percentiles, save_results
+
+from app.main import create_app
+from app.settings import load_settings
+
+MIX = (
+    ("list", 35),
+    ("get", 25),
+    ("create", 10),
+    ("generate", 10),
+    ("stream", 10),
+    ("cancel", 10),
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def in_process_client(games_dir: Path, slots: int) -> AsyncIterator[httpx.AsyncClient]:
+    settings = dataclasses.replace(
+        load_settings(),
+        games_dir=games_dir,
+        codex_bin=str(FAKE_CODEX),
+        run_concurrency_min=slots,
+        run_concurrency_max=slots,
+    )
+    app = create_app(settings)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            yield client
+
+
+@asynccontextmanager
+async def uvicorn_client(games_dir: Path, slots: int) -> AsyncIterator[httpx.AsyncClient]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "GAMES_DIR": str(games_dir),
+        "CODEX_BIN": str(FAKE_CODEX),
+        "RUN_CONCURRENCY_MIN": str(slots),
+        "RUN_CONCURRENCY_MAX": str(slots),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            for _ in range(100):
+                try:
+                    await client.get("/api/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+class Workload:
+    def __init__(self, client: httpx.AsyncClient, games_dir: Path, seeded: list[str], seed: int) -> None:
+        self.client = client
+        self.games_dir = games_dir
+        self.seeded = seeded
+        self.rng = random.Random(seed)
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self._routes = [name for name, _ in MIX]
+        self._weights = [weight for _, weight in MIX]
+
+    async def _timed(self, route: str, request: Any) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+    async def _generate(self) -> str | None:
+        slug = self.rng.choice(self.seeded)
+        response = await self._timed(
+            "generate",
+            self.client.post(f"/api/games/{slug}/generate", json={"prompt": "add a boss level"}),
+        )
+        return response.json()["runId"] if response is not None and response.is_success else None
+
+    async def step(self) -> None:
+        route = self.rng.choices(self._routes, self._weights)[0]
+        if route == "list":
+            await self._timed(route, self.client.get("/api/games"))
+        elif route == "get":
+            await self._timed(route, self.client.get(f"/api/games/{self.rng.choice(self.seeded)}"))
+        elif route == "create":
+            await self._timed(route, self.client.post("/api/games", json={"title": "Bench Game"}))
+        elif route == "generate":
+            await self._generate()
+        elif route == "stream":
+            run_id = await self._generate()
+            if run_id:
+                await self._timed(route, self.client.get(f"/api/runs/{run_id}/events"))
+        elif route == "cancel":
+            run_id = await self._generate()
+            if run_id:
+                await self._timed(route, self.client.post(f"/api/runs/{run_id}/cancel"))
+
+
+async def seed_games(client: httpx.AsyncClient, games_dir: Path, count: int) -> list[str]:
+    slugs = []
+    for index in range(count):
+        record = (await client.post("/api/games", json={"title": f"Seed Game {index}"})).json()
+        # A card keeps the run manager from calling the Images API.
+        (games_dir / record["slug"] / "card.png").write_bytes(b"\x89PNG")
+        slugs.append(record["slug"])
+    return slugs
+
+
+async def run_benchmark(args: argparse.Namespace, games_dir: Path) -> dict[str, Any]:
+    os.environ.setdefault("FAKE_CODEX_TOOL_CALLS", "3")
+    os.environ.setdefault("FAKE_CODEX_DURATION", "0.2")
+    # Any stray OpenAI call fails fast instead of reaching the network.
+    os.environ["OPENAI_BASE_URL"] = "http://127.0.0.1:9/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+    factory = uvicorn_client if args.uvicorn else in_process_client
+    async with factory(games_dir, args.slots) as client:
+        seeded = await seed_games(client, games_dir, args.games)
+        workloads = [Workload(client, games_dir, seeded, seed) for seed in range(args.users)]
+        deadline = time.monotonic() + args.duration
+
+        async def user(workload: Workload) -> None:
+            while time.monotonic() < deadline:
+                await workload.step()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(workload) for workload in workloads))
+        elapsed = time.perf_counter() - started
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    for workload in workloads:
+        for route, samples in workload.latencies.items():
+            latencies[route].extend(samples)
+        for route, count in workload.errors.items():
+            errors[route] += count
+
+    report: dict[str, Any] = {}
+    for route, _ in MIX:
+        samples = latencies.get(route, [])
+        report[route] = {
+            "requests": len(samples),
+            "errors": errors.get(route, 0),
+            "throughputPerSecond": round(len(samples) / elapsed, 2),
+            "latencyMs": percentiles(samples),
+        }
+    report["total"] = {
+        "requests": sum(len(samples) for samples in latencies.values()),
+        "seconds": round(elapsed, 2),
+        "users": args.users,
+        "transport": "uvicorn" if args.uvicorn else "asgi",
+    }
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--games", type=int, default=50, help="games seeded before the load starts")
+    parser.add_argument("--slots", type=int, default=4, help="concurrent Codex runs allowed")
+    parser.add_argument("--uvicorn", action="store_true", help="drive a local uvicorn server instead of ASGI")
+    parser.add_argument("--compare", type=Path, help="baseline results file to compare against")
+    parser.add_argument("--no-save", action="store_true", help="do not write a results file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = asyncio.run(run_benchmark(args, Path(tmpdir) / "games"))
+
+    print(f"{'route':<10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, _ in MIX:
+        row = results[route]
+        latency = row["latencyMs"]
+        print(
+            f"{route:<10} {row['requests']:>9} {row['errors']:>7} {row['throughputPerSecond']:>9.1f} "
+            f"{latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}"
+        )
+    if not args.no_save:
+        print(f"\nSaved {save_results('api', results)}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Title and card-image generation against the local fake OpenAI server.
+
+Usage:
+    cd backend
+    python benchmarks/bench_openai.py [--calls 200] [--fail-rate 0.1] [--compare results/<file>.json]
+
+Runs --calls concurrent generate_title calls and a tenth as many
+generate_card_image calls through the shared OpenAIClients, then the same
+titles with a fresh AsyncOpenAI per call (how prompting.py used to work).
+Reports latency percentiles, retries taken, and the peak concurrency the
+server saw per endpoint, which must stay within the configured limits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+from _common import compare, percentiles, save_results
+from fake_openai import serve
+
+from app import metrics, openai_clients
+from app.openai_clients import RetryPolicy, configure_openai_clients
+from app.prompting import generate_card_image, generate_title
+
+
+async def _timed(coro: Any) -> float:
+    started = time.perf_counter()
+    await coro
+    return (time.perf_counter() - started) * 1000
+
+
+async def run_shared(calls: int, images: int, output_dir: Path) -> dict[str, Any]:
+    retries_before = metrics.OPENAI_RETRIES.total()
+    started = time.perf_counter()
+    titles = [_timed(generate_title(prompt=f"a space shooter number {index}", chat_context=[])) for index in range(calls)]
+    cards = [
+        _timed(generate_card_image(prompt=f"card {index}", chat_context=[], output_path=output_dir / f"{index}.png"))
+        for index in range(images)
+    ]
+    latencies = await asyncio.gather(*titles, *cards)
+    elapsed = time.perf_counter() - started
+    await openai_clients.clients.aclose()
+    return {
+        "seconds": round(elapsed, 3),
+        "titleMs": percentiles(list(latencies[:calls])),
+        "imageMs": percentiles(list(latencies[calls:])),
+        "retries": int(metrics.OPENAI_RETRIES.total() - retries_before),
+    }
+
+
+async def run_fresh_clients(calls: int) -> dict[str, Any]:
+    from openai import AsyncOpenAI
+
+    async def one(index: int) -> None:
+        client = AsyncOpenAI()
+        try:
+            await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": f"a space shooter number {index}"}],
+                max_tokens=60,
+            )
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(_timed(one(index)) for index in range(calls)))
+    return {"seconds": round(time.perf_counter() - started, 3), "titleMs": percentiles(list(latencies))}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="concurrent title generations")
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="fraction of requests the server fails")
+    parser.add_argument("--chat-limit", type=int, default=8)
+    parser.add_argument("--image-limit", type=int, default=2)
+    parser.add_argument("--compare", type=Path, help="baseline results file to compare against")
+    parser.add_argument("--no-save", action="store_true", help="do not write a results file")
+    args = parser.parse_args()
+
+    server, _ = serve(0, fail_rate=args.fail_rate, retry_after=0.2, image_latency=0.2)
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    configure_openai_clients(
+        base_url=base_url,
+        timeout=30.0,
+        endpoint_limits={"chat": args.chat_limit, "images": args.image_limit},
+        retry=RetryPolicy(max_attempts=6, base_delay=0.05, max_delay=1.0),
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        shared = asyncio.run(run_shared(args.calls, max(1, args.calls // 10), Path(tmpdir)))
+    peak = httpx.get(f"http://127.0.0.1:{server.server_port}/stats").json()
+
+    # The baseline has no retries, so it runs against a server that never fails.
+    server.shutdown()
+    server, _ = serve(0, fail_rate=0.0)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    fresh = asyncio.run(run_fresh_clients(args.calls))
+    server.shutdown()
+
+    results = {"shared": shared, "freshClientPerCall": fresh, "server": peak}
+    for name, values in results.items():
+        print(f"{name}: {values}")
+    for endpoint, limit in (("chat", args.chat_limit), ("images", args.image_limit)):
+        seen = peak.get(endpoint, {}).get("peakConcurrency", 0)
+        if seen > limit:
+            print(f"WARNING: {endpoint} peaked at {seen} concurrent requests, limit {limit}")
+    if not args.no_save:
+        print(f"\nSaved {save_results('openai', results)}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Load benchmarks for RunManager and SSE fan-out, driven by the fake Codex CLI.
+
+Usage:
+    cd backend
+    python benchmarks/bench_run_manager.py [--quick] [--compare results/<file>.json]
+
+Measures:
+    enqueue      runs enqueued per second (all behind one busy game)
+    dispatch     enqueue -> start wait and spawn latency for back-to-back runs
+    forward      Codex events per second through _forward_codex_event
+    fanout       cost of delivering events to 1..1000 SSE subscribers
+
+Results are saved under benchmarks/results/ for comparison across commits.
+No network access or real codex binary is needed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from _common import FAKE_CODEX, compare, percentiles, save_results
+from fake_codex import generate_events
+
+from app.models import RunStatus
+from app.run_manager import RunManager, RunState, stream_run_events
+from app.storage import GameStorage
+
+
+def make_manager(root: Path) -> RunManager:
+    storage = GameStorage(root / "games")
+    storage.ensure_games_dir()
+    return RunManager(
+        storage=storage,
+        project_root=root,
+        codex_bin=str(FAKE_CODEX),
+        codex_model=None,
+        title_model="unused",
+        image_model="unused",
+    )
+
+
+def make_game(manager: RunManager, title: str) -> str:
+    """Create a titled game with a card so runs never trigger OpenAI side jobs."""
+    record = manager.storage.create_game(title)
+    (manager.storage.game_dir(record.slug) / "card.png").write_bytes(b"\x89PNG")
+    return record.slug
+
+
+def make_run(slug: str) -> RunState:
+    return RunState(
+        run_id=os.urandom(16).hex(),
+        slug=slug,
+        prompt="benchmark",
+        chat_context=[],
+        status=RunStatus.running,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+async def bench_enqueue(root: Path, runs: int) -> dict[str, Any]:
+    os.environ["FAKE_CODEX_DURATION"] = "30"
+    manager = make_manager(root)
+    await manager.start()
+    slug = make_game(manager, "Enqueue Bench")
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(runs):
+        before = time.perf_counter()
+        await manager.enqueue(slug=slug, prompt="bench", chat_context=[])
+        latencies.append((time.perf_counter() - before) * 1000)
+    elapsed = time.perf_counter() - started
+
+    for run_id in list(manager._runs):
+        await manager.cancel(run_id)
+    await manager.shutdown()
+    os.environ.pop("FAKE_CODEX_DURATION")
+    return {
+        "runs": runs,
+        "runsPerSecond": round(runs / elapsed, 1),
+        "latencyMs": percentiles(latencies),
+    }
+
+
+async def bench_dispatch(root: Path, runs: int) -> dict[str, Any]:
+    os.environ["FAKE_CODEX_TOOL_CALLS"] = "0"
+    manager = make_manager(root)
+    await manager.start()
+    slug = make_game(manager, "Dispatch Bench")
+
+    queue_wait, spawn, total = [], [], []
+    for _ in range(runs):
+        run = await manager.enqueue(slug=slug, prompt="bench", chat_context=[])
+        events = stream_run_events(run)
+        async for _chunk in events:
+            pass
+        timings = run.timings.to_dict()
+        queue_wait.append(timings["queueWaitMs"] or 0.0)
+        spawn.append(timings["spawnMs"] or 0.0)
+        total.append(timings["totalMs"] or 0.0)
+
+    await manager.shutdown()
+    os.environ.pop("FAKE_CODEX_TOOL_CALLS")
+    return {
+        "runs": runs,
+        "queueWaitMs": percentiles(queue_wait),
+        "spawnMs": percentiles(spawn),
+        "totalMs": percentiles(total),
+    }
+
+
+async def bench_forward(root: Path, events_target: int) -> dict[str, Any]:
+    manager = make_manager(root)
+    slug = make_game(manager, "Forward Bench")
+    run = make_run(slug)
+
+    events: list[dict[str, Any]] = []
+    seed = 0
+    while len(events) < events_target:
+        events.extend(generate_events(seed=seed, tool_calls=10, output_bytes=4000))
+        seed += 1
+    events = events[:events_target]
+
+    started = time.perf_counter()
+    for event in events:
+        await manager._forward_codex_event(run, event)
+    elapsed = time.perf_counter() - started
+    return {
+        "codexEvents": len(events),
+        "emittedEvents": len(run.backlog),
+        "codexEventsPerSecond": round(len(events) / elapsed, 1),
+    }
+
+
+async def bench_fanout(root: Path, subscriber_counts: list[int], events: int) -> dict[str, Any]:
+    manager = make_manager(root)
+    slug = make_game(manager, "Fanout Bench")
+    results: dict[str, Any] = {}
+
+    for subscribers in subscriber_counts:
+        run = make_run(slug)
+        received = [0] * subscribers
+
+        async def consume(index: int) -> None:
+            async for _chunk in stream_run_events(run):
+                received[index] += 1
+
+        consumers = [asyncio.create_task(consume(index)) for index in range(subscribers)]
+        await asyncio.sleep(0)  # let every consumer subscribe
+
+        started = time.perf_counter()
+        for sequence in range(events):
+            await manager._emit(run, "codex_thinking", {"text": f"event {sequence}"})
+        await manager._emit(run, "run_finished", {"status": "completed"})
+        emitted = time.perf_counter() - started
+        await asyncio.gather(*consumers)
+        delivered = time.perf_counter() - started
+
+        deliveries = subscribers * (events + 1)
+        assert sum(received) == deliveries
+        results[str(subscribers)] = {
+            "events": events + 1,
+            "emitSeconds": round(emitted, 4),
+            "deliverSeconds": round(delivered, 4),
+            "deliveriesPerSecond": round(deliveries / delivered, 1),
+            "usPerDelivery": round(delivered / deliveries * 1e6, 3),
+        }
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for a smoke run")
+    parser.add_argument("--compare", type=Path, help="baseline results file to compare against")
+    parser.add_argument("--no-save", action="store_true", help="do not write a results file")
+    args = parser.parse_args()
+
+    scale = 0.1 if args.quick else 1.0
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        results = {
+            "enqueue": await bench_enqueue(root / "enqueue", int(1000 * scale)),
+            "dispatch": await bench_dispatch(root / "dispatch", max(3, int(30 * scale))),
+            "forward": await bench_forward(root / "forward", int(20000 * scale)),
+            "fanout": await bench_fanout(
+                root / "fanout",
+                [1, 10, 100] if args.quick else [1, 10, 100, 1000],
+                int(500 * scale),
+            ),
+        }
+
+    for section, values in results.items():
+        print(f"{section}: {values}")
+    if not args.no_save:
+        print(f"\nSaved {save_results('run_manager', results)}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+GameStorage scaling benchmark over synthetic catalogs.
+
+Usage:
+    cd backend
+    python benchmarks/bench_storage.py [--scales 1000,10000,100000] [--compare results/<file>.json]
+
+Each scale builds a catalog in a temp directory that mixes folder games with
+metadata, legacy flat HTML files (some with sibling images), folders missing
+game.json, and a spread of card/cover/thumbnail image candidates.  It then
+times list_games (cold, which bootstraps missing metadata, and warm),
+read_game, create_game with colliding slugs and touch_game.
+
+Every scale runs in its own subprocess so peak RSS is per scale.  Besides
+wall time, each operation reports filesystem calls made from Python
+(stat/listdir/scandir/open/mkdir) and the read/write syscalls and bytes the
+kernel accounted to the process (/proc/self/io, Linux only).
+
+Scales up to 1,000,000 work but need several GB of disk and inodes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable
+
+from _common import compare, percentiles, save_results
+
+from app.storage import GameStorage
+
+IMAGE_NAMES = ("card.png", "card.webp", "cover.jpg", "thumbnail.png")
+
+
+class FsCallCounter:
+    """Count filesystem calls by wrapping the os/io functions pathlib goes through."""
+
+    TARGETS = ((os, "stat"), (os, "lstat"), (os, "listdir"), (os, "scandir"), (os, "mkdir"), (io, "open"))
+
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+        self._originals: list[tuple[Any, str, Callable[..., Any]]] = []
+
+    def __enter__(self) -> "FsCallCounter":
+        for module, name in self.TARGETS:
+            original = getattr(module, name)
+            self._originals.append((module, name, original))
+            setattr(module, name, self._wrap(name, original))
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        for module, name, original in self._originals:
+            setattr(module, name, original)
+        self._originals.clear()
+
+    def _wrap(self, name: str, original: Callable[..., Any]) -> Callable[..., Any]:
+        def counted(*args: Any, **kwargs: Any) -> Any:
+            self.counts[name] += 1
+            return original(*args, **kwargs)
+
+        return counted
+
+
+def proc_io() -> dict[str, int]:
+    try:
+        lines = Path("/proc/self/io").read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return {}
+    values = dict(line.split(": ") for line in lines)
+    return {key: int(values[key]) for key in ("syscr", "syscw", "rchar", "wchar") if key in values}
+
+
+def measure(label: str, operation: Callable[[], Any], repeat: int = 1) -> dict[str, Any]:
+    io_before = proc_io()
+    samples = []
+    with FsCallCounter() as counter:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            operation()
+            samples.append((time.perf_counter() - started) * 1000)
+    io_after = proc_io()
+
+    result: dict[str, Any] = {
+        "repeat": repeat,
+        "totalMs": round(sum(samples), 3),
+        "ms": percentiles(samples),
+        "fsCalls": dict(counter.counts),
+        "fsCallsPerOp": round(sum(counter.counts.values()) / repeat, 2),
+    }
+    if io_before:
+        result["kernel"] = {key: io_after[key] - io_before[key] for key in io_before}
+    print(f"    {label:<28} {result['totalMs']:>12.1f} ms  {result['fsCallsPerOp']:>10} fs calls/op", flush=True)
+    return result
+
+
+def build_catalog(games_dir: Path, size: int, seed: int = 0) -> list[str]:
+    """Write *size* synthetic games and return their slugs."""
+    rng = random.Random(seed)
+    games_dir.mkdir(parents=True, exist_ok=True)
+    slugs = []
+    stamp = "2026-01-01T00:00:00+00:00"
+
+    for index in range(size):
+        kind = rng.random()
+        slug = f"game-{index:07d}"
+        slugs.append(slug)
+
+        if kind < 0.15:
+            # Legacy flat HTML, half of them with a sibling image.
+            (games_dir / f"{slug}.html").write_text("<!doctype html><p>legacy</p>", encoding="utf-8")
+            if rng.random() < 0.5:
+                (games_dir / f"{slug}.png").write_bytes(b"\x89PNG")
+            continue
+
+        game_dir = games_dir / slug
+        game_dir.mkdir()
+        (game_dir / "index.html").write_text("<!doctype html><p>game</p>", encoding="utf-8")
+
+        if kind >= 0.25:
+            metadata = {"slug": slug, "title": f"Game {index}", "createdAt": stamp, "updatedAt": stamp}
+            (game_dir / "game.json").write_text(json.dumps(metadata), encoding="utf-8")
+        # else: folder without metadata, bootstrapped on first read.
+
+        image_roll = rng.random()
+        if image_roll < 0.6:
+            (game_dir / IMAGE_NAMES[rng.randrange(len(IMAGE_NAMES))]).write_bytes(b"img")
+
+    return slugs
+
+
+def run_scale(size: int, workdir: Path, sample: int, collisions: int) -> dict[str, Any]:
+    games_dir = workdir / "games"
+    started = time.perf_counter()
+    slugs = build_catalog(games_dir, size)
+    build_seconds = time.perf_counter() - started
+    storage = GameStorage(games_dir)
+    rng = random.Random(1)
+    folder_slugs = [slug for slug in slugs if (games_dir / slug).is_dir()]
+    read_sample = [rng.choice(slugs) for _ in range(sample)]
+    touch_sample = [rng.choice(folder_slugs) for _ in range(min(sample, len(folder_slugs)))]
+
+    print(f"  {size:,} games (built in {build_seconds:.1f}s)", flush=True)
+    read_iter = iter(read_sample)
+    touch_iter = iter(touch_sample)
+    results = {
+        "listGamesCold": measure("list_games (cold)", storage.list_games),
+        "listGamesWarm": measure("list_games (warm)", storage.list_games, repeat=3),
+        "readGame": measure("read_game", lambda: storage.read_game(next(read_iter)), repeat=len(read_sample)),
+        "createGameCollisions": measure(
+            "create_game (same title)",
+            lambda: storage.create_game("Collision Game"),
+            repeat=collisions,
+        ),
+        "touchGame": measure("touch_game", lambda: storage.touch_game(next(touch_iter)), repeat=len(touch_sample)),
+    }
+    results["catalogSize"] = len(storage.list_games())
+    results["buildSeconds"] = round(build_seconds, 2)
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["peakRssMb"] = round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1000,10000,100000", help="comma-separated catalog sizes")
+    parser.add_argument("--sample", type=int, default=500, help="read/touch operations per scale")
+    parser.add_argument("--collisions", type=int, default=100, help="create_game calls sharing one title")
+    parser.add_argument("--compare", type=Path, help="baseline results file to compare against")
+    parser.add_argument("--no-save", action="store_true", help="do not write a results file")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_scale(args.worker, args.workdir, args.sample, args.collisions)
+        print("RESULT " + json.dumps(result))
+        return 0
+
+    results: dict[str, Any] = {}
+    for size in (int(value) for value in args.scales.split(",")):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--worker",
+                    str(size),
+                    "--workdir",
+                    tmpdir,
+                    "--sample",
+                    str(args.sample),
+                    "--collisions",
+                    str(args.collisions),
+                ],
+                stdout=subprocess.PIPE,
+                text=True,
+                check=True,
+            )
+        for line in completed.stdout.splitlines():
+            if line.startswith("RESULT "):
+                results[str(size)] = json.loads(line[len("RESULT ") :])
+            else:
+                print(line)
+
+    if not args.no_save:
+        print(f"\nSaved {save_results('storage', results)}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Deterministic stand-in for the ``codex`` CLI.
+
+Accepts the same ``codex exec`` / ``codex exec resume`` command lines the
+backend builds, reads the prompt from stdin, and prints a realistic
+``--json`` event stream: ``thread.started``, ``turn.started``, reasoning,
+``command_execution`` and ``tool_call`` items, a final ``agent_message``
+and ``turn.completed`` with token usage.
+
+Usage:
+    CODEX_BIN=benchmarks/fake_codex.py uvicorn app.main:app
+
+Behaviour is controlled with environment variables:
+    FAKE_CODEX_SEED          RNG seed (default 0); same seed, same stream
+    FAKE_CODEX_TOOL_CALLS    number of shell commands to emit (default 5)
+    FAKE_CODEX_OUTPUT_BYTES  size of each command's aggregated_output (default 2000)
+    FAKE_CODEX_DURATION      target wall time in seconds, spread across events (default 0)
+    FAKE_CODEX_EVENT_RATE    max events per second when no duration is set (default 0 = unlimited)
+    FAKE_CODEX_EXIT_CODE     process exit code (default 0)
+    FAKE_CODEX_STDERR        line written to stderr before exiting (default none)
+    FAKE_CODEX_WRITE_INDEX   "1" to write index.html into the --cd folder
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from typing import Any, Iterator
+
+COMMANDS = (
+    "bash -lc 'ls -la'",
+    "bash -lc 'cat index.html'",
+    "bash -lc 'npx prettier --check index.html'",
+    "bash -lc 'node --check game.js'",
+    "bash -lc 'rg -n requestAnimationFrame .'",
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def generate_events(
+    *,
+    seed: int = 0,
+    tool_calls: int = 5,
+    output_bytes: int = 2000,
+    thread_id: str | None = None,
+    prompt: str = "",
+) -> Iterator[dict[str, Any]]:
+    """Yield one run's worth of ``codex exec --json`` events."""
+    rng = random.Random(seed)
+    thread_id = thread_id or str(uuid.UUID(int=rng.getrandbits(128)))
+
+    yield {"type": "thread.started", "thread_id": thread_id}
+    yield {"type": "turn.started"}
+
+    item_index = 0
+    for call in range(tool_calls):
+        yield {
+            "type": "item.completed",
+            "item": {
+                "id": f"item_{item_index}",
+                "type": "reasoning",
+                "text": f"**Step {call + 1}** Checking the game loop before editing.",
+            },
+        }
+        item_index += 1
+
+        command = COMMANDS[rng.randrange(len(COMMANDS))]
+        item = {"id": f"item_{item_index}", "type": "command_execution", "command": command}
+        yield {"type": "item.started", "item": {**item, "aggregated_output": "", "status": "in_progress"}}
+        line = f"{command} :: line output {call}\n"
+        output = (line * (output_bytes // len(line) + 1))[:output_bytes]
+        yield {
+            "type": "item.completed",
+            "item": {
+                **item,
+                "aggregated_output": output,
+                "exit_code": 0 if rng.random() > 0.1 else 1,
+                "status": "completed",
+            },
+        }
+        item_index += 1
+
+        if call % 2 == 0:
+            patch = "*** Begin Patch\n*** Update File: index.html\n@@\n-old\n+new\n*** End Patch\n"
+            tool = {"id": f"item_{item_index}", "type": "tool_call", "name": "apply_patch"}
+            yield {"type": "item.started", "item": {**tool, "arguments": patch}}
+            yield {"type": "item.completed", "item": {**tool, "output": "Success. Updated index.html"}}
+            item_index += 1
+
+    yield {
+        "type": "item.completed",
+        "item": {
+            "id": f"item_{item_index}",
+            "type": "agent_message",
+            "text": f"Built the game for: {prompt.strip()[:80] or 'your request'}",
+        },
+    }
+    input_tokens = 4000 + 1500 * tool_calls
+    yield {
+        "type": "turn.completed",
+        "usage": {
+            "input_tokens": input_tokens,
+            "cached_input_tokens": input_tokens // 2,
+            "output_tokens": 300 + 100 * tool_calls,
+        },
+    }
+
+
+def _parse_args(argv: list[str]) -> dict[str, Any]:
+    options: dict[str, Any] = {"resume": None, "cd": None, "last_message": None}
+    positional: list[str] = []
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        if arg in ("--cd", "--output-last-message", "-m"):
+            value = argv[index + 1] if index + 1 < len(argv) else None
+            if arg == "--cd":
+                options["cd"] = value
+            elif arg == "--output-last-message":
+                options["last_message"] = value
+            index += 2
+            continue
+        if not arg.startswith("-") or arg == "-":
+            positional.append(arg)
+        index += 1
+
+    # positional: ["exec", "resume", SESSION_ID, "-"] or ["exec", "-"]
+    if len(positional) >= 3 and positional[1] == "resume":
+        options["resume"] = positional[2]
+    return options
+
+
+def _new_thread_id(seed: int, prompt: str) -> str:
+    """Deterministic, but distinct per prompt, like separate real sessions."""
+    return str(uuid.UUID(bytes=hashlib.sha256(f"{seed}\n{prompt}".encode("utf-8")).digest()[:16]))
+
+
+def main() -> int:
+    options = _parse_args(sys.argv[1:])
+    prompt = sys.stdin.read()
+
+    duration = _env_float("FAKE_CODEX_DURATION", 0.0)
+    rate = _env_float("FAKE_CODEX_EVENT_RATE", 0.0)
+    events = list(
+        generate_events(
+            seed=_env_int("FAKE_CODEX_SEED", 0),
+            tool_calls=_env_int("FAKE_CODEX_TOOL_CALLS", 5),
+            output_bytes=_env_int("FAKE_CODEX_OUTPUT_BYTES", 2000),
+            thread_id=options["resume"] or _new_thread_id(_env_int("FAKE_CODEX_SEED", 0), prompt),
+            prompt=prompt,
+        )
+    )
+
+    if duration > 0:
+        delay = duration / len(events)
+    elif rate > 0:
+        delay = 1 / rate
+    else:
+        delay = 0.0
+
+    last_text = ""
+    for event in events:
+        sys.stdout.write(json.dumps(event) + "\n")
+        sys.stdout.flush()
+        item = event.get("item") or {}
+        if item.get("type") == "agent_message":
+            last_text = item.get("text", "")
+        if delay:
+            time.sleep(delay)
+
+    if options["last_message"]:
+        with open(options["last_message"], "w", encoding="utf-8") as file:
+            file.write(last_text)
+
+    if os.getenv("FAKE_CODEX_WRITE_INDEX") == "1" and options["cd"]:
+        with open(os.path.join(options["cd"], "index.html"), "w", encoding="utf-8") as file:
+            file.write(f"<!doctype html><title>fake</title><p>{last_text}</p>\n")
+
+    stderr = os.getenv("FAKE_CODEX_STDERR")
+    if stderr:
+        sys.stderr.write(stderr + "\n")
+
+    return _env_int("FAKE_CODEX_EXIT_CODE", 0)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the two OpenAI endpoints the backend calls.
+
+Serves ``POST /v1/chat/completions`` and ``POST /v1/images/generations``
+with canned responses, optional latency and injected 429/503 failures, and
+reports what it saw at ``GET /stats`` (requests, failures, peak concurrency
+per endpoint).
+
+Usage:
+    python benchmarks/fake_openai.py --port 8765
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+
+Behaviour is controlled with environment variables (or the matching flags):
+    FAKE_OPENAI_LATENCY        seconds before each chat response (default 0.05)
+    FAKE_OPENAI_IMAGE_LATENCY  seconds before each image response (default 0.5;
+                               a quarter of that for quality="low")
+    FAKE_OPENAI_FAIL_RATE      fraction of requests answered 429/503 (default 0)
+    FAKE_OPENAI_RETRY_AFTER    Retry-After seconds sent with a 429 (default 1)
+    FAKE_OPENAI_SEED           RNG seed for failure injection (default 0)
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+def _png_1x1() -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return len(data).to_bytes(4, "big") + body + zlib.crc32(body).to_bytes(4, "big")
+
+    header = (1).to_bytes(4, "big") * 2 + bytes([8, 2, 0, 0, 0])
+    pixels = zlib.compress(b"\x00\x20\x80\xff")
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", pixels) + chunk(b"IEND", b"")
+
+
+PNG_B64 = base64.b64encode(_png_1x1()).decode("ascii")
+
+
+class FakeOpenAIState:
+    def __init__(self, *, latency: float, image_latency: float, fail_rate: float, retry_after: float, seed: int) -> None:
+        self.latency = latency
+        self.image_latency = image_latency
+        self.fail_rate = fail_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats: dict[str, dict[str, int]] = {}
+        self._active: dict[str, int] = {}
+
+    def enter(self, endpoint: str) -> bool:
+        """Count a request; returns whether it should fail."""
+        with self.lock:
+            stats = self.stats.setdefault(endpoint, {"requests": 0, "failures": 0, "peakConcurrency": 0})
+            stats["requests"] += 1
+            self._active[endpoint] = self._active.get(endpoint, 0) + 1
+            stats["peakConcurrency"] = max(stats["peakConcurrency"], self._active[endpoint])
+            fail = self.rng.random() < self.fail_rate
+            if fail:
+                stats["failures"] += 1
+            return fail
+
+    def leave(self, endpoint: str) -> None:
+        with self.lock:
+            self._active[endpoint] -= 1
+
+
+def make_handler(state: FakeOpenAIState) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_args: Any) -> None:
+            pass
+
+        def _send(self, status: int, body: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            if self.path == "/stats":
+                with state.lock:
+                    self._send(200, state.stats)
+            else:
+                self._send(404, {"error": {"message": "not found"}})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if self.path.endswith("/chat/completions"):
+                endpoint, latency = "chat", state.latency
+            elif self.path.endswith("/images/generations"):
+                endpoint, latency = "images", state.image_latency
+                if request.get("quality") == "low":
+                    latency /= 4
+            else:
+                self._send(404, {"error": {"message": "not found"}})
+                return
+
+            fail = state.enter(endpoint)
+            try:
+                time.sleep(latency)
+                if fail:
+                    if state.rng.random() < 0.5:
+                        self._send(
+                            429,
+                            {"error": {"message": "rate limited", "type": "rate_limit_exceeded"}},
+                            {"Retry-After": str(state.retry_after)},
+                        )
+                    else:
+                        self._send(503, {"error": {"message": "overloaded", "type": "server_error"}})
+                    return
+                if endpoint == "chat":
+                    self._send(200, self._chat(request))
+                else:
+                    self._send(200, {"created": int(time.time()), "data": [{"b64_json": PNG_B64}]})
+            finally:
+                state.leave(endpoint)
+
+        def _chat(self, request: dict[str, Any]) -> dict[str, Any]:
+            prompt = str(request.get("messages", [{}])[-1].get("content", ""))
+            words = [word for word in prompt.replace("\n", " ").split(" ") if word.isalpha()][2:5]
+            title = " ".join(word.capitalize() for word in words) or "Fake Game"
+            return {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": title},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 4, "total_tokens": len(prompt) // 4 + 4},
+            }
+
+    return Handler
+
+
+def serve(port: int = 0, **options: Any) -> tuple[ThreadingHTTPServer, FakeOpenAIState]:
+    """Start the server on a background thread; ``server.server_port`` has the port."""
+    state = FakeOpenAIState(
+        latency=options.get("latency", float(os.getenv("FAKE_OPENAI_LATENCY", "0.05"))),
+        image_latency=options.get("image_latency", float(os.getenv("FAKE_OPENAI_IMAGE_LATENCY", "0.5"))),
+        fail_rate=options.get("fail_rate", float(os.getenv("FAKE_OPENAI_FAIL_RATE", "0"))),
+        retry_after=options.get("retry_after", float(os.getenv("FAKE_OPENAI_RETRY_AFTER", "1"))),
+        seed=options.get("seed", int(os.getenv("FAKE_OPENAI_SEED", "0"))),
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float)
+    parser.add_argument("--image-latency", type=float)
+    parser.add_argument("--fail-rate", type=float)
+    parser.add_argument("--retry-after", type=float)
+    args = parser.parse_args()
+
+    options = {
+        key: value
+        for key, value in vars(args).items()
+        if key != "port" and value is not None
+    }
+    server, _ = serve(args.port, **options)
+    print(f"Fake OpenAI listening on http://127.0.0.1:{server.server_port}/v1", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
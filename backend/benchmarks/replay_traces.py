@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Replay recorded Codex stdout traces through the backend's event parser.
+
+Traces are the ``.runs/<runId>.codex.jsonl.gz`` files written when the server
+runs with RECORD_CODEX_TRACES=1.  Collect interesting ones into a corpus
+folder, then:
+
+Usage:
+    cd backend
+    python benchmarks/replay_traces.py CORPUS_DIR [--speed 0] [--update-golden]
+
+Each trace is fed through RunManager._consume_stdout/_forward_codex_event.
+Parsing throughput is reported per trace, and the emitted events are compared
+with ``<trace>.expected.json`` next to it (written by --update-golden), so a
+change in event output shows up as a failure.  No network is needed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from _common import compare, save_results
+from bench_run_manager import make_game, make_manager, make_run
+
+from app.replay import TRACE_SUFFIX, normalize_events, replay_trace
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", type=Path, help="folder containing *.codex.jsonl.gz traces")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="1 = recorded speed, 10 = ten times faster, 0 = as fast as possible (default)",
+    )
+    parser.add_argument("--update-golden", action="store_true", help="rewrite the expected event files")
+    parser.add_argument("--compare", type=Path, help="baseline results file to compare against")
+    parser.add_argument("--no-save", action="store_true", help="do not write a results file")
+    args = parser.parse_args()
+
+    traces = sorted(args.corpus.glob(f"*{TRACE_SUFFIX}"))
+    if not traces:
+        print(f"No *{TRACE_SUFFIX} traces in {args.corpus}")
+        return 1
+
+    results: dict[str, dict[str, float]] = {}
+    mismatches = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = make_manager(Path(tmpdir))
+        slug = make_game(manager, "Replay")
+
+        for trace in traces:
+            run = make_run(slug)
+            result = await replay_trace(manager, run, trace, speed=args.speed)
+            results[trace.name] = {
+                "lines": result.lines,
+                "events": result.events,
+                "seconds": round(result.seconds, 4),
+                "linesPerSecond": round(result.lines_per_second, 1),
+                "megabytesPerSecond": round(result.megabytes_per_second, 2),
+            }
+
+            golden = trace.with_name(trace.name[: -len(TRACE_SUFFIX)] + ".expected.json")
+            if args.update_golden:
+                golden.write_text(json.dumps(normalize_events(run.backlog), indent=2), encoding="utf-8")
+                status = "updated"
+            elif golden.exists():
+                expected = json.loads(golden.read_text(encoding="utf-8"))
+                status = "ok" if expected == normalize_events(run.backlog) else "MISMATCH"
+                if status == "MISMATCH":
+                    mismatches.append(trace.name)
+            else:
+                status = "no golden"
+
+            print(
+                f"{trace.name}: {result.lines} lines -> {result.events} events in "
+                f"{result.seconds:.3f}s ({result.lines_per_second:,.0f} lines/s, "
+                f"{result.megabytes_per_second:.1f} MB/s) [{status}]"
+            )
+
+    if not args.no_save:
+        print(f"\nSaved {save_results('replay', results)}")
+    if args.compare:
+        compare(results, args.compare)
+    if mismatches:
+        print(f"\nEvent output changed for: {', '.join(mismatches)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
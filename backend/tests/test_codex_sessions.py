@@ -0,0 +1,96 @@
+"""Codex session rotation thresholds and the lineage log."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.codex_sessions import LINEAGE_NAME, CodexSessionStore, SessionInfo
+from app.run_timings import TokenUsage
+from app.storage import GameStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = GameStorage(tmp_path / "games")
+    storage.ensure_games_dir()
+    return storage
+
+
+def _usage(input_tokens: int) -> TokenUsage:
+    usage = TokenUsage()
+    usage.add(TokenUsage.parse({"input_tokens": input_tokens, "cached_input_tokens": input_tokens // 2}))
+    return usage
+
+
+@pytest.mark.parametrize(
+    ("info", "reason"),
+    [
+        (SessionInfo("s", turns=19, last_input_tokens=149_999), None),
+        (SessionInfo("s", turns=20), "turns"),
+        (SessionInfo("s", turns=3, last_input_tokens=150_000), "tokens"),
+        (SessionInfo("s", turns=25, last_input_tokens=200_000), "turns"),
+    ],
+)
+def test_rotation_thresholds(storage, info, reason):
+    assert CodexSessionStore(storage, max_turns=20, max_tokens=150_000).rotation_reason(info) == reason
+
+
+def test_zero_disables_a_limit(storage):
+    store = CodexSessionStore(storage, max_turns=0, max_tokens=0)
+    assert store.rotation_reason(SessionInfo("s", turns=10_000, last_input_tokens=10**9)) is None
+
+
+def test_turns_accumulate_and_trigger_rotation(storage):
+    slug = storage.create_game("Turns").slug
+    store = CodexSessionStore(storage, max_turns=2, max_tokens=0)
+    assert store.current(slug) is None
+
+    store.record_run(slug, session_id="one", run_id="r1", usage=_usage(1000))
+    assert store.rotation_reason(store.current(slug)) is None
+    info = store.record_run(slug, session_id="one", run_id="r2", usage=_usage(2000), reply="Done.")
+    assert (info.turns, info.last_input_tokens, info.total_input_tokens) == (2, 2000, 3000)
+    assert store.rotation_reason(info) == "turns"
+
+
+def test_token_threshold_uses_the_latest_run(storage):
+    slug = storage.create_game("Tokens").slug
+    store = CodexSessionStore(storage, max_turns=0, max_tokens=5000)
+    store.record_run(slug, session_id="one", run_id="r1", usage=_usage(4000))
+    store.record_run(slug, session_id="one", run_id="r2", usage=_usage(3000))
+    assert store.rotation_reason(store.current(slug)) is None  # 7000 in total, 3000 last
+    store.record_run(slug, session_id="one", run_id="r3", usage=_usage(6000))
+    assert store.rotation_reason(store.current(slug)) == "tokens"
+
+
+def test_rotations_chain_parents_and_survive_reload(storage):
+    slug = storage.create_game("Lineage").slug
+    store = CodexSessionStore(storage, max_turns=1, max_tokens=0)
+    store.record_run(slug, session_id="one", run_id="r1", usage=_usage(1000), reply="first")
+    store.record_run(
+        slug, session_id="two", run_id="r2", usage=_usage(500), rotated_from="one", rotation_reason="turns"
+    )
+    store.record_run(
+        slug, session_id="three", run_id="r3", usage=_usage(700), reply="third", rotated_from="two", rotation_reason="turns"
+    )
+
+    lineage = store.read_lineage(slug)
+    started = [entry for entry in lineage if entry["event"] == "started"]
+    assert [(entry["sessionId"], entry["parent"], entry["reason"]) for entry in started] == [
+        ("one", None, None),
+        ("two", "one", "turns"),
+        ("three", "two", "turns"),
+    ]
+    assert started[1]["parentTurns"] == 1 and started[1]["parentInputTokens"] == 1000
+
+    # A torn final line is skipped; the current session is rebuilt from the log.
+    with (storage.game_dir(slug) / LINEAGE_NAME).open("a", encoding="utf-8") as file:
+        file.write('{"event": "run", "sessionId": "thr')
+    reloaded = CodexSessionStore(storage).current(slug)
+    assert reloaded.to_dict() == {
+        "sessionId": "three",
+        "parent": "two",
+        "turns": 1,
+        "lastInputTokens": 700,
+        "totalInputTokens": 700,
+    }
+    assert reloaded.last_reply == "third"
@@ -0,0 +1,77 @@
+"""Codex stdout splitting and the streaming parser for oversized lines."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from app.codex_stream import CodexLineReader, LargeString, SpilledLine, parse_frame
+
+
+class _Stream:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    async def read(self, n: int = -1) -> bytes:
+        chunk, self._data = self._data[:n], self._data[n:]
+        return chunk
+
+
+def _frames(data: bytes, **kwargs) -> tuple[CodexLineReader, list]:
+    reader = CodexLineReader(_Stream(data), **kwargs)
+
+    async def collect() -> list:
+        return [frame async for frame in reader]
+
+    return reader, asyncio.run(collect())
+
+
+def _item_line(item_type: str, text: str) -> bytes:
+    event = {"type": "item.completed", "item": {"id": "item_1", "type": item_type, "text": text}}
+    return json.dumps(event).encode("utf-8")
+
+
+def test_lines_split_across_chunks():
+    lines = [json.dumps({"type": "turn.started", "n": index}).encode() for index in range(50)]
+    _, frames = _frames(b"\n".join(lines) + b"\nno-newline-tail", chunk_size=7)
+    assert frames == [*lines, b"no-newline-tail"]
+
+
+def test_oversized_line_spills_and_parses(tmp_path):
+    line = _item_line("command_execution", "x" * 20_000)
+    spill_dir = tmp_path / "spill"
+    reader, frames = _frames(b'{"type":"a"}\n' + line + b"\n", spill_dir=spill_dir, spill_threshold=1000, chunk_size=512)
+    try:
+        assert frames[0] == b'{"type":"a"}'
+        spilled = frames[1]
+        assert isinstance(spilled, SpilledLine)
+        assert spilled.size == len(line)
+        assert b"".join(spilled.iter_bytes()) == line
+
+        event = parse_frame(spilled, string_head=100)
+        text = event["item"]["text"]
+        assert isinstance(text, LargeString)
+        assert text == "x" * 100
+        assert text.length == 20_000
+        assert text.read_text() == "x" * 20_000
+    finally:
+        reader.close()
+    assert not spill_dir.exists()
+
+
+def test_agent_message_and_reasoning_text_are_kept_whole(tmp_path):
+    for item_type in ("agent_message", "reasoning"):
+        text = "déjà vu 🐍 \"quoted\"\n" * 2000
+        reader, frames = _frames(_item_line(item_type, text), spill_dir=tmp_path, spill_threshold=1000)
+        try:
+            event = parse_frame(frames[0], string_head=100)
+            assert not isinstance(event["item"]["text"], LargeString)
+            assert event["item"]["text"] == text
+        finally:
+            reader.close()
+
+
+def test_without_spill_oversized_lines_are_cut():
+    reader, frames = _frames(b"a" * 5000 + b"\nb\n", spill_threshold=1000, spill=False, chunk_size=300)
+    assert frames == [b"a" * 1000, b"b"]
+    assert reader.truncated_lines == 1
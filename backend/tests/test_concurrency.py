@@ -0,0 +1,181 @@
+"""Run slot sizing (AIMD) and the run manager's queue around it."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.concurrency import ConcurrencyController, HostSignals, read_host_signals
+from app.models import RunStatus
+from app.run_manager import RunManager, RunState
+from app.storage import GameStorage
+
+
+def _controller(signals: HostSignals = HostSignals(), **kwargs) -> ConcurrencyController:
+    return ConcurrencyController(signal_reader=lambda: signals, **kwargs)
+
+
+def test_limit_grows_by_one_while_runs_wait():
+    controller = _controller(floor=1, ceiling=3)
+    assert controller.evaluate(active=1, queued=2).action == "increase"
+    assert controller.evaluate(active=2, queued=1).limit == 3
+    decision = controller.evaluate(active=3, queued=1)
+    assert (decision.limit, decision.action, decision.reason) == (3, "hold", "runs waiting; at ceiling")
+
+
+def test_limit_holds_with_free_slots_or_empty_queue():
+    controller = _controller(floor=1, ceiling=4, initial=2)
+    assert controller.evaluate(active=1, queued=3).action == "hold"
+    assert controller.evaluate(active=2, queued=0).action == "hold"
+    assert controller.limit == 2
+
+
+@pytest.mark.parametrize(
+    "signals",
+    [
+        HostSignals(cpu_pressure=80.0),
+        HostSignals(load_per_cpu=3.0),
+        HostSignals(mem_available_ratio=0.05),
+    ],
+    ids=["cpu-pressure", "load", "memory"],
+)
+def test_overload_halves_the_limit_down_to_the_floor(signals):
+    controller = _controller(signals, floor=2, ceiling=8, initial=8)
+    assert controller.evaluate(active=8, queued=5).limit == 4
+    assert controller.evaluate(active=4, queued=5).limit == 2
+    decision = controller.evaluate(active=2, queued=5)
+    assert decision.action == "hold" and decision.reason.endswith("at floor")
+
+
+def test_cpu_pressure_takes_precedence_over_load():
+    controller = _controller(HostSignals(cpu_pressure=10.0, load_per_cpu=9.0), ceiling=2)
+    assert controller.evaluate(active=1, queued=1).action == "increase"
+
+
+def test_slow_runs_count_as_overload():
+    controller = _controller(floor=1, ceiling=4, initial=4, run_latency_target_seconds=60, latency_smoothing=0.5)
+    controller.record_run_duration(100)
+    controller.record_run_duration(10)  # smoothed to 55s
+    assert controller.evaluate(active=4, queued=1).action == "hold"
+    controller.record_run_duration(200)  # 127.5s
+    decision = controller.evaluate(active=4, queued=1)
+    assert decision.action == "decrease" and decision.signals.run_latency_seconds == 127.5
+
+
+def test_failing_signal_reader_reads_as_healthy():
+    def broken() -> HostSignals:
+        raise OSError("no /proc")
+
+    controller = ConcurrencyController(ceiling=2, signal_reader=broken)
+    assert controller.evaluate(active=1, queued=1).action == "increase"
+
+
+def test_bounds_are_validated():
+    with pytest.raises(ValueError):
+        ConcurrencyController(floor=0)
+    with pytest.raises(ValueError):
+        ConcurrencyController(floor=3, ceiling=2)
+    assert ConcurrencyController(floor=2, ceiling=4, initial=9).limit == 4
+
+
+def test_read_host_signals(tmp_path):
+    (tmp_path / "pressure").mkdir()
+    (tmp_path / "pressure" / "cpu").write_text("some avg10=12.50 avg60=3.00 avg300=1.00 total=1\n")
+    (tmp_path / "loadavg").write_text("0.00 0.10 0.20 1/100 42\n")
+    (tmp_path / "meminfo").write_text("MemTotal:  1000 kB\nMemFree: 10 kB\nMemAvailable:  250 kB\n")
+    signals = read_host_signals(tmp_path)
+    assert signals.cpu_pressure == 12.5
+    assert signals.load_per_cpu == 0.0
+    assert signals.mem_available_ratio == 0.25
+    assert read_host_signals(tmp_path / "missing") == HostSignals()
+
+
+# --- Run queue ---
+
+
+def _manager(tmp_path, execute) -> tuple[RunManager, GameStorage]:
+    storage = GameStorage(tmp_path / "games")
+    storage.ensure_games_dir()
+    manager = RunManager(
+        storage=storage,
+        project_root=tmp_path,
+        codex_bin="unused",
+        codex_model=None,
+        title_model="unused",
+        image_model="unused",
+        concurrency=_controller(floor=1, ceiling=1),
+    )
+    manager._execute_run = execute
+    return manager, storage
+
+
+def _event_types(run: RunState) -> list[str]:
+    return [event["type"] for event in run.backlog]
+
+
+def test_cancelling_a_queued_run_frees_the_queue(tmp_path):
+    started: list[str] = []
+
+    async def scenario() -> None:
+        release = asyncio.Event()
+
+        async def execute(run: RunState) -> None:
+            started.append(run.run_id)
+            run.status = RunStatus.running
+            await release.wait()
+            run.status = RunStatus.completed
+            await manager._emit(run, "run_finished", {"status": "completed"})
+
+        manager, storage = _manager(tmp_path, execute)
+        await manager.start()
+        slug = storage.create_game("Queue").slug
+        first = await manager.enqueue(slug=slug, prompt="one", chat_context=[])
+        second = await manager.enqueue(slug=slug, prompt="two", chat_context=[])
+        third = await manager.enqueue(slug=slug, prompt="three", chat_context=[])
+        await asyncio.sleep(0.05)
+        assert started == [first.run_id]
+        assert third.queue_position == 2
+
+        await manager.cancel(second.run_id)
+        assert second.run_id not in manager._pending
+        assert second.status == RunStatus.cancelled
+        assert third.queue_position == 1
+
+        release.set()
+        for _ in range(100):
+            if len(started) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert started == [first.run_id, third.run_id]
+        await manager.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_crashed_run_finishes_as_failed_and_frees_its_slot(tmp_path):
+    async def scenario() -> None:
+        async def execute(run: RunState) -> None:
+            run.status = RunStatus.running
+            if run.prompt == "crash":
+                raise RuntimeError("boom")
+            run.status = RunStatus.completed
+            await manager._emit(run, "run_finished", {"status": "completed"})
+
+        manager, storage = _manager(tmp_path, execute)
+        await manager.start()
+        slug = storage.create_game("Crash").slug
+        crashed = await manager.enqueue(slug=slug, prompt="crash", chat_context=[])
+        after = await manager.enqueue(slug=slug, prompt="fine", chat_context=[])
+        for _ in range(100):
+            if after.finished:
+                break
+            await asyncio.sleep(0.01)
+
+        assert crashed.status == RunStatus.failed
+        assert crashed.finished and "boom" in crashed.error
+        assert _event_types(crashed)[-2:] == ["error", "run_finished"]
+        assert after.status == RunStatus.completed
+        await manager.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,94 @@
+"""Chat-context packing: token budgets, the kept first message and the summary cache."""
+
+from __future__ import annotations
+
+import pytest
+
+from app import metrics
+from app.context_packing import EMPTY_CONTEXT, ContextPacker, SummaryCache, estimate_tokens
+from app.models import ChatMessage
+
+FIRST = "Make a neon snake game where you dodge lasers."
+
+
+def _chat(turns: int, words: int = 60) -> list[ChatMessage]:
+    messages = [ChatMessage(role="user", content=FIRST)]
+    for index in range(1, turns):
+        role = "assistant" if index % 2 else "user"
+        messages.append(ChatMessage(role=role, content=f"Turn {index} changes things. " + "detail " * words))
+    return messages
+
+
+def _lookups() -> dict[str, float]:
+    return {result: metrics.SUMMARY_LOOKUPS.value(result=result) for result in ("hit", "extended", "miss")}
+
+
+@pytest.mark.parametrize("budget", [60, 120, 300, 600, 3000])
+@pytest.mark.parametrize("turns", [1, 2, 5, 40, 400])
+def test_packed_block_stays_within_budget(budget, turns):
+    packer = ContextPacker(prompt_budget=budget)
+    block = packer.pack(_chat(turns))
+    assert estimate_tokens(block) <= budget
+
+
+def test_aux_budget_packs_less_than_prompt_budget():
+    packer = ContextPacker(prompt_budget=3000, aux_budget=600)
+    chat = _chat(60)
+    prompt_block = packer.pack(chat)
+    aux_block = packer.pack(chat, budget="aux")
+    assert estimate_tokens(aux_block) <= 600 < estimate_tokens(prompt_block) <= 3000
+    # The newest turn is verbatim in both.
+    assert prompt_block.endswith(aux_block.rsplit("\n", 1)[-1])
+
+
+@pytest.mark.parametrize("turns", [1, 3, 50, 500])
+def test_first_message_is_always_kept(turns):
+    block = ContextPacker(prompt_budget=300).pack(_chat(turns))
+    assert FIRST in block
+
+
+def test_small_chats_are_verbatim_and_empty_chats_are_marked():
+    packer = ContextPacker()
+    chat = _chat(3, words=5)
+    block = packer.pack(chat)
+    assert "Summary of earlier messages" not in block
+    assert block.splitlines()[0] == f"USER: {FIRST}"
+    assert packer.pack([]) == EMPTY_CONTEXT
+    assert packer.pack([ChatMessage(role="user", content="   ")]) == EMPTY_CONTEXT
+
+
+def test_oversized_latest_turn_keeps_its_head():
+    chat = [ChatMessage(role="user", content="x" * 10_000)]
+    block = ContextPacker(prompt_budget=100).pack(chat)
+    assert block.startswith("USER: xxx") and block.endswith("…")
+    assert estimate_tokens(block) <= 100
+
+
+def test_summary_cache_hit_extend_and_miss():
+    cache = SummaryCache()
+    chat = _chat(30)
+
+    before = _lookups()
+    first = cache.summarize(chat[:20])
+    assert _lookups()["miss"] == before["miss"] + 1
+
+    assert cache.summarize(chat[:20]) is first
+    assert _lookups()["hit"] == before["hit"] + 1
+
+    grown = cache.summarize(chat[:21])
+    assert _lookups()["extended"] == before["extended"] + 1
+    assert grown.lines[:20] == first.lines and len(grown.lines) == 21
+
+    edited = [ChatMessage(role="user", content="Something else entirely."), *chat[1:20]]
+    assert cache.summarize(edited).lines[0] != first.lines[0]
+    assert _lookups()["miss"] == before["miss"] + 2
+
+
+def test_summary_cache_evicts_least_recently_used():
+    cache = SummaryCache(max_entries=2)
+    chats = [[ChatMessage(role="user", content=f"Chat {index}.")] for index in range(3)]
+    for chat in chats:
+        cache.summarize(chat)
+    before = _lookups()
+    cache.summarize(chats[0])
+    assert _lookups()["miss"] == before["miss"] + 1
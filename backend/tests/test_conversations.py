@@ -0,0 +1,56 @@
+"""Stored conversations: versions survive reloads, including after a torn write."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.conversations import CONVERSATION_NAME, ConversationConflictError, ConversationStore
+from app.models import ChatMessage
+from app.storage import GameStorage
+
+
+@pytest.fixture
+def store(tmp_path):
+    storage = GameStorage(tmp_path / "games")
+    storage.ensure_games_dir()
+    return ConversationStore(storage), storage.create_game("Chat").slug
+
+
+def _message(content: str, role: str = "user") -> ChatMessage:
+    return ChatMessage(role=role, content=content)
+
+
+def test_append_checks_the_expected_version(store):
+    store, slug = store
+    assert store.append(slug, [_message("one")], expected_version=0)[0] == 1
+    with pytest.raises(ConversationConflictError) as info:
+        store.append(slug, [_message("two")], expected_version=0)
+    assert (info.value.expected, info.value.current) == (0, 1)
+    assert store.version(slug) == 1
+
+
+def test_torn_final_line_is_dropped_before_the_next_append(store):
+    store, slug = store
+    store.append(slug, [_message("one"), _message("reply", role="assistant")])
+    path = store.storage.game_dir(slug) / CONVERSATION_NAME
+    with path.open("a", encoding="utf-8") as file:
+        file.write('{"role":"user","content":"half wri')  # crash mid-write
+
+    reloaded = ConversationStore(store.storage)
+    assert reloaded.version(slug) == 2
+    assert path.read_bytes().endswith(b"\n")
+    assert reloaded.append(slug, [_message("three")], expected_version=2)[0] == 3
+
+    version, messages = ConversationStore(store.storage).read(slug)
+    assert version == 3
+    assert [message.content for message in messages] == ["one", "reply", "three"]
+
+
+def test_unicode_line_separators_survive_a_reload(store):
+    store, slug = store
+    store.append(slug, [_message("line one\u2028line two\x85end")])
+    store.append(slug, [_message("ok")], expected_version=1)
+
+    version, messages = ConversationStore(store.storage).read(slug)
+    assert version == 2
+    assert [message.content for message in messages] == ["line one\u2028line two\x85end", "ok"]
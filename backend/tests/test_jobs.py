@@ -0,0 +1,119 @@
+"""Side jobs: shared per game, and silent once their run has finished."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+from app.models import RunStatus
+from app.run_manager import RunManager, RunState
+from app.storage import GameStorage
+
+
+def _manager(tmp_path) -> tuple[RunManager, str]:
+    storage = GameStorage(tmp_path / "games")
+    storage.ensure_games_dir()
+    manager = RunManager(
+        storage=storage,
+        project_root=tmp_path,
+        codex_bin="unused",
+        codex_model=None,
+        title_model="unused",
+        image_model="unused",
+    )
+    return manager, storage.create_game("Jobs").slug
+
+
+def _run(slug: str, run_id: str) -> RunState:
+    return RunState(
+        run_id=run_id,
+        slug=slug,
+        prompt="make a game",
+        chat_context=[],
+        status=RunStatus.running,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def test_detached_job_outliving_its_run_leaves_the_log_sealed(tmp_path):
+    manager, slug = _manager(tmp_path)
+    run = _run(slug, "a" * 32)
+
+    async def scenario() -> None:
+        release = asyncio.Event()
+
+        async def render(_: RunState) -> None:
+            await release.wait()
+            await manager._emit(run, "metadata_updated", {"task": "image", "stage": "final"})
+
+        manager._submit_aux_job(run, "image", render, detached=True)
+        await asyncio.sleep(0.01)
+        await manager._emit(run, "run_finished", {"status": "completed"})
+        logged = list(manager.run_logs.iter_events(slug, run.run_id))
+
+        release.set()
+        await asyncio.sleep(0.05)
+        await manager.jobs.shutdown()
+        if manager._log_tasks:
+            await asyncio.gather(*manager._log_tasks)
+
+        assert [event["type"] for event in run.backlog][-1] == "run_finished"
+        assert list(manager.run_logs.iter_events(slug, run.run_id)) == logged
+        assert not (manager.run_logs.runs_dir(slug) / f"{run.run_id}.jsonl").exists()
+
+    asyncio.run(scenario())
+
+
+def test_second_run_joins_the_live_job(tmp_path):
+    manager, slug = _manager(tmp_path)
+    first, second = _run(slug, "b" * 32), _run(slug, "c" * 32)
+    calls: list[str] = []
+
+    async def scenario() -> None:
+        release = asyncio.Event()
+
+        async def title(run: RunState) -> None:
+            calls.append(run.run_id)
+            await release.wait()
+
+        manager._submit_aux_job(first, "title", title)
+        await asyncio.sleep(0.01)
+        manager._submit_aux_job(second, "title", title)
+        release.set()
+        await asyncio.sleep(0.05)
+
+        assert calls == [first.run_id]
+        for run in (first, second):
+            states = [event["payload"]["state"] for event in run.backlog if event["type"] == "aux_job"]
+            assert states[-1] == "completed"
+        await manager.jobs.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_run_that_joins_a_detached_job_gets_its_metadata_updates(tmp_path):
+    manager, slug = _manager(tmp_path)
+    first, second = _run(slug, "d" * 32), _run(slug, "e" * 32)
+
+    async def scenario() -> None:
+        release = asyncio.Event()
+
+        async def render(run: RunState) -> None:
+            await release.wait()
+            await manager._announce(run, "image", {"task": "image", "stage": "final"})
+
+        manager._submit_aux_job(first, "image", render, detached=True)
+        await asyncio.sleep(0.01)
+        await manager._emit(first, "run_finished", {"status": "completed"})
+        manager._submit_aux_job(second, "image", render, detached=True)
+        release.set()
+        await asyncio.sleep(0.05)
+        await manager.jobs.shutdown()
+        if manager._log_tasks:
+            await asyncio.gather(*manager._log_tasks)
+
+        assert [event["type"] for event in first.backlog][-1] == "run_finished"
+        updates = [event["payload"] for event in second.backlog if event["type"] == "metadata_updated"]
+        assert updates == [{"task": "image", "stage": "final"}]
+
+    asyncio.run(scenario())
@@ -0,0 +1,31 @@
+"""Event-loop lag probe and the watchdog's stall stacks."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.loop_monitor import LoopLagMonitor
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def test_stall_is_captured_with_the_blocking_stack():
+    async def scenario() -> dict:
+        monitor = LoopLagMonitor(interval=0.02, threshold=0.05)
+        await monitor.start()
+        await asyncio.sleep(0.1)
+        _block_the_loop(0.3)
+        await asyncio.sleep(0.1)
+        snapshot = monitor.snapshot()
+        await monitor.stop()
+        return snapshot
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["samples"] > 0
+    stall = snapshot["stalls"][0]
+    assert stall["lagMs"] >= 200
+    assert "_block_the_loop" in stall["stack"][-1]
+    assert "time.sleep(seconds)" in stall["stack"][-1]
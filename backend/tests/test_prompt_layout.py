@@ -0,0 +1,123 @@
+"""Prompt prefixes must stay byte-stable so provider-side prefix caching keeps working.
+
+Run with ``python -m pytest`` from ``backend/``.  If a digest check fails
+because a prefix was edited on purpose, bump that template's version and
+update ``PINNED_PREFIXES``.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from app.context_packing import ContextPacker
+from app.models import ChatMessage
+from app.prompt_templates import CARD_ART_PROMPT, GAME_PROMPT, SESSION_SEED_PROMPT, TEMPLATES, TITLE_PROMPT
+from app.prompting import (
+    build_card_art_prompt,
+    build_game_prompt,
+    build_session_seed_prompt,
+    build_title_messages,
+)
+from app.run_timings import TokenUsage
+
+PINNED_PREFIXES = {
+    "game/v2": "f989255da706721e1ea42f00af824523f8a22db0f87895a78d5e28381bb07187",
+    "session-seed/v1": "e37d688afdb6e97fa77117e191df2a6dd8bde20fc795149c95c80b1a22703bb3",
+    "title/v2": "2ccd7355ffe4036d843b8cfc5f5eacf75b362fdd115402054bdd6eabea5d0718",
+    "card-art/v2": "db21d63208ecf3536f6ce3518da8e9088eaaf430c1dbca60cdd76e4b4a6589d7",
+}
+
+PROMPTS = [
+    "make a neon snake game",
+    "  add lasers\n\nand a boss fight  ",
+    "ünïcödé 🐍 {context} {request}",
+    "x" * 5000,
+]
+
+CHATS = [
+    [],
+    [ChatMessage(role="user", content="make a neon snake game")],
+    [
+        ChatMessage(role="user" if index % 2 == 0 else "assistant", content=f"turn {index}. " + "detail " * 80)
+        for index in range(40)
+    ],
+]
+
+
+def test_every_template_prefix_is_pinned():
+    assert {template_id: template.prefix_digest for template_id, template in TEMPLATES.items()} == PINNED_PREFIXES
+
+
+@pytest.mark.parametrize("template", list(TEMPLATES.values()), ids=list(TEMPLATES))
+def test_prefix_has_no_placeholders(template):
+    assert "{" not in template.prefix and "}" not in template.prefix
+    assert template.prefix.strip()
+
+
+@pytest.mark.parametrize("prompt", PROMPTS)
+@pytest.mark.parametrize("chat", CHATS, ids=["empty", "short", "long"])
+def test_game_prompt_starts_with_static_prefix(prompt, chat):
+    rendered = build_game_prompt(prompt=prompt, chat_context=chat)
+    assert rendered.startswith(GAME_PROMPT.prefix)
+
+
+def test_game_prompt_prefix_is_byte_identical_across_requests():
+    first = build_game_prompt(prompt=PROMPTS[0], chat_context=CHATS[1]).encode("utf-8")
+    second = build_game_prompt(prompt=PROMPTS[2], chat_context=CHATS[2]).encode("utf-8")
+    prefix = GAME_PROMPT.prefix.encode("utf-8")
+    assert first[: len(prefix)] == second[: len(prefix)] == prefix
+
+
+def test_game_prompt_puts_request_last():
+    rendered = build_game_prompt(prompt="add a boss fight", chat_context=CHATS[1])
+    variable = rendered[len(GAME_PROMPT.prefix) :]
+    assert variable.index("Prior chat context:") < variable.index("User request:")
+    assert rendered.endswith("User request:\nadd a boss fight")
+
+
+def test_growing_chat_keeps_context_before_request_stable():
+    """With the chat under budget, a new turn only appends to the packed context."""
+    packer = ContextPacker(prompt_budget=100_000)
+    chat = CHATS[2]
+    shorter = GAME_PROMPT.prefix + "Prior chat context:\n" + packer.pack(chat[:-1])
+    longer = GAME_PROMPT.render(context=packer.pack(chat), request="next")
+    assert longer.startswith(shorter)
+
+
+@pytest.mark.parametrize("prompt", PROMPTS)
+@pytest.mark.parametrize("files", [[], ["index.html (5120 bytes)", "src/game.js (800 bytes)"]], ids=["no-files", "files"])
+def test_session_seed_prompt_starts_with_static_prefix(prompt, files):
+    rendered = build_session_seed_prompt(prompt=prompt, chat_context=CHATS[2], files=files, last_reply="Done.")
+    assert rendered.startswith(SESSION_SEED_PROMPT.prefix)
+    assert rendered.endswith(prompt.strip())
+
+
+@pytest.mark.parametrize("prompt", PROMPTS)
+def test_title_system_message_is_the_static_prefix(prompt):
+    messages = build_title_messages(prompt=prompt, context_block="(No prior chat context.)")
+    assert messages[0] == {"role": "system", "content": TITLE_PROMPT.prefix}
+    assert prompt.strip() not in messages[0]["content"]
+    assert messages[1]["content"].endswith(prompt.strip())
+
+
+@pytest.mark.parametrize("prompt", PROMPTS)
+def test_card_art_prompt_starts_with_static_prefix(prompt):
+    rendered = build_card_art_prompt(prompt=prompt, context_block="USER: hi")
+    assert rendered.startswith(CARD_ART_PROMPT.prefix)
+    assert rendered.endswith(prompt.strip())
+
+
+def test_render_rejects_missing_sections():
+    with pytest.raises(KeyError):
+        GAME_PROMPT.render(context="x")
+
+
+def test_token_usage_cached_ratio():
+    usage = TokenUsage()
+    assert usage.cached_ratio is None
+    usage.add(TokenUsage.parse({"input_tokens": 4000, "cached_input_tokens": 3000, "output_tokens": 10}))
+    usage.add(TokenUsage.parse({"input_tokens": 1000, "cached_input_tokens": 0}))
+    assert TokenUsage.parse(None) is None
+    assert usage.turns == 2
+    assert usage.cached_ratio == pytest.approx(0.6)
+    assert usage.to_dict()["cachedRatio"] == 0.6
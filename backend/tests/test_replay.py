@@ -0,0 +1,91 @@
+"""Recorded Codex traces must replay to the same events the live run emitted."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.codex_stream import CodexLineReader
+from app.models import RunStatus
+from app.replay import ReplayStream, TraceRecorder, events_digest, read_trace, replay_trace
+from app.run_manager import RunManager, RunState
+from app.storage import GameStorage
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from fake_codex import generate_events  # noqa: E402
+
+
+def _record(path: Path, lines: list[bytes]) -> None:
+    recorder = TraceRecorder(path, run_id="r" * 32, slug="game")
+    for line in lines:
+        recorder.record(line)
+    recorder.close()
+
+
+class _LiveStream:
+    """Codex stdout as the live process writes it: newline-terminated lines."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    async def read(self, n: int = -1) -> bytes:
+        chunk, self._data = self._data[:n], self._data[n:]
+        return chunk
+
+
+def _lines() -> list[bytes]:
+    return [json.dumps(event).encode("utf-8") for event in generate_events(seed=3, tool_calls=10)]
+
+
+def test_replayed_trace_splits_into_the_recorded_lines(tmp_path):
+    lines = _lines()
+    trace = tmp_path / "run.codex.jsonl.gz"
+    _record(trace, lines)
+
+    async def frames() -> list[bytes]:
+        reader = CodexLineReader(ReplayStream(list(read_trace(trace))), chunk_size=97)
+        return [frame async for frame in reader]
+
+    assert asyncio.run(frames()) == lines
+
+
+def test_record_replay_round_trip_emits_every_event(tmp_path):
+    lines = _lines()
+    trace = tmp_path / "run.codex.jsonl.gz"
+    _record(trace, lines)
+
+    storage = GameStorage(tmp_path / "games")
+    storage.ensure_games_dir()
+    manager = RunManager(
+        storage=storage,
+        project_root=tmp_path,
+        codex_bin="unused",
+        codex_model=None,
+        title_model="unused",
+        image_model="unused",
+    )
+    slug = storage.create_game("Replay").slug
+
+    def new_run(run_id: str) -> RunState:
+        return RunState(
+            run_id=run_id,
+            slug=slug,
+            prompt="replay",
+            chat_context=[],
+            status=RunStatus.running,
+            created_at=datetime.now(timezone.utc),
+        )
+
+    live = new_run("a" * 32)
+    asyncio.run(manager._consume_stdout(live, _LiveStream(b"".join(line + b"\n" for line in lines))))
+    replayed = new_run("b" * 32)
+    result = asyncio.run(replay_trace(manager, replayed, trace))
+
+    assert result.lines == len(lines)
+    assert len(live.backlog) > len(lines) // 2
+    assert result.events == len(live.backlog)
+    assert result.digest == events_digest(live.backlog)
+    assert replayed.usage.turns == 1
@@ -0,0 +1,97 @@
+"""Run index: live events stay in memory until flushed off the loop."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.run_index import INDEX_NAME, RunIndex
+from app.run_logs import RunLogStore
+from app.storage import GameStorage
+
+RUN_ID = "d" * 32
+OLD_RUN_ID = "e" * 32
+
+
+@pytest.fixture
+def index(tmp_path):
+    storage = GameStorage(tmp_path / "games")
+    storage.ensure_games_dir()
+    slug = storage.create_game("Index").slug
+    return RunIndex(RunLogStore(storage, budget_bytes=0)), slug
+
+
+def _event(event_type: str, **payload) -> dict:
+    return {"type": event_type, "timestamp": "2026-01-01T00:00:00+00:00", "payload": payload}
+
+
+def _log(index: RunIndex, slug: str, run_id: str, event: dict, *, observe: bool = True) -> None:
+    line = json.dumps(event) + "\n"
+    index.run_logs.append(slug, run_id, line, event["type"])
+    if observe:
+        index.observe(slug, run_id, event, len(line), prompt="make a game")
+
+
+def test_observe_does_not_touch_disk_until_flush(index):
+    index, slug = index
+    _log(index, slug, RUN_ID, _event("status", status="running"))
+    path = index.run_logs.runs_dir(slug) / INDEX_NAME
+
+    assert index.has_pending
+    assert not path.exists()
+    assert not index._records  # nothing loaded on the observing side
+
+    index.flush()
+    assert not index.has_pending
+    assert json.loads(path.read_text().splitlines()[-1])["status"] == "running"
+
+
+def test_readers_see_queued_events(index):
+    index, slug = index
+    path = index.run_logs.runs_dir(slug) / INDEX_NAME
+    _log(index, slug, RUN_ID, _event("status", status="running"))
+    assert index.get_run(slug, RUN_ID)["status"] == "running"
+    lines = len(path.read_text().splitlines())
+    _log(index, slug, RUN_ID, _event("codex_thinking", text="hmm"))
+
+    record = index.get_run(slug, RUN_ID)
+    assert record["events"] == 2
+    assert record["eventTypes"]["codex_thinking"]["count"] == 1
+    # The unpersisted event updated the record without another index line.
+    assert len(path.read_text().splitlines()) == lines
+
+
+def test_rebuild_merges_live_run_with_older_logs(index):
+    index, slug = index
+    _log(index, slug, OLD_RUN_ID, _event("run_finished", status="succeeded"), observe=False)
+    _log(index, slug, RUN_ID, _event("status", status="running"))
+    # Left behind by an interrupted rewrite; must not be read as a run.
+    (index.run_logs.runs_dir(slug) / f"{INDEX_NAME}.tmp").write_text("{}\n")
+
+    runs, total = index.list_runs(slug)
+    assert total == 2
+    assert {run["runId"]: run["status"] for run in runs} == {OLD_RUN_ID: "succeeded", RUN_ID: "running"}
+    assert index.get_run(slug, RUN_ID)["events"] == 1
+
+
+def test_snapshots_are_not_mutated_by_later_events(index):
+    index, slug = index
+    _log(index, slug, RUN_ID, _event("status", status="running"))
+    first = index.get_run(slug, RUN_ID)
+    _log(index, slug, RUN_ID, _event("run_finished", status="succeeded"))
+
+    assert first["status"] == "running"
+    assert index.get_run(slug, RUN_ID)["status"] == "succeeded"
+    assert RunIndex(index.run_logs).get_run(slug, RUN_ID)["status"] == "succeeded"
+
+
+def test_finished_runs_leave_no_working_record(index):
+    index, slug = index
+    _log(index, slug, RUN_ID, _event("status", status="running"))
+    assert (slug, RUN_ID) in index._working
+    _log(index, slug, RUN_ID, _event("run_finished", status="succeeded"))
+
+    assert not index._working
+    record = index.get_run(slug, RUN_ID)
+    assert (record["status"], record["events"]) == ("succeeded", 2)
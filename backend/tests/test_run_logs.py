@@ -0,0 +1,135 @@
+"""Run log segments: seal, compress and read back as one event stream."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from app.blobs import BlobStore
+from app.run_logs import RunLogStore
+from app.seekable_gzip import SeekableGzipReader, compress_file
+from app.storage import GameStorage
+
+RUN_ID = "c" * 32
+
+
+@pytest.fixture
+def store(tmp_path):
+    storage = GameStorage(tmp_path / "games")
+    storage.ensure_games_dir()
+    slug = storage.create_game("Logs").slug
+    return RunLogStore(storage, segment_bytes=4096, budget_bytes=0), slug
+
+
+def _append_events(store: RunLogStore, slug: str, count: int) -> list[str]:
+    sealed = []
+    for index in range(count):
+        line = json.dumps({"type": "codex_thinking", "payload": {"index": index, "text": "x" * 100}}) + "\n"
+        if (path := store.append(slug, RUN_ID, line, "codex_thinking")) is not None:
+            sealed.append(path)
+    return sealed
+
+
+def test_sealed_and_compressed_segments_read_back_in_order(store):
+    store, slug = store
+    sealed = _append_events(store, slug, 200)
+    assert len(sealed) > 3
+    for path in sealed:
+        assert store.compress(path)
+        assert not path.exists()
+
+    events = list(store.iter_events(slug, RUN_ID))
+    assert [event["payload"]["index"] for event in events] == list(range(200))
+
+    page, total = store.read_events(slug, RUN_ID, offset=150, limit=10)
+    assert total == 200
+    assert [event["payload"]["index"] for event in page] == list(range(150, 160))
+    tail, _ = store.read_events(slug, RUN_ID, limit=3, reverse=True)
+    assert [event["payload"]["index"] for event in tail] == [199, 198, 197]
+
+
+def test_finish_compresses_everything_left_behind(store):
+    store, slug = store
+    for path in _append_events(store, slug, 120):
+        store.compress(path)  # as the run manager does for segments sealed mid-run
+    sealed = store.seal(slug, RUN_ID)
+    store.finish(slug, RUN_ID, sealed, active_runs=set())
+
+    runs_dir = store.runs_dir(slug)
+    assert not list(runs_dir.glob(f"{RUN_ID}.*.jsonl"))
+    assert not list(runs_dir.glob("*.tmp"))
+    assert len(list(store.iter_events(slug, RUN_ID))) == 120
+
+
+def test_concurrent_compression_of_one_segment_is_safe(store):
+    store, slug = store
+    sealed = _append_events(store, slug, 60)
+    path = sealed[0]
+    expected = path.read_bytes()
+    errors = []
+
+    def compress() -> None:
+        try:
+            store.compress(path)
+        except Exception as error:  # pragma: no cover - the failure being tested
+            errors.append(error)
+
+    threads = [threading.Thread(target=compress) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    gz = path.with_name(path.name + ".gz")
+    assert SeekableGzipReader(gz).read_range(0, len(expected)) == expected
+    assert not list(path.parent.glob("*.tmp"))
+
+
+def test_compress_file_writers_do_not_share_a_temp_file(tmp_path):
+    source = tmp_path / "data.jsonl"
+    source.write_bytes(b"line\n" * 50_000)
+    target = tmp_path / "data.jsonl.gz"
+    threads = [threading.Thread(target=compress_file, args=(source, target), kwargs={"frame_size": 4096}) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reader = SeekableGzipReader(target)
+    assert reader.size == source.stat().st_size
+    assert reader.read_range(100_000, 100_010) == source.read_bytes()[100_000:100_010]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["data.jsonl", "data.jsonl.gz", "data.jsonl.gz.idx"]
+
+
+def _run_with_blob(store: RunLogStore, slug: str, run_id: str, started: float, blob_bytes: int) -> None:
+    timestamp = datetime.fromtimestamp(started, timezone.utc).isoformat()
+    store.append(slug, run_id, json.dumps({"type": "run_started", "timestamp": timestamp}) + "\n")
+    for path in store.runs_dir(slug).glob(f"{run_id}.*"):
+        os.utime(path, (started, started))
+    blob = BlobStore(store.runs_dir(slug) / "blobs").put_text(os.urandom(blob_bytes).hex())  # hex gzips to about half
+    os.utime(store.runs_dir(slug) / "blobs" / f"{blob.blob_id}.gz", (started + 1, started + 1))
+
+
+def test_retention_counts_freed_blobs_and_keeps_the_newest_run(tmp_path):
+    storage = GameStorage(tmp_path / "games")
+    storage.ensure_games_dir()
+    slug = storage.create_game("Blobs").slug
+    store = RunLogStore(storage, budget_bytes=250_000)
+    old, middle, new = "a" * 32, "b" * 32, "d" * 32
+    _run_with_blob(store, slug, old, 1_000_000, 100_000)
+    _run_with_blob(store, slug, middle, 2_000_000, 10_000)
+    _run_with_blob(store, slug, new, 3_000_000, 200_000)
+
+    # Dropping the oldest run frees its blob; the middle run still fits its own.
+    assert store.enforce_retention(slug, keep=set()) == [old]
+    assert store.has_run(slug, middle)
+    # The newest run's blob alone exceeds the budget; it and its run stay.
+    store.budget_bytes = 150_000
+    assert store.enforce_retention(slug, keep=set()) == [middle]
+    assert store.has_run(slug, new)
+    assert len(list((store.runs_dir(slug) / "blobs").glob("*.gz"))) == 1
@@ -0,0 +1,88 @@
+"""Run checkpoints and tool-call timings collected from the Codex stream."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+from app.models import RunStatus
+from app.run_manager import RunManager, RunState
+from app.run_timings import RunTimings, ToolTimingStats
+from app.storage import GameStorage
+
+
+def _run_events(tmp_path, events: list[dict]) -> RunState:
+    storage = GameStorage(tmp_path / "games")
+    storage.ensure_games_dir()
+    manager = RunManager(
+        storage=storage,
+        project_root=tmp_path,
+        codex_bin="unused",
+        codex_model=None,
+        title_model="unused",
+        image_model="unused",
+    )
+    run = RunState(
+        run_id="f" * 32,
+        slug=storage.create_game("Timings").slug,
+        prompt="time it",
+        chat_context=[],
+        status=RunStatus.running,
+        created_at=datetime.now(timezone.utc),
+    )
+
+    async def feed() -> None:
+        for event in events:
+            await manager._forward_codex_event(run, event)
+
+    asyncio.run(feed())
+    return run
+
+
+def test_first_output_ignores_reasoning_and_tool_starts(tmp_path):
+    run = _run_events(
+        tmp_path,
+        [
+            {"type": "thread.started", "thread_id": "t"},
+            {"type": "item.started", "item": {"id": "r", "type": "reasoning"}},
+            {"type": "item.completed", "item": {"id": "r", "type": "reasoning", "text": "thinking"}},
+            {"type": "item.started", "item": {"id": "c", "type": "command_execution", "command": "ls"}},
+        ],
+    )
+    assert run.timings.thread_started is not None
+    assert run.timings.first_output is None
+
+
+def test_first_output_is_the_first_tool_output_or_message(tmp_path):
+    tool = _run_events(
+        tmp_path / "tool",
+        [
+            {"type": "item.started", "item": {"id": "c", "type": "command_execution", "command": "ls"}},
+            {"type": "item.completed", "item": {"id": "c", "type": "command_execution", "aggregated_output": "a", "exit_code": 0}},
+        ],
+    )
+    assert tool.timings.first_output is not None
+    assert tool.timings.tool_calls["c"].duration_ms is not None
+
+    message = _run_events(
+        tmp_path / "message",
+        [{"type": "item.completed", "item": {"id": "m", "type": "agent_message", "text": "Done."}}],
+    )
+    assert message.timings.first_output is not None
+
+
+def test_tool_stats_rank_slowest_calls_and_commands():
+    stats = ToolTimingStats(keep_slowest=2)
+    for run_index, durations in enumerate([(5, 50), (30, 10)]):
+        timings = RunTimings()
+        for call_index, duration in enumerate(durations):
+            call_id = f"{run_index}-{call_index}"
+            timings.tool_started(call_id, "shell_command", f"cmd{call_index}")
+            timings.tool_completed(call_id, 0 if call_index else 1)
+            timings.tool_calls[call_id].finished = timings.tool_calls[call_id].started + duration / 1000
+        stats.record_run(run_id=str(run_index), slug="game", timings=timings)
+
+    assert [round(call["durationMs"]) for call in stats.slowest_calls(5)] == [50, 30]
+    commands = stats.slowest_commands(5)
+    assert [command["command"] for command in commands] == ["cmd1", "cmd0"]
+    assert commands[1]["count"] == 2 and commands[1]["failures"] == 2
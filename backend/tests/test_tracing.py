@@ -0,0 +1,36 @@
+"""Span export: queued on the caller, written by the exporter's thread."""
+
+from __future__ import annotations
+
+import io
+import json
+
+from app.tracing import FileExporter, SpanContext, StreamExporter, Tracer
+
+
+def test_file_exporter_writes_every_span_by_shutdown(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    tracer = Tracer(FileExporter(path))
+    with tracer.span("request") as request:
+        for _ in range(200):
+            with tracer.span("step"):
+                pass
+    tracer.shutdown()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(spans) == 201
+    assert {span["traceId"] for span in spans} == {request.trace_id}
+    assert spans[-1]["name"] == "request"
+
+
+def test_trace_id_applies_only_to_roots():
+    stream = io.StringIO()
+    tracer = Tracer(StreamExporter(stream))
+    parent = SpanContext("a" * 32, "b" * 16)
+    tracer.start_span("run", parent=parent, trace_id="c" * 32).end()
+    tracer.start_span("run", trace_id="c" * 32).end()
+    tracer.shutdown()
+    tracer.start_span("late").end()  # after shutdown: dropped
+
+    spans = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(span["traceId"], span["parentSpanId"]) for span in spans] == [("a" * 32, "b" * 16), ("c" * 32, "")]
@@ -1,4 +1,4 @@
-import type { ChatMessage, GameRecord, GenerateResponse } from '../types';
+import type { Conversation, GameRecord, GenerateResponse } from '../types';
 
 async function parseResponse<T>(response: Response): Promise<T> {
   if (!response.ok) {
@@ -29,13 +29,29 @@ export async function createGame(title?: string): Promise<GameRecord> {
   return parseResponse<GameRecord>(response);
 }
 
-export async function generateGame(slug: string, prompt: string, chatContext: ChatMessage[]): Promise<GenerateResponse> {
+export class ConversationConflictError extends Error {
+  constructor(public conversationVersion: number) {
+    super('The conversation changed elsewhere. Send your message again.');
+  }
+}
+
+export async function getConversation(slug: string): Promise<Conversation> {
+  const response = await fetch(`/api/games/${slug}/conversation`);
+  return parseResponse<Conversation>(response);
+}
+
+export async function generateGame(slug: string, prompt: string, conversationVersion: number): Promise<GenerateResponse> {
+  // The server keeps the history; only the new prompt is sent.
   const response = await fetch(`/api/games/${slug}/generate`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ prompt, chatContext })
+    body: JSON.stringify({ prompt, conversationVersion })
   });
 
+  if (response.status === 409) {
+    const body = await response.json();
+    throw new ConversationConflictError(body.detail.conversationVersion);
+  }
   return parseResponse<GenerateResponse>(response);
 }
 
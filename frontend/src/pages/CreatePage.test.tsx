@@ -1,4 +1,4 @@
-import { fireEvent, render, screen } from '@testing-library/react';
+import { fireEvent, render, screen, waitFor } from '@testing-library/react';
 import { MemoryRouter, Route, Routes } from 'react-router-dom';
 import { afterEach, describe, expect, it, vi } from 'vitest';
 
@@ -50,6 +50,12 @@ describe('CreatePage', () => {
         return Promise.resolve(new Response(JSON.stringify({ runId: 'run-1' }), { status: 200 }));
       }
 
+      if (url === '/api/games/neon/conversation') {
+        return Promise.resolve(
+          new Response(JSON.stringify({ slug: 'neon', version: 0, messages: [] }), { status: 200 })
+        );
+      }
+
       if (url === '/api/games/neon') {
         return Promise.resolve(
           new Response(
@@ -84,5 +90,76 @@ describe('CreatePage', () => {
 
     expect(await screen.findByText(/game folder ready/i)).toBeInTheDocument();
     expect(await screen.findByText(/generate a snake game/i)).toBeInTheDocument();
+    expect(screen.queryByText(/unexpected fetch url/i)).not.toBeInTheDocument();
+  });
+
+  it('restores the stored conversation and sends its version', async () => {
+    vi.stubGlobal('EventSource', FakeEventSource as unknown as typeof EventSource);
+
+    const fetchMock = vi.spyOn(globalThis, 'fetch').mockImplementation((input) => {
+      const url = String(input);
+
+      if (url === '/api/games/neon') {
+        return Promise.resolve(
+          new Response(
+            JSON.stringify({
+              slug: 'neon',
+              title: 'Neon',
+              createdAt: '2026-02-05T12:00:00+00:00',
+              updatedAt: '2026-02-05T12:01:00+00:00',
+              previewUrl: '/games/neon/index.html',
+              imageUrl: '/games/neon/card.png'
+            }),
+            { status: 200 }
+          )
+        );
+      }
+
+      if (url === '/api/games/neon/conversation') {
+        return Promise.resolve(
+          new Response(
+            JSON.stringify({
+              slug: 'neon',
+              version: 2,
+              messages: [
+                { role: 'user', content: 'Make a neon snake game' },
+                { role: 'assistant', content: 'Snake is ready to play.' }
+              ]
+            }),
+            { status: 200 }
+          )
+        );
+      }
+
+      if (url === '/api/games/neon/generate') {
+        return Promise.resolve(
+          new Response(JSON.stringify({ runId: 'run-2', conversationVersion: 3 }), { status: 200 })
+        );
+      }
+
+      return Promise.reject(new Error(`Unexpected fetch URL: ${url}`));
+    });
+
+    render(
+      <MemoryRouter initialEntries={['/create?slug=neon']}>
+        <Routes>
+          <Route path="/create" element={<CreatePage />} />
+        </Routes>
+      </MemoryRouter>
+    );
+
+    expect(await screen.findByText('Make a neon snake game')).toBeInTheDocument();
+    expect(screen.getByText('Snake is ready to play.')).toBeInTheDocument();
+
+    fireEvent.change(screen.getByPlaceholderText(/describe the game/i), {
+      target: { value: 'Add lasers' }
+    });
+    fireEvent.click(screen.getByRole('button', { name: /send/i }));
+
+    await waitFor(() => {
+      const call = fetchMock.mock.calls.find(([input]) => String(input) === '/api/games/neon/generate');
+      expect(call).toBeDefined();
+      expect(JSON.parse(String(call?.[1]?.body))).toEqual({ prompt: 'Add lasers', conversationVersion: 2 });
+    });
   });
 });
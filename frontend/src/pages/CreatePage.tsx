@@ -1,7 +1,7 @@
 import { FormEvent, useEffect, useMemo, useRef, useState } from 'react';
 import { Link, useNavigate, useSearchParams } from 'react-router-dom';
 
-import { cancelRun, createGame, generateGame, getGame } from '../lib/api';
+import { cancelRun, ConversationConflictError, createGame, generateGame, getConversation, getGame } from '../lib/api';
 import type { ChatMessage, GameRecord, RunEvent } from '../types';
 
 interface ChatEntry {
@@ -40,6 +40,8 @@ export function CreatePage() {
 
   const [game, setGame] = useState<GameRecord | null>(null);
   const [messages, setMessages] = useState<ChatEntry[]>([]);
+  // Version of the server-side conversation this page has seen.
+  const [conversationVersion, setConversationVersion] = useState(0);
 
   const [isGenerating, setIsGenerating] = useState(false);
   const [activeRunId, setActiveRunId] = useState<string | null>(null);
@@ -48,6 +50,12 @@ export function CreatePage() {
   const [previewNonce, setPreviewNonce] = useState(Date.now());
 
   const eventSourceRef = useRef<EventSource | null>(null);
+  // Bumped whenever a send or run reports a newer version, so a load that
+  // started earlier cannot overwrite it with an older one.
+  const versionEpochRef = useRef(0);
+  // True while a prompt is being sent; its outcome wins over any load
+  // that overlaps it.
+  const sendingRef = useRef(false);
 
   useEffect(() => {
     return () => {
@@ -61,6 +69,7 @@ export function CreatePage() {
     if (!slug) {
       setGame(null);
       setMessages([]);
+      setConversationVersion(0);
       return;
     }
     const currentSlug = slug;
@@ -68,10 +77,22 @@ export function CreatePage() {
     let active = true;
 
     async function load() {
+      const epoch = versionEpochRef.current;
       try {
-        const loaded = await getGame(currentSlug);
+        const [loaded, conversation] = await Promise.all([getGame(currentSlug), getConversation(currentSlug)]);
         if (active) {
           setGame(loaded);
+          if (versionEpochRef.current === epoch && !sendingRef.current) {
+            setConversationVersion(conversation.version);
+            setMessages(
+              conversation.messages.map((message) => ({
+                id: nextId(),
+                type: 'message' as const,
+                role: message.role,
+                content: message.content
+              }))
+            );
+          }
           setError(null);
         }
       } catch (requestError) {
@@ -107,13 +128,19 @@ export function CreatePage() {
     );
   }
 
+  function updateConversationVersion(version: number) {
+    versionEpochRef.current += 1;
+    setConversationVersion(version);
+  }
+
   async function refreshGame(slug: string) {
     const refreshed = await getGame(slug);
     setGame(refreshed);
     setPreviewNonce(Date.now());
   }
 
-  function startRunStream(runId: string) {
+  // `slug` is passed in: on a new game's first run, `game` in this closure is still null.
+  function startRunStream(runId: string, slug: string) {
     eventSourceRef.current?.close();
 
     const source = new EventSource(`/api/runs/${runId}/events`);
@@ -126,6 +153,12 @@ export function CreatePage() {
         return;
       }
 
+      if (event.type === 'metadata_updated') {
+        // New title or card stage; refetch without reloading the preview.
+        setGame(await getGame(slug));
+        return;
+      }
+
       if (event.type === 'codex_thinking') {
         const text = event.payload.text;
         if (typeof text === 'string' && text.trim().length > 0) {
@@ -176,6 +209,9 @@ export function CreatePage() {
 
       if (event.type === 'run_finished') {
         setIsGenerating(false);
+        if (typeof event.payload.conversationVersion === 'number') {
+          updateConversationVersion(event.payload.conversationVersion);
+        }
 
         const maybeLast = event.payload.lastMessage;
         const maybeError = event.payload.error;
@@ -185,9 +221,7 @@ export function CreatePage() {
           appendMessage('assistant', maybeLast);
         }
 
-        if (game) {
-          await refreshGame(game.slug);
-        }
+        await refreshGame(slug);
 
         source.close();
         eventSourceRef.current = null;
@@ -213,28 +247,33 @@ export function CreatePage() {
     setError(null);
     setIsGenerating(true);
     appendMessage('user', cleanPrompt);
-
-    const chatContext: ChatMessage[] = [
-      ...messages
-        .filter((m) => m.type === 'message' && m.role)
-        .map((m) => ({ role: m.role!, content: m.content })),
-      { role: 'user', content: cleanPrompt }
-    ];
+    sendingRef.current = true;
 
     try {
       let activeGame = game;
+      let version = conversationVersion;
       if (!activeGame) {
         activeGame = await createGame('');
+        version = 0;
         setGame(activeGame);
         setSearchParams({ slug: activeGame.slug });
       }
 
-      const response = await generateGame(activeGame.slug, cleanPrompt, chatContext);
+      const response = await generateGame(activeGame.slug, cleanPrompt, version);
+      if (typeof response.conversationVersion === 'number') {
+        updateConversationVersion(response.conversationVersion);
+      }
       setActiveRunId(response.runId);
-      startRunStream(response.runId);
+      startRunStream(response.runId, activeGame.slug);
     } catch (requestError) {
       setIsGenerating(false);
+      if (requestError instanceof ConversationConflictError) {
+        updateConversationVersion(requestError.conversationVersion);
+      }
       setError(requestError instanceof Error ? requestError.message : 'Failed to start generation');
+    } finally {
+      sendingRef.current = false;
+      versionEpochRef.current += 1;
     }
   }
 
@@ -12,10 +12,18 @@ export interface GameRecord {
   updatedAt: string;
   previewUrl: string;
   imageUrl?: string | null;
+  cardStage?: 'placeholder' | 'draft' | 'final' | null;
 }
 
 export interface GenerateResponse {
   runId: string;
+  conversationVersion?: number | null;
+}
+
+export interface Conversation {
+  slug: string;
+  version: number;
+  messages: ChatMessage[];
 }
 
 export interface RunEvent {